@@ -105,24 +105,30 @@ def Register(registerTab):
                 st.info("Tip: go to the Login tab and sign in with your new account.")
 
 
+@st.cache_resource
+def RebuildSnapshots() -> bool:
+    """
+        Commits tickets, incidents and datasets edits left in their journals, then rebuilds their snapshots from the database
+        Runs once per server process, not on every rerun: a rebuild resets the shared frames, key indexes, counts and query caches of every session
+        A snapshot that goes missing later is rebuilt by LoadSnapshot()
+    """
+    tickets.RebuildSnapshot()
+    incidents.RebuildSnapshot()
+    datasets.RebuildSnapshot()
+    return True
+
+
 def SerializeObjs():
     """
-        Uses pickle module to serialize(pickle) tickets (+ other classes) into binary files for reading from other files
+        Makes sure the tickets, incidents and datasets snapshots exist (see RebuildSnapshots())
+        Uses pickle module to serialize(pickle) users into a binary file for reading from other files
     """
-    with open("DATA/tickets.bin", "wb") as ticketsObjs:
-        pickle.dump(ticketsLst, ticketsObjs)
-    with open("DATA/incidents.bin", "wb") as incidentsObjs:
-        pickle.dump(incidentsLst, incidentsObjs)
-    with open("DATA/datasets.bin", "wb") as datasetsObjs:
-        pickle.dump(datasetsLst, datasetsObjs)
+    RebuildSnapshots()
     with open("DATA/users.bin", "wb") as usersObjs:
         pickle.dump(usersLst, usersObjs)
 
 
 if __name__ == "__main__": 
-    ticketsLst = tickets.TransferFromDB()
-    incidentsLst = incidents.TransferFromDB()
-    datasetsLst = datasets.TransferFromDB()
     usersLst = Users.TransferFromDB()
     SerializeObjs()
     Schema.CreateAllTables()
@@ -0,0 +1,68 @@
+from app.data.engine import TableFrame
+from threading import Lock
+from typing import Any
+
+
+class MaterializedCounts:
+    """
+        Value counts of whole table columns, kept in step with every insert, update and delete
+        Built once from a TableFrame (O(rows)), after that each write adjusts a few counters in O(1),
+        so the summary metrics no longer depend on how many rows the table holds
+    """
+    def __init__(self, columns: dict[str, int]) -> None:
+        """
+            Args:
+                columns (_dict[str, int]_): Column label to its position in the row tuples, e.g. {"severity": 2}
+        """
+        self.__columns: dict[str, int] = columns
+        self.__counts: dict[str, dict[Any, int]] | None = None
+        self.__lock: Lock = Lock()
+
+
+    def Build(self, frame: TableFrame) -> None:
+        """
+            Explanation: Counts every column over all rows of frame, values in first appearance order like CountDict()
+        """
+        mask = frame.Mask(None)
+        counts: dict[str, dict[Any, int]] = {label: frame.CountDict(label, mask) for label in self.__columns}
+        with self.__lock:
+            self.__counts = counts
+
+
+    def Apply(self, old: tuple | None, new: tuple | None) -> None:
+        """
+            Explanation: Replaces row old with row new in the counts, None for the missing side of an insert or delete
+        """
+        with self.__lock:
+            if self.__counts is None:
+                return
+            for label, position in self.__columns.items():
+                counts: dict[Any, int] = self.__counts[label]
+                if old is not None:
+                    counts[old[position]] -= 1
+                    if not counts[old[position]]: #Values no row holds are left out, as a recount would
+                        del counts[old[position]]
+                if new is not None:
+                    counts[new[position]] = counts.get(new[position], 0) + 1
+
+
+    def Reset(self) -> None:
+        """
+            Explanation: Drops the counts, the next Counts() caller rebuilds them
+        """
+        with self.__lock:
+            self.__counts = None
+
+
+    def IsBuilt(self) -> bool:
+        return self.__counts is not None
+
+
+    def Counts(self, label: str) -> dict[Any, int]:
+        """
+            Returns: (_dict_): Copy of {value: count} for label
+        """
+        with self.__lock:
+            if self.__counts is None:
+                raise RuntimeError("Counts have not been built")
+            return dict(self.__counts[label])
@@ -0,0 +1,86 @@
+from collections import OrderedDict
+from functools import wraps
+from threading import Lock
+from typing import Any, Callable
+
+
+class QueryCache:
+    """
+        Process wide LRU cache of query results, shared by every Streamlit session
+        Entries are keyed on (table, generation, query, args). Writes bump the table's generation, so older entries can
+        no longer be hit and are dropped straight away. Cached DataFrames and dicts are shared, callers must not modify them
+    """
+    def __init__(self, maxSize: int = 256) -> None:
+        """
+            Args:
+                maxSize (_int_): Most results kept before the least recently used is evicted
+        """
+        self.__maxSize: int = maxSize
+        self.__entries: OrderedDict[tuple, Any] = OrderedDict()
+        self.__generations: dict[str, int] = {}
+        self.__hits: int = 0
+        self.__misses: int = 0
+        self.__lock: Lock = Lock()
+
+
+    def Get(self, table: str, key: tuple, compute: Callable[[], Any]) -> Any:
+        """
+            Explanation:
+                Returns the cached result for key, or runs compute and caches its result under the current generation
+                compute runs outside the lock, a write that lands meanwhile leaves the result under an old generation
+            Args:
+                table (_str_): Table the query reads
+                key (_tuple_): Hashable query and arguments, e.g. ("GetColCount", (filters, "severity"), ())
+                compute (_Callable_): Runs the query on a miss
+        """
+        with self.__lock:
+            fullKey: tuple = (table, self.__generations.get(table, 0)) + key
+            if fullKey in self.__entries:
+                self.__hits += 1
+                self.__entries.move_to_end(fullKey)
+                return self.__entries[fullKey]
+            self.__misses += 1
+
+        result: Any = compute()
+        with self.__lock:
+            if fullKey[1] == self.__generations.get(table, 0): #Skip results a write has already made stale
+                self.__entries[fullKey] = result
+                self.__entries.move_to_end(fullKey)
+                while len(self.__entries) > self.__maxSize:
+                    self.__entries.popitem(last = False)
+        return result
+
+
+    def Bump(self, table: str) -> None:
+        """
+            Explanation: Called on every write to table, invalidates all of its cached results
+        """
+        with self.__lock:
+            self.__generations[table] = self.__generations.get(table, 0) + 1
+            for key in [key for key in self.__entries if key[0] == table]:
+                del self.__entries[key]
+
+
+    def Cached(self, table: str) -> Callable:
+        """
+            Explanation: Decorator caching a query function of table on its name and (hashable) arguments
+        """
+        def Decorator(function: Callable) -> Callable:
+            @wraps(function)
+            def Wrapper(*args: Any, **kwargs: Any) -> Any:
+                return self.Get(table, (function.__name__, args, tuple(sorted(kwargs.items()))), lambda: function(*args, **kwargs))
+            return Wrapper
+        return Decorator
+
+    #Get Functions
+    def GetHits(self) -> int:
+        return self.__hits
+    def GetMisses(self) -> int:
+        return self.__misses
+    def GetSize(self) -> int:
+        return len(self.__entries)
+    def GetGeneration(self, table: str) -> int:
+        return self.__generations.get(table, 0)
+
+
+queryCache: QueryCache = QueryCache() #Shared by incidents, tickets and datasets
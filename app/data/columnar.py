@@ -0,0 +1,359 @@
+from datetime import date
+from pathlib import Path
+from typing import Iterable
+import numpy as np
+import threading
+import json
+import mmap
+import os
+
+
+_MAGIC: bytes = b"CSNAP001"
+_ALIGN: int = 64
+_EPOCH: int = date(1970, 1, 1).toordinal()
+NULL_DAY: int = np.iinfo(np.int32).min #Stored for dates that are missing or not YYYY-MM-DD
+
+#Storage of each column kind: ids as int64, sizes as float64, dates as int32 days since 1970-01-01,
+#categorical columns as int32 codes into a small dictionary, free text as int64 offsets into a utf-8 byte heap
+_DTYPES: dict[str, str] = {"int": "<i8", "float": "<f8", "date": "<i4", "cat": "<i4", "str": "<i8"}
+_BITMAP_MAX: int = 64 #Categorical columns with up to this many values also get one packed bitmap per value
+
+
+def DateToDay(dateVal: str | None) -> int:
+    """
+        Args:
+            dateVal (_str_): String in YYYY-MM-DD format
+        Returns:
+            (_int_): Days since 1970-01-01, NULL_DAY if dateVal is missing or malformed
+    """
+    try:
+        return date.fromisoformat(dateVal).toordinal() - _EPOCH #type: ignore
+    except (TypeError, ValueError):
+        return NULL_DAY
+
+
+def ValidDate(dateVal: str | None) -> bool:
+    """
+        Explanation: Writes are checked with this, so a date is never silently stored as NULL_DAY and read back as None
+        Returns: (_bool_): True if dateVal is missing (None) or a YYYY-MM-DD date
+    """
+    return dateVal is None or DateToDay(dateVal) != NULL_DAY
+
+
+def DayToDate(day: int) -> str | None:
+    """
+        Returns: (_str | None_): day converted back to YYYY-MM-DD, None for NULL_DAY
+    """
+    if day == NULL_DAY:
+        return None
+    return date.fromordinal(int(day) + _EPOCH).isoformat()
+
+
+def DaysToDates(days: np.ndarray) -> np.ndarray:
+    """
+        Returns: (_np.ndarray_): Object array of days converted with DayToDate(), each distinct day is converted once
+    """
+    unique, inverse = np.unique(days, return_inverse = True)
+    return np.array([DayToDate(day) for day in unique.tolist()], dtype = object)[inverse]
+
+
+def _Pad(size: int) -> int:
+    return (-size) % _ALIGN
+
+
+class ColumnarTable:
+    """
+        Read only view of a snapshot file written by WriteColumnar().
+        The file is opened with mmap, so opening is O(1) and the pages are shared through the OS page cache
+        by every session and process that opens the same snapshot. Arrays returned are zero copy views.
+    """
+    def __init__(self, path: Path) -> None:
+        with open(path, "rb") as snapFile:
+            self.__map = mmap.mmap(snapFile.fileno(), 0, access = mmap.ACCESS_READ)
+        if self.__map[:len(_MAGIC)] != _MAGIC:
+            raise ValueError(f"{path} is not a columnar snapshot")
+        headerLen: int = int.from_bytes(self.__map[8:16], "little")
+        header: dict = json.loads(self.__map[16:16 + headerLen].decode("utf-8"))
+        self.path: Path = path
+        self.rowCount: int = header["rows"]
+        self.meta: dict = header.get("meta", {})
+        self.__columns: dict[str, dict] = {col["name"]: col for col in header["columns"]}
+        self.schema: tuple[tuple[str, str], ...] = tuple((col["name"], col["kind"]) for col in header["columns"])
+        self.__dateIndex: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        self.__keyTable: np.ndarray | None = None
+
+
+    def Array(self, name: str) -> np.ndarray:
+        """
+            Returns: (_np.ndarray_): Raw column, codes for "cat" and offsets (length rowCount + 1) for "str"
+        """
+        col: dict = self.__columns[name]
+        return np.frombuffer(self.__map, dtype = col["dtype"], count = col["count"], offset = col["offset"])
+
+
+    def DateIndex(self, name: str) -> tuple[np.ndarray, np.ndarray]:
+        """
+            Returns:
+                order (_np.ndarray_): Row positions of a "date" column sorted by date, ties in row order
+                days (_np.ndarray_): The column's days in that order
+        """
+        if name not in self.__dateIndex:
+            col: dict = self.__columns[name]
+            if "orderOffset" in col:
+                order = np.frombuffer(self.__map, dtype = "<i4", count = col["count"], offset = col["orderOffset"])
+                days = np.frombuffer(self.__map, dtype = "<i4", count = col["count"], offset = col["sortedOffset"])
+            else: #Snapshot written before date indexes, sort once per process
+                order = np.argsort(self.Array(name), kind = "stable").astype("<i4")
+                days = self.Array(name)[order]
+            self.__dateIndex[name] = (order, days)
+        return self.__dateIndex[name]
+
+
+    def DayRange(self, name: str, low: int, high: int) -> np.ndarray:
+        """
+            Explanation: Binary searches the sorted date index, matching rows are one contiguous slice of it
+            Returns: (_np.ndarray_): Row positions with low <= day <= high, in date order
+        """
+        order, days = self.DateIndex(name)
+        bounds: np.ndarray = np.array([low, high], dtype = days.dtype) #Same dtype as days, or searchsorted converts the whole index first
+        return order[np.searchsorted(days, bounds[0], side = "left"):np.searchsorted(days, bounds[1], side = "right")]
+
+
+    def HasBitmap(self, name: str) -> bool:
+        return "bitmapOffset" in self.__columns[name]
+
+
+    def Bitmap(self, name: str, codes: Iterable[int]) -> np.ndarray | None:
+        """
+            Explanation: ORs the packed bitmaps of codes, bit i is set if row i holds any of them
+            Returns: (_np.ndarray | None_): Packed uint8 bits (np.unpackbits order), None if name has no bitmap index
+        """
+        col: dict = self.__columns[name]
+        if "bitmapOffset" not in col:
+            return None
+        bitmaps: np.ndarray = np.frombuffer(self.__map, dtype = np.uint8, count = len(col["categories"]) * col["bitmapWidth"], offset = col["bitmapOffset"])
+        bitmaps = bitmaps.reshape(len(col["categories"]), col["bitmapWidth"])
+        selected: list[int] = [code for code in codes if 0 <= code < len(bitmaps)]
+        if not selected:
+            return np.zeros(col["bitmapWidth"], dtype = np.uint8)
+        return np.bitwise_or.reduce(bitmaps[selected], axis = 0)
+
+
+    def Categories(self, name: str) -> list[str | None]:
+        """Dictionary of a "cat" column, code i stands for Categories(name)[i]"""
+        return self.__columns[name]["categories"]
+
+
+    def Heap(self, name: str) -> memoryview:
+        """utf-8 bytes of a "str" column, value i is Heap(name)[offsets[i]:offsets[i + 1]]"""
+        col: dict = self.__columns[name]
+        return memoryview(self.__map)[col["heapOffset"]:col["heapOffset"] + col["heapLength"]]
+
+
+    def Decode(self, name: str, positions: np.ndarray | None = None) -> list:
+        """
+            Args:
+                name (_str_): Column name
+                positions (_np.ndarray | None_): Row positions to decode, None for every row
+            Returns:
+                (_list_): Values decoded back to Python (str, int, float, YYYY-MM-DD str)
+        """
+        kind: str = self.__columns[name]["kind"]
+        array: np.ndarray = self.Array(name)
+        if kind == "str":
+            if positions is None: #Every value is wanted, one copy of the heap is cheaper than a slice per row
+                heap: bytes = bytes(self.Heap(name))
+                return [heap[start:end].decode("utf-8") for start, end in zip(array[:-1].tolist(), array[1:].tolist())]
+            view: memoryview = self.Heap(name) #Zero copy, only the requested values are read
+            return [str(view[start:end], "utf-8") for start, end in zip(array[positions].tolist(), array[positions + 1].tolist())]
+        if positions is not None:
+            array = array[positions]
+        match kind:
+            case "int" | "float":
+                return array.tolist()
+            case "date":
+                return DaysToDates(array).tolist()
+            case _:
+                categories = np.array(self.Categories(name) + [None], dtype = object) #Code -1 indexes the trailing None
+                return categories[array].tolist()
+
+
+    def Column(self, name: str) -> list:
+        """
+            Returns: (_list_): Column decoded back to Python values
+        """
+        return self.Decode(name)
+
+
+    def Rows(self) -> list[tuple]:
+        """
+            Returns: (_list[tuple]_): Every row as a tuple in schema order
+        """
+        return list(zip(*(self.Decode(name) for name, _ in self.schema)))
+
+
+    def KeyTable(self) -> np.ndarray | None:
+        """
+            Explanation: Direct address table of the first (id) column, built once per snapshot when ids are dense enough
+            Returns: (_np.ndarray | None_): Position of id at [id - first id], -1 for gaps, None if ids are too sparse
+        """
+        keys: np.ndarray = self.Array(self.schema[0][0])
+        if self.__keyTable is None and self.rowCount and int(keys[-1]) - int(keys[0]) < 4 * self.rowCount:
+            table: np.ndarray = np.full(int(keys[-1]) - int(keys[0]) + 1, -1, dtype = np.int64)
+            table[keys - keys[0]] = np.arange(self.rowCount)
+            self.__keyTable = table
+        return self.__keyTable
+
+
+    def Positions(self, ids: Iterable[int]) -> np.ndarray:
+        """
+            Explanation: Looks ids up in KeyTable(), or binary searches the id column if ids are sparse (snapshots are always sorted by id)
+            Returns: (_np.ndarray_): Row positions of the ids that exist, missing ids are skipped
+        """
+        keys: np.ndarray = self.Array(self.schema[0][0])
+        wanted: np.ndarray = np.fromiter(ids, dtype = np.int64)
+        table: np.ndarray | None = self.KeyTable()
+        if table is not None:
+            offsets: np.ndarray = wanted - int(keys[0])
+            positions: np.ndarray = table[offsets[(offsets >= 0) & (offsets < len(table))]]
+            return positions[positions >= 0]
+        positions = np.searchsorted(keys, wanted)
+        found: np.ndarray = positions < len(keys)
+        found[found] = keys[positions[found]] == wanted[found]
+        return positions[found]
+
+
+    def Contains(self, id: int) -> bool:
+        return len(self.Positions((id,))) == 1
+
+
+    def Lookup(self, ids: Iterable[int]) -> list[tuple]:
+        """
+            Returns: (_list[tuple]_): Rows of the given ids that exist in the snapshot, sorted by id
+        """
+        positions: np.ndarray = np.unique(self.Positions(ids))
+        return list(zip(*(self.Decode(name, positions) for name, _ in self.schema)))
+
+
+def WriteColumnar(path: Path, schema: Iterable[tuple[str, str]], rows: Iterable[tuple], meta: dict | None = None) -> None:
+    """
+        Explanation:
+            Writes rows to path in the columnar snapshot format
+            Layout: magic, header length, JSON header, then one 64 byte aligned block per array
+            Date columns also get a sorted index: row positions in date order and the dates in that order
+            Low cardinality categorical columns also get a bitmap index: one packed bit per row for each value
+            Written to a temporary file first and renamed so readers never see a half written snapshot
+        Args:
+            path (_Path_): Destination file
+            schema (_Iterable_): (column name, kind) pairs, kind is "int", "float", "date", "cat" or "str"
+            rows (_Iterable[tuple]_): Row tuples in schema order
+            meta (_dict | None_): JSON serialisable values stored in the header, read back as ColumnarTable.meta
+    """
+    schema = tuple(schema)
+    values: list[tuple] = list(zip(*rows)) or [() for _ in schema]
+    rowCount: int = len(values[0])
+    blocks: list[list[tuple[str, bytes]]] = []
+    columns: list[dict] = []
+
+    for (name, kind), colVals in zip(schema, values):
+        col: dict = {"name": name, "kind": kind, "dtype": _DTYPES[kind], "count": rowCount}
+        parts: list[tuple[str, bytes]] = [] #(header field holding the offset, bytes) of every block after the column itself
+        match kind:
+            case "int":
+                array = np.fromiter((int(val) for val in colVals), dtype = "<i8", count = rowCount)
+            case "float":
+                array = np.fromiter((np.nan if val is None else float(val) for val in colVals), dtype = "<f8", count = rowCount)
+            case "date":
+                array = np.fromiter((DateToDay(val) for val in colVals), dtype = "<i4", count = rowCount)
+                order = np.argsort(array, kind = "stable").astype("<i4")
+                parts += [("orderOffset", order.tobytes()), ("sortedOffset", array[order].tobytes())] #Sorted date index, see DayRange()
+            case "cat":
+                codes: dict = {}
+                array = np.fromiter((-1 if val is None else codes.setdefault(val, len(codes)) for val in colVals), dtype = "<i4", count = rowCount)
+                col["categories"] = list(codes)
+                if len(codes) <= _BITMAP_MAX: #Bitmap index, see Bitmap()
+                    bitmaps = [np.packbits(array == code) for code in range(len(codes))]
+                    col["bitmapWidth"] = (rowCount + 7) // 8
+                    parts.append(("bitmapOffset", b"".join(bitmap.tobytes() for bitmap in bitmaps)))
+            case _:
+                encoded: list[bytes] = [("" if val is None else str(val)).encode("utf-8") for val in colVals]
+                lengths = np.fromiter((len(val) for val in encoded), dtype = "<i8", count = rowCount)
+                array = np.zeros(rowCount + 1, dtype = "<i8")
+                np.cumsum(lengths, out = array[1:])
+                col["count"] = rowCount + 1
+                heap: bytes = b"".join(encoded)
+                col["heapLength"] = len(heap)
+                parts.append(("heapOffset", heap))
+        columns.append(col)
+        blocks.append([("offset", array.tobytes())] + parts)
+
+    #Offsets depend on header length, so lay the blocks out against a header with placeholder offsets first
+    for col, colBlocks in zip(columns, blocks):
+        for field, _ in colBlocks:
+            col[field] = 0
+    for _ in range(2): #Second pass once offsets have their final width
+        header: bytes = json.dumps({"rows": rowCount, "meta": meta or {}, "columns": columns}).encode("utf-8")
+        position: int = 16 + len(header) + _Pad(16 + len(header))
+        for col, colBlocks in zip(columns, blocks):
+            for field, block in colBlocks:
+                col[field] = position
+                position += len(block) + _Pad(len(block))
+
+    header = json.dumps({"rows": rowCount, "meta": meta or {}, "columns": columns}).encode("utf-8")
+    tmpPath: Path = path.with_name(path.name + ".tmp")
+    with open(tmpPath, "wb") as snapFile:
+        snapFile.write(_MAGIC + len(header).to_bytes(8, "little") + header + b"\0" * _Pad(16 + len(header)))
+        for colBlocks in blocks:
+            for _, block in colBlocks:
+                snapFile.write(block + b"\0" * _Pad(len(block)))
+    os.replace(tmpPath, path)
+
+
+_tables: dict[str, ColumnarTable] = {}
+_tablesLock = threading.Lock()
+
+
+def _SnapshotFiles(directory: Path, stem: str) -> list[Path]:
+    """Every generation of stem's snapshot, oldest first"""
+    return sorted(directory.glob(f"{stem}.*.snap"), key = lambda path: int(path.name.split(".")[-2]))
+
+
+def OpenSnapshot(directory: Path, stem: str) -> ColumnarTable | None:
+    """
+        Explanation:
+            Opens the newest snapshot of stem (e.g. DATA/incidents.000003.snap)
+            Snapshot files are never modified after being written, so one mmap per file is shared by every caller in the process
+        Returns:
+            (_ColumnarTable | None_): None if no snapshot has been written yet
+    """
+    while True:
+        files: list[Path] = _SnapshotFiles(directory, stem)
+        if not files:
+            return None
+        key: str = str(files[-1].resolve())
+        with _tablesLock:
+            try:
+                if key not in _tables:
+                    _tables[key] = ColumnarTable(files[-1])
+                return _tables[key]
+            except FileNotFoundError: #Replaced by a newer generation between glob and open
+                continue
+
+
+def WriteSnapshot(directory: Path, stem: str, schema: Iterable[tuple[str, str]], rows: Iterable[tuple], meta: dict | None = None) -> None:
+    """
+        Explanation:
+            Writes rows as the next generation of stem's snapshot, then removes older generations
+            A new file name per generation means open mmaps of the old snapshot stay valid (and it works on Windows,
+            where a mapped file cannot be replaced)
+    """
+    files: list[Path] = _SnapshotFiles(directory, stem)
+    generation: int = int(files[-1].name.split(".")[-2]) + 1 if files else 1
+    WriteColumnar(directory / f"{stem}.{generation:06d}.snap", schema, rows, meta)
+    for old in files:
+        with _tablesLock:
+            _tables.pop(str(old.resolve()), None)
+        try:
+            old.unlink()
+        except OSError: #Still mapped on Windows, removed after the next write
+            pass
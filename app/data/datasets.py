@@ -1,196 +1,160 @@
 from app.services.database_manager import DatabaseManager
-from models.datasets import Dataset
+from app.data.journal import Journal, Replay, Dirty, Valid
+from app.data.engine import TableFrame, DashboardResult
+from app.data.filters import FilterSpec, Where
+from app.data.cache import queryCache
+from app.data.aggregates import MaterializedCounts
+from app.data.keyindex import KeyIndex
+from app.data.store import TableStore
+from app.data.columnar import ColumnarTable, OpenSnapshot, WriteSnapshot, ValidDate
+from app.data.search import SearchIndex
 from pathlib import Path
 from typing import Any
 import pandas as pd
-import pickle
+import numpy as np
 import csv
 
 
-def TransferFromDB():
-    """
-        Gets all rows from IT_Datasets and creates a list of Dataset
-        Returns: itDatasets (_list[Dataset]_): List containing all Datasets in database
-    """
-    
-    dbMgr = DatabaseManager(str(Path("DATA") / "intelligence_platform.db"))
-    df = dbMgr.FetchAll("SELECT * FROM Datasets_Metadata ORDER BY id")
-    datasets: list[Dataset] = []
-    ids: list[int] = df["id"].tolist()
-    names: list[str] = df["dataset_name"].tolist()
-    ctgrys: list[str] = df["category"].tolist()
-    sizes: list[float] = df["file_size_mb"].tolist()
-    sources: list[str] = df["source"].tolist()
-    lastUpds: list[str] = df["last_update"].tolist()
-    for i in range(len(df)):
-        metadata: Dataset = Dataset(int(ids[i]), names[i], ctgrys[i], sizes[i], sources[i], lastUpds[i])
-        datasets.append(metadata)
-    
-    return datasets
+_journal: Journal = Journal(Path("DATA") / "datasets.journal") #Row level changes not yet folded into the datasets snapshot
+_COLUMNS: tuple[tuple[str, str], ...] = (("id", "int"), ("dataset_name", "str"), ("category", "cat"), ("file_size_mb", "float"), ("source", "cat"), ("last_update", "date")) #Snapshot layout, same order as the row tuples
+_LABELS: dict[str, str] = {"id": "id", "dataset_name": "dataset_name", "category": "category", "file_size_mb": "file_size_mb", "source": "source", "last_updated": "last_update"} #Filter/DataFrame label to column name, the same in the snapshot and in Datasets_Metadata
+_GROUP_COLUMNS: tuple[str, ...] = ("source", "category", "file_size_mb", "last_updated") #Columns GetColCount() can group by
+_counts: MaterializedCounts = MaterializedCounts({"category": 2, "source": 4}) #Whole table counts behind Metrics(), adjusted by every write
+_keys: KeyIndex = KeyIndex() #Rows changed since the snapshot by id, for O(1) CRUD checks
+_store: TableStore = TableStore(lambda: BuildFrame()) #Current frame shared by every session, rebuilt after writes
+_search: SearchIndex = SearchIndex(str(Path("DATA") / "intelligence_platform.db"), "Datasets_Metadata", "id", "dataset_name", 1) #Full text index of dataset names, kept in step with the journal
 
 
-def GetColumn(col: str, dataset: Dataset):
+@queryCache.Cached("datasets")
+def GetRows(filters: FilterSpec | None) -> pd.DataFrame:
     """
-        Matches string to respective column value
+        Explanation: 
+            Evaluates filters as one boolean mask over the datasets columns and returns the matching rows
         Args:
-            col (_str_): Contains string form of column
-            inc (_Dataset_): Dataset to get column value
+            filters (_FilterSpec | None_): Filter spec built from filters.Range/DateRange/InSet/And
         Returns:
-            (_int_ | _str_): Value of Dataset[col]
-    """
-    match col:
-        case "id":
-            return dataset.GetID()
-        case "dataset_name":
-            return dataset.GetName()
-        case "category":
-            return dataset.GetCtgry()
-        case "file_size_mb":
-            return dataset.GetFileSize()
-        case "source":
-            return dataset.GetSource()
-        case "last_updated":
-            return dataset.GetLastUpd()
-        case _: # * = "All"
-            return dataset.GetAll()
-
-
-def CheckFilters(filters: dict | None, metadata: Dataset):
+            df (_df.DataFrame_): Contains DataFrame with all rows and labelled columns
     """
-        Explanation: 
-            Iterates through filters and checks if the function value returns True for all, if one returns False, break and return False
+    frame: TableFrame = LoadFrame()
+    return frame.Rows(frame.Mask(filters), list(_LABELS))
+
+
+def GetCommittedRows(filters: FilterSpec | None) -> pd.DataFrame:
+    """
+        Explanation:
+            Same rows and labels as GetRows(), but read from Datasets_Metadata with filters compiled to a parameterised WHERE clause by filters.Where(),
+            so SQLite and the indexes in schema.INDEXES do the filtering. Edits still in datasets.journal are not included until Commit()
         Args:
-            filters (_dict_): Dictionary of form dict[str, function]
-            metadata (_Dataset_): Dataset which filter is being checked on
+            filters (_FilterSpec | None_): Filter spec built from filters.Range/DateRange/InSet/And
         Returns:
-            check (_bool_): If True, passed all filters. If False, failed one filter
-    """
-    if not filters:
-        return True
-    check: bool = True
-    for column in filters:
-        if not filters[column](GetColumn(column, metadata)): #type: ignore
-            check = False
-            break
-    
-    return check
+            df (_df.DataFrame_): Committed rows matching filters, ordered by id
+    """
+    where, params = Where(filters, _LABELS)
+    dbMgr = DatabaseManager(str(Path("DATA") / "intelligence_platform.db"), concurrent = True)
+    return dbMgr.FetchAll(f"SELECT {', '.join(f'{col} AS {label}' for label, col in _LABELS.items())} FROM Datasets_Metadata{where} ORDER BY id", params)
 
 
-def AddCnt(hash: dict, col: Any, colName: str) -> None:
+@queryCache.Cached("datasets")
+def GetPage(filters: FilterSpec | None, sortBy: str = "id", descending: bool = False, after: tuple | None = None, size: int = 50) -> tuple[pd.DataFrame, tuple | None]:
     """
-        Explanation:
-            Modifies hash to update col if found or not found
-        Args: 
-            hash (_dict_): Dictionary of type {column: count(column)}
-            col (_Any_): Contains column value of Dataset
-            colName (_str_): Contains value of x-axis to be shown in charts
+        Explanation: 
+            Returns one page of the datasets matching filters with keyset pagination, only the rows of the page are decoded
+        Args:
+            filters (_FilterSpec | None_): Filter spec built from filters.Range/DateRange/InSet/And
+            sortBy (_str_): Column to sort by, ties broken by id
+            descending (_bool_): Sort largest first
+            after (_tuple | None_): Cursor returned with the previous page, None for the first page
+            size (_int_): Rows per page
+        Returns:
+            df (_df.DataFrame_): Rows of the page with labelled columns
+            cursor (_tuple | None_): after for the next page, None on the last page
     """
-    if col in hash[colName]:
-        index: int = hash[colName].index(col)
-        hash["Count"][index] += 1
-    else:
-        hash[colName].append(col)
-        hash["Count"].append(1)
+    frame: TableFrame = LoadFrame()
+    return frame.Page(frame.Mask(filters), list(_LABELS), sortBy, descending, after, size)
 
 
-def GetRows(filters: dict) -> pd.DataFrame:
+@queryCache.Cached("datasets")
+def Search(query: str, limit: int = 10) -> pd.DataFrame:
     """
         Explanation: 
-            Iterates through all rows of Datasets, if filter pass, it appends to dataframe
+            Full text search of dataset names through the SQLite FTS5 index, every word must match and the last one may be a prefix
         Args:
-            filters (_dict_): Contains filters of form dict[str, function]
+            query (_str_): Search box text, e.g. "customer sal"
+            limit (_int_): Number of matches to return
         Returns:
-            df (_df.DataFrame_): Contains DataFrame with all rows and labelled columns
+            df (_df.DataFrame_): Best matching datasets first, with labelled columns
     """
-    datasets: list[Dataset] = GetDatasets()
-    allRows: list = []
-    for metadata in datasets:
-        if CheckFilters(filters, metadata):
-            allRows.append(GetColumn("*", metadata))
-    
-    df: pd.DataFrame = pd.DataFrame(allRows, columns = ["id", "dataset_name", "category", "file_size_mb", "source", "last_updated"])
-    return df
+    ids: list[int] = LoadSearch().Search(query, limit)
+    keys: KeyIndex = LoadKeys()
+    snapshot: ColumnarTable = LoadSnapshot()
+    rows: list[tuple | None] = [keys.Row(id, snapshot) for id in ids]
+    return pd.DataFrame([row for row in rows if row is not None], columns = list(_LABELS))
 
 
-def GetColCount(filters: dict, col: str) -> pd.DataFrame:
+@queryCache.Cached("datasets")
+def GetColCount(filters: FilterSpec | None, col: str) -> pd.DataFrame:
     """
         Explanation: 
-            Iterates through all rows of Datasets, gets number of occurances of each value in col and returns respective dataframe
+            Counts the occurances of each value in col among the rows matching filters with one hash pass over the encoded column
+            Rows are sorted by value, so dates come out in date order for the line chart
         Args:
-            filters (_dict_): Contains filters of form dict[str, function]
+            filters (_FilterSpec | None_): Filter spec built from filters.Range/DateRange/InSet/And
             col (_str_): Contains column/attribute of Dataset to get DataFrame from
         Returns:
-            df (_df.DataFrame_): Contains DataFrame with all rows and labelled columns
+            df (_df.DataFrame_): Columns col and "Count", empty if col cannot be grouped by
     """
-    datasets: list[Dataset] = GetDatasets() #Create dictionaries
-    sources: dict[str, list[str | int]] = {col: [], "Count": []}
-    ctgrys: dict[str, list[str | int]] = {col: [], "Count": []}
-    fileSizes: dict[str, list[str | int]] = {col: [], "Count": []}
-    lastUpds: dict[str, list[str | int]] = {col: [], "Count": []}
-    noDatasets: int = len(datasets)
-    
-    for i in range(noDatasets):
-        metadata = datasets[i]
-        if not CheckFilters(filters, metadata):
-            continue
-        
-        #Get number of occurances of each value in col
-        column = GetColumn(col, metadata) 
-        match col:
-            case "source":
-                AddCnt(sources, column, col)
-            case "category":
-                AddCnt(ctgrys, column, col)
-            case "file_size_mb":
-                AddCnt(fileSizes, column, col)
-            case "last_updated":
-                AddCnt(lastUpds, column, col)
-                
-    dfToReturn: dict = {}           
-    match col: #Return correct DataFrame
-        case "source":
-            dfToReturn = sources
-        case "category":
-            dfToReturn = ctgrys
-        case "file_size_mb":
-            dfToReturn = fileSizes
-        case "last_updated":
-            dfToReturn = lastUpds
-    print(dfToReturn)
-    return pd.DataFrame(dfToReturn)
-
-
-def GetRowCnt(filters: dict) -> int:
+    if col not in _GROUP_COLUMNS:
+        return pd.DataFrame()
+    frame: TableFrame = LoadFrame()
+    return frame.CountFrame(col, frame.Mask(filters))
+
+
+@queryCache.Cached("datasets")
+def GetColSize(filters: FilterSpec | None, col: str) -> pd.DataFrame:
     """
+        Explanation: 
+            Groups the rows matching filters by col and totals file_size_mb for each value in the same hash pass as the counts
         Args:
-            filters (_dict_): Contains filters of form dict[str, function]
+            filters (_FilterSpec | None_): Filter spec built from filters.Range/DateRange/InSet/And
+            col (_str_): Contains column/attribute of Dataset to group by
         Returns:
-            cnt (_int_): Contains number of rows that fulfill filters        
+            df (_df.DataFrame_): Columns col, "Count", "Total Size", "Mean Size", "Max Size", sorted by col, empty if col cannot be grouped by
     """
-    datasets: list[Dataset] = GetDatasets()
-    cnt: int = 0
-    for metadata in datasets:
-        if CheckFilters(filters, metadata):
-            cnt += 1
-    
-    return cnt
+    if col not in _GROUP_COLUMNS:
+        return pd.DataFrame()
+    frame: TableFrame = LoadFrame()
+    aggregates: dict[str, tuple[str, str]] = {"Total Size": ("file_size_mb", "sum"), "Mean Size": ("file_size_mb", "mean"), "Max Size": ("file_size_mb", "max")}
+    return frame.GroupBy(col, frame.Mask(filters), aggregates)
 
 
-def GetIDs(datasets: list[Dataset]) -> list[int]:
+@queryCache.Cached("datasets")
+def GetRowCnt(filters: FilterSpec | None) -> int:
     """
         Args:
-            Datasets (_list[Dataset]_): List of all Datasets
+            filters (_FilterSpec | None_): Filter spec built from filters.Range/DateRange/InSet/And
         Returns:
-            ids (_list[int]_): Contains list of all ids in Datasets
+            cnt (_int_): Contains number of rows that fulfill filters
     """
-    ids: list[int] = []
-    for dataset in datasets:
-        ids.append(dataset.GetID())
-    return ids
+    return LoadFrame().CountWhere(filters)
 
 
-def CheckID(datasets: list[Dataset], id: int) -> bool:
-    return True if id in GetIDs(datasets) else False
+def ValidID(id) -> bool:
+    """
+        Returns: (_bool_): True if id is a whole number, typed into a CRUD form or already an int
+    """
+    return str(id).strip().isdigit()
+
+
+def IDExists(id: int) -> bool:
+    """
+        Explanation:
+            Checks id against the primary key index, O(1) for dense ids, without building the whole table
+        Args:
+            id (int): id to look for
+        Returns:
+            bool: True if a row with id exists
+    """
+    return ValidID(id) and LoadKeys().Exists(int(id), LoadSnapshot())
 
 
 def InsertDataset(id: int, name: str, ctgry: str, fileSize: float, source: str, lastUpd: str) -> bool:
@@ -204,82 +168,129 @@ def InsertDataset(id: int, name: str, ctgry: str, fileSize: float, source: str,
             lastUpd (str): date of last update of new dataset
 
         Returns:
-            bool: Returns True if row added, False if not added
+            bool: Returns True if row added, False if not added (id taken or not a number, lastUpd not YYYY-MM-DD)
     """    
-    datasets: list[Dataset] = GetDatasets()
-    metadata: Dataset = Dataset(id, name, ctgry, float(fileSize), source, lastUpd)
-    if CheckID(datasets, id):
+    if not ValidID(id) or not ValidDate(lastUpd):
         return False
-    datasets.append(metadata)
-    WriteDatasets(datasets)
+    row: tuple = (int(id), name, ctgry, float(fileSize), source, lastUpd)
+    with _journal.Lock(): #Check and append as one step so two sessions cannot insert the same id
+        if IDExists(row[0]):
+            return False
+        LogChange("I", row[0], row)
     return True
 
 
-def GetIndex(lst: list[Dataset], target: int) -> int:
+def UpdateDataset(id: int, newId: int, newName: str, newCtgry: str, newFileSize :str, newSource: str, newUpdate: str) -> bool:
     """
         Explanation:
-            Uses BinarySearch algorithm to search for target in most efficient manner
-            For more info go to https://www.geeksforgeeks.org/dsa/binary-search/
-        Args:
-            lst (list[Dataset]): Contains all Datasets
-            target (int): Target to be searched for
-        Returns:
-            int: Index location of target
-    """    
-    low: int = 0
-    high: int = len(lst) - 1
-    while low <= high:
-        mid: int = low + (high - low) // 2
-        if lst[mid].GetID() == target:
-            return mid
-        elif int(lst[mid].GetID()) < target:
-            low = mid + 1
-        else:
-            high = mid - 1
-
-    return -1
-
-
-def UpdateDataset(id: int, newId: int, newName: str, newCtgry: str, newFileSize :str, newSource: str, newUpdate: str) -> None:
-    """
+            Logs the update of id to datasets.journal, Datasets_Metadata is updated on Commit()
         Args:
             id (int): Row containing this id will get updated
             newId (int): id of new row
             newName (str): name of new row
             newCtgry (str): category of new row
             newFileSize (str): file size of new row
+            newSource (str): source of new row
+            newUpdate (str): date of last update of new row
+        Returns:
+            bool: False if id does not exist, newId is not a number, the date is not YYYY-MM-DD or newId belongs to another dataset, else True
     """       
-    datasets: list[Dataset] = GetDatasets()
-    index: int = GetIndex(datasets, int(id))
-    datasets[index] = Dataset(newId, newName, newCtgry, float(newFileSize), newSource, newUpdate)
-    WriteDatasets(datasets)
+    if not ValidID(newId) or not ValidDate(newUpdate):
+        return False
+    row: tuple = (int(newId), newName, newCtgry, float(newFileSize), newSource, newUpdate)
+    with _journal.Lock():
+        if not IDExists(id) or (row[0] != int(id) and IDExists(row[0])):
+            return False
+        LogChange("U", int(id), row)
+    return True
 
 
-def DeleteDataset(id: str):
+def DeleteDataset(id: str) -> bool:
     """
         Explanation:
-            Deletes Dataset after finding index of id and calls WriteDatasets()
+            Logs the deletion of id to datasets.journal, the row is removed from Datasets_Metadata on Commit()
         Args:
             id (str): Contains id of Dataset to be deleted
+        Returns:
+            bool: False if id does not exist, else True
     """    
-    datasets: list[Dataset] = GetDatasets()
-    index: int = GetIndex(datasets, int(id))
-    datasets.remove(datasets[index])
-    WriteDatasets(datasets)
+    with _journal.Lock():
+        if not IDExists(id):
+            return False
+        LogChange("D", int(id), None)
+    return True
 
 
-def IncCount(column: str, dictionary: dict) -> None:
+def InsertDatasets(rows: list[tuple]) -> bool:
     """
         Explanation:
-            Increments dictionary[column] value by 1 if exists, else sets value to 1
+            Inserts every row or none: ids are checked against datasets and against each other, then all rows are journaled in one write
         Args:
-            column (str): Value in dictionary to increment/set
-            dictionary (dict): Dictionary containing various columns
-    """    
-    if column in dictionary:
-        dictionary[column] += 1 #type: ignore
-    else:
-        dictionary[column] = 1 #type: ignore
+            rows (list[tuple]): Rows of form (id, dataset_name, category, file_size_mb, source, last_update)
+        Returns:
+            bool: False if any id is not a number, exists or repeats or any date is not YYYY-MM-DD, else True
+    """
+    if not all(ValidID(row[0]) and ValidDate(row[-1]) for row in rows): #The date is the last column
+        return False
+    records: list[tuple] = [("I", int(row[0]), (int(row[0]),) + tuple(row[1:])) for row in rows]
+    with _journal.Lock():
+        keys: KeyIndex = LoadKeys()
+        snapshot: ColumnarTable = LoadSnapshot()
+        if not Valid(records, lambda id: keys.Exists(id, snapshot)):
+            return False
+        LogChanges(records)
+    return True
+
+
+def UpdateDatasets(ids: list[int], changes: dict[str, Any]) -> bool:
+    """
+        Explanation:
+            Sets the columns in changes on every dataset in ids with one journal write, e.g. UpdateDatasets([1, 2], {"source": "kaggle"})
+            Ids cannot be changed in bulk, UpdateDataset() does that for a single dataset
+        Args:
+            ids (list[int]): ids of the datasets to update
+            changes (dict[str, Any]): Column label to new value
+        Returns:
+            bool: False if any id is not a number, does not exist or repeats or changes names the id or an unknown column or a date that is not YYYY-MM-DD, else True
+    """
+    names: list[str] = [name for name, _ in _COLUMNS]
+    if not all(ValidID(id) for id in ids) or any(_LABELS.get(label) not in names[1:] for label in changes) or len(set(map(int, ids))) != len(ids):
+        return False
+    values: dict[int, Any] = {names.index(_LABELS[label]): val for label, val in changes.items()} #Row position to new value
+    if not ValidDate(values.get(len(names) - 1)): #The date is the last column
+        return False
+    with _journal.Lock():
+        keys: KeyIndex = LoadKeys()
+        snapshot: ColumnarTable = LoadSnapshot()
+        records: list[tuple] = []
+        for id in map(int, ids):
+            row: tuple | None = keys.Row(id, snapshot)
+            if row is None:
+                return False
+            records.append(("U", id, tuple(values.get(col, val) for col, val in enumerate(row))))
+        LogChanges(records)
+    return True
+
+
+def DeleteDatasets(ids: list[int]) -> bool:
+    """
+        Explanation:
+            Deletes every dataset in ids or none, with one journal write
+        Args:
+            ids (list[int]): ids of the datasets to delete
+        Returns:
+            bool: False if any id is not a number, does not exist or repeats, else True
+    """
+    if not all(ValidID(id) for id in ids):
+        return False
+    records: list[tuple] = [("D", int(id), None) for id in ids]
+    with _journal.Lock():
+        keys: KeyIndex = LoadKeys()
+        snapshot: ColumnarTable = LoadSnapshot()
+        if not Valid(records, lambda id: keys.Exists(id, snapshot)):
+            return False
+        LogChanges(records)
+    return True
 
 
 def GetMaxMin(dictionary: dict[str, str | int]) -> None: 
@@ -307,6 +318,7 @@ def GetMaxMin(dictionary: dict[str, str | int]) -> None:
             dictionary["MinCol"] = col
     
 
+@queryCache.Cached("datasets")
 def Metrics() -> tuple[dict, dict]:
     """
         Explanation:  
@@ -316,69 +328,239 @@ def Metrics() -> tuple[dict, dict]:
         Returns:
             ctgrys (dict[str, str | int]): Contains columnName/MaxVal/MaxCol/MinVal/MinCol as keys and Count, values/columnName as values
     """
-    datasets: list[Dataset] = GetDatasets()
+    return MaterializedMetrics()
+
+
+def MetricsOf(frame: TableFrame, mask: np.ndarray) -> tuple:
+    """
+        Explanation: Builds the Metrics() dictionaries from frame's rows selected by mask
+        Returns:
+            tuple[dict[str, str | int]]: Dictionaries containing maximum/minimum column name and value
+    """
+    ctgrys: dict[str, str | int] = frame.CountDict("category", mask) #Dict of form value : count, in first appearance order
+    sources: dict[str, str | int] = frame.CountDict("source", mask)
     
-    ctgrys: dict[str, str | int] = dict() #Dict of form subjectName : dict["Count": 0]
-    sources: dict[str, str | int] = dict()
-
-    for i in range(len(datasets)):
-        dataset = datasets[i]
-        ctgry: str = dataset.GetCtgry()
-        source: str = dataset.GetSource()
-        IncCount(ctgry, ctgrys) #type: ignore
-        IncCount(source, sources) #type: ignore
+    GetMaxMin(ctgrys)
+    GetMaxMin(sources)
+    return ctgrys, sources
+
+
+def MaterializedMetrics() -> tuple:
+    """
+        Explanation: 
+            Builds the Metrics() dictionaries from the materialized whole table counts
+            Only the first call after start up or RebuildSnapshot() scans the datasets, later calls cost O(distinct values)
+        Returns:
+            tuple[dict[str, str | int]]: Dictionaries containing maximum/minimum column name and value
+    """
+    while True:
+        frame: TableFrame | None = None if _counts.IsBuilt() else LoadFrame() #Loaded outside the journal lock, building a frame takes the store's build lock first
+        with _journal.Lock(): #Writes adjust the counts under the same lock, so a build from the current frame cannot miss one
+            if frame is not None and not _counts.IsBuilt() and _store.IsCurrent(frame):
+                _counts.Build(frame)
+            if _counts.IsBuilt():
+                ctgrys: dict[str, str | int] = _counts.Counts("category") #Dict of form value : count
+                sources: dict[str, str | int] = _counts.Counts("source")
+                break
     
     GetMaxMin(ctgrys)
     GetMaxMin(sources)
+
     return ctgrys, sources
 
 
-def GetDatasets() -> list[Dataset]:
+@queryCache.Cached("datasets")
+def DashboardQuery(filters: FilterSpec | None, counts: tuple = _GROUP_COLUMNS) -> DashboardResult:
+    """
+        Explanation:
+            Computes everything an Analysis tab render needs (row count, column counts, metrics) from one frame and one filter mask,
+            instead of every widget loading and scanning the table again
+            Metrics cover every dataset, as Metrics() always has
+        Args:
+            filters (_FilterSpec | None_): Filter spec built from filters.Range/DateRange/InSet/And
+            counts (_tuple_): Columns to count for the charts
+        Returns:
+            result (_DashboardResult_): Bundle the widgets read from
+    """
+    frame: TableFrame = LoadFrame()
+    mask: np.ndarray = frame.Mask(filters)
+    colCounts: dict[str, pd.DataFrame] = {col: frame.CountFrame(col, mask) for col in counts if col in _GROUP_COLUMNS}
+    return DashboardResult(frame.Count(mask), colCounts, MaterializedMetrics())
+
+
+def LoadFrame() -> TableFrame:
+    """
+        Explanation:
+            Current datasets frame from the process wide store, read by GetRows/GetRowCnt/GetColCount/Metrics
+            Every session shares it and it is only rebuilt after a write, so reruns do not reread the snapshot or journal
+        Returns:
+            frame (TableFrame): Filterable, countable view of every dataset
+    """
+    return _store.Get()
+
+
+def BuildFrame() -> TableFrame:
+    """
+        Explanation:
+            Column arrays of the last datasets snapshot with datasets.journal replayed over them
+        Returns:
+            frame (TableFrame): Filterable, countable view of every dataset
+    """
+    with _journal.Lock():
+        snapshot: ColumnarTable = LoadSnapshot()
+        records, _ = _journal.Read()
+    return TableFrame(snapshot, records, _LABELS)
+
+
+def LoadSnapshot() -> ColumnarTable:
     """
         Explanation:
-            Uses pickle module to read(Deserialise) Datasets.bin containing Datasets
+            Memory maps the newest datasets snapshot, rebuilds it from Datasets_Metadata if it does not exist
+            Already open snapshots are reused, so this costs a directory listing rather than a full read
         Returns: 
-            Datasets (list[Dataset]): Contains all Datasets
+            snapshot (ColumnarTable): Column arrays of all datasets as of the last snapshot
     """
-    with open(Path("DATA") / "datasets.bin", "rb") as datasetObj:
-        datasets = pickle.load(datasetObj) 
-    return datasets
+    snapshot: ColumnarTable | None = OpenSnapshot(Path("DATA"), "datasets")
+    return snapshot if snapshot is not None else RebuildSnapshot()
 
 
-def WriteDatasets(Datasets: list[Dataset]):
+def RebuildSnapshot() -> ColumnarTable:
+    """
+        Explanation:
+            Commits pending changes, then writes a fresh datasets snapshot from Datasets_Metadata and empties datasets.journal
+        Returns: 
+            snapshot (ColumnarTable): Column arrays of all datasets
+    """
+    dbMgr = DatabaseManager(str(Path("DATA") / "intelligence_platform.db"), concurrent = True)
+    with _journal.Lock():
+        if OpenSnapshot(Path("DATA"), "datasets") is not None: #Without a snapshot there is nothing to replay changes over
+            Commit()
+        WriteDatasets(dbMgr.FetchIter("SELECT id, dataset_name, category, file_size_mb, source, last_update FROM Datasets_Metadata ORDER BY id"))
+        _journal.Reset()
+        _counts.Reset()
+        _keys.Reset()
+        _search.Sync() #Only the rows the database changed, the index already follows the journal
+        _store.Bump()
+        queryCache.Bump("datasets") #Rows now come from the database, which may have changed outside the app
+        return OpenSnapshot(Path("DATA"), "datasets") #type: ignore
+
+
+def LogChange(op: str, id: int, row: tuple | None) -> None:
     """
+        Explanation:
+            Appends one change to datasets.journal (O(1)) instead of rewriting the snapshot
+            Once the journal passes its size threshold it is folded into a new snapshot on a background thread
         Args:
-            Datasets (list[Dataset]): Contains all Datasets in Datasets.bin
+            op (str): "I" (insert), "U" (update), "D" (delete) or "C" (committed to the database)
+            id (int): id of the changed row, the old id for updates
+            row (tuple | None): New row values, None for delete
+    """
+    LogChanges([(op, id, row)])
+
+
+def LogChanges(records: list[tuple]) -> None:
+    """
+        Explanation:
+            Appends records of form (op, id, row) to datasets.journal in one write, then brings the key index, counts and caches up to date
+            Callers hold the journal lock and have validated the records
+    """
+    keys: KeyIndex = LoadKeys() #Loaded before appending, so it does not already contain records
+    snapshot: ColumnarTable = LoadSnapshot()
+    appended: bool = _journal.AppendMany(records)
+    for op, id, row in records:
+        old: tuple | None = keys.Row(id, snapshot) if op in ("U", "D") and _counts.IsBuilt() else None
+        keys.Apply(op, id, row)
+        if op != "C":
+            _counts.Apply(old, row)
+    _search.Apply(records)
+    if any(op != "C" for op, _, _ in records): #Commits do not change the rows, every other record does
+        queryCache.Bump("datasets")
+        _store.Bump()
+    if appended:
+        _journal.CompactInBackground(LoadSnapshot, Fold, WriteCompacted)
+
+
+def LoadKeys() -> KeyIndex:
+    """
+        Explanation: Builds the primary key index from datasets.journal the first time it is needed, later writes keep it current
+    """
+    with _journal.Lock():
+        LoadSnapshot() #May rebuild the snapshot, which resets the index
+        if not _keys.IsLoaded():
+            records, _ = _journal.Read()
+            _keys.Load(records)
+        return _keys
+
+
+def LoadSearch() -> SearchIndex:
+    """
+        Explanation: Builds the full text index from the datasets snapshot and journal if it does not exist yet, later writes keep it current
+    """
+    with _journal.Lock():
+        snapshot: ColumnarTable = LoadSnapshot()
+        if not _search.IsBuilt():
+            records, _ = _journal.Read()
+            _search.Build(zip(snapshot.Array("id").tolist(), snapshot.Decode("dataset_name")), records)
+        return _search
+
+
+def Fold(snapshot: ColumnarTable, records: list[tuple]) -> tuple[list[tuple], set[int]]:
+    """
+        Returns: (_tuple_): Rows of snapshot with records replayed, and the ids still waiting for Commit()
+    """
+    return Replay(snapshot.Rows(), records), Dirty(snapshot.meta.get("dirty", ()), records)
+
+
+def WriteCompacted(state: tuple[list[tuple], set[int]]) -> None:
+    """
+        Explanation:
+            Writes the snapshot a compaction folded with Fold(), called under the journal lock
+            The key index is dropped too, the next LoadKeys() rebuilds it from the records left in datasets.journal, so it does not grow until a full rebuild
+    """
+    WriteDatasets(*state)
+    _keys.Reset()
+
+
+def WriteDatasets(rows, dirty = ()) -> None:
+    """
+        Explanation:
+            Writes rows as the next datasets snapshot generation (DATA/datasets.NNNNNN.snap), older generations are removed
+        Args:
+            rows (Iterable[tuple]): Row tuples in _COLUMNS order
+            dirty (Iterable[int]): Ids not yet committed to Datasets_Metadata, kept in the snapshot header so compaction does not lose them
     """    
-    with open(Path("DATA") / "datasets.bin", "wb") as datasetObj:
-        pickle.dump(Datasets, datasetObj)
-        
+    WriteSnapshot(Path("DATA"), "datasets", _COLUMNS, rows, {"dirty": sorted(dirty)})
+
 
 def Commit():
     """
         Explanation:
-            Commits all changes made to Datasets after logging out
-            Iterates through every Dataset and adds Dataset to IT_Datasets in intelligence_platform.db
-    """
-    Datasets = GetDatasets()
-    dbMgr = DatabaseManager(str(Path("DATA") / "intelligence_platform.db"))
-    dbMgr.Exec("DELETE FROM Datasets_Metadata") #Truncating entire table
-    for dataset in Datasets:
-        dbMgr.Exec("INSERT INTO Datasets_Metadata (id, dataset_name, category, file_size_mb) VALUES (?, ?, ?, ?, ?)", (dataset.GetID(), dataset.GetName(), dataset.GetCtgry(), dataset.GetFileSize()) )
+            Commits all changes made to datasets after logging out
+            Only rows inserted, updated or deleted since the last commit are written, as upserts and deletes inside one transaction
+    """
+    dbMgr = DatabaseManager(str(Path("DATA") / "intelligence_platform.db"), concurrent = True)
+    with _journal.Lock():
+        snapshot: ColumnarTable = LoadSnapshot()
+        records, _ = _journal.Read()
+        dirty: list[int] = sorted(Dirty(snapshot.meta.get("dirty", ()), records))
+        if not dirty:
+            return
+        current: dict[int, tuple] = {row[0]: row for row in Replay(snapshot.Lookup(dirty), records)} #Latest values of the dirty rows only
+        with dbMgr.Transaction():
+            dbMgr.ExecMany("DELETE FROM Datasets_Metadata WHERE id = ?", ((id,) for id in dirty if id not in current))
+            dbMgr.ExecMany("INSERT INTO Datasets_Metadata (id, dataset_name, category, file_size_mb, source, last_update) VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(id) DO UPDATE SET dataset_name = excluded.dataset_name, category = excluded.category, file_size_mb = excluded.file_size_mb, source = excluded.source, last_update = excluded.last_update", (current[id] for id in dirty if id in current))
+        LogChange("C", 0, None)
     
     dbMgr.Close()
     
 
 def TransferCSV():
     DB_PATH: str = str(Path("DATA") / "intelligence_platform.db")
-    dbMgr = DatabaseManager(DB_PATH)
+    dbMgr = DatabaseManager(DB_PATH, concurrent = True)
     with open(Path("DATA/datasets_metadata.csv")) as itFile:
         reader = csv.reader(itFile)
-        header: bool = False
-        for row in reader:
-            if header == False:
-                header = True
-                continue
-            dbMgr.Exec("INSERT INTO Datasets_Metadata (id, dataset_name, category, file_size_mb, source, last_update) VALUES (?, ?, ?, ?, ?, ?)", (int(row[0]), row[1], row[2], float(row[3]), row[4], row[5]))
+        next(reader, None) #Skip header
+        with dbMgr.Transaction():
+            dbMgr.ExecMany("INSERT INTO Datasets_Metadata (id, dataset_name, category, file_size_mb, source, last_update) VALUES (?, ?, ?, ?, ?, ?)", ((int(row[0]), row[1], row[2], float(row[3]), row[4], row[5]) for row in reader))
         
     dbMgr.Close()
\ No newline at end of file
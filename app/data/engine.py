@@ -0,0 +1,421 @@
+from app.data.columnar import ColumnarTable, DateToDay, DaysToDates
+from app.data.journal import Replay
+from app.data.filters import FilterSpec, Range, InSet, Conditions
+from typing import Any
+import numpy as np
+import pandas as pd
+
+
+class TableFrame:
+    """
+        One table as NumPy columns: the snapshot arrays with the journal replayed over them.
+        Filters are evaluated as boolean masks and counts come from pandas' hash based value_counts,
+        so nothing loops over rows in Python. Categorical columns stay as int32 codes until results are returned.
+    """
+    def __init__(self, snapshot: ColumnarTable, records: list[tuple], labels: dict[str, str]) -> None:
+        """
+            Args:
+                snapshot (_ColumnarTable_): Last snapshot of the table
+                records (_list[tuple]_): Journal records to replay over snapshot
+                labels (_dict[str, str]_): Filter/DataFrame label to snapshot column, e.g. {"last_updated": "last_update"}
+        """
+        self.__snapshot: ColumnarTable = snapshot
+        self.__labels: dict[str, str] = labels
+        self.__kinds: dict[str, str] = dict(snapshot.schema)
+        self.__categories: dict[str, list] = {name: snapshot.Categories(name) for name, kind in snapshot.schema if kind == "cat"}
+        self.__overlay: list[tuple] = []
+        self.__arrays: dict[str, np.ndarray] = {name: snapshot.Array(name) for name, kind in snapshot.schema if kind != "str"}
+        self.__source: np.ndarray = np.arange(snapshot.rowCount) #Snapshot position of each row, -1 - i for overlay row i
+        self.__rowOf: np.ndarray | None = None #Inverse of __source, built the first time an overlaid frame uses a date index
+        self.__replayed: bool = False #True once journal records have been overlaid
+
+        touched: list[int] = sorted({id for op, id, _ in records if op != "C"} | {row[0] for _, _, row in records if row is not None}) #Every id a record inserts, updates or deletes
+        if touched:
+            self.__Overlay(touched, records)
+        self.rowCount: int = len(self.__source)
+
+
+    def __Overlay(self, touched: list[int], records: list[tuple]) -> None:
+        """
+            Explanation:
+                Drops the snapshot rows of touched ids and appends their replayed versions, then restores id order
+                Costs O(rows) array work once per frame, the replay itself only covers the touched rows
+        """
+        snapshot: ColumnarTable = self.__snapshot
+        idName: str = snapshot.schema[0][0]
+        keep: np.ndarray = np.ones(snapshot.rowCount, dtype = bool)
+        keep[snapshot.Positions(touched)] = False
+        self.__overlay = Replay(snapshot.Lookup(touched), records)
+        self.__replayed = True
+
+        for column, (name, kind) in enumerate(snapshot.schema):
+            if kind == "str":
+                continue
+            values: list = [row[column] for row in self.__overlay]
+            match kind:
+                case "int":
+                    extra = np.array(values, dtype = np.int64)
+                case "float":
+                    extra = np.array([np.nan if val is None else val for val in values], dtype = np.float64)
+                case "date":
+                    extra = np.array([DateToDay(val) for val in values], dtype = np.int32)
+                case _:
+                    categories: list = list(self.__categories[name])
+                    codes: dict = {val: code for code, val in enumerate(categories)}
+                    extra = np.array([-1 if val is None else codes.setdefault(val, len(codes)) for val in values], dtype = np.int32)
+                    self.__categories[name] = list(codes)
+            self.__arrays[name] = np.concatenate((self.__arrays[name][keep], extra))
+        self.__source = np.concatenate((self.__source[keep], -1 - np.arange(len(self.__overlay))))
+
+        order: np.ndarray = np.argsort(self.__arrays[idName], kind = "stable")
+        self.__arrays = {name: array[order] for name, array in self.__arrays.items()}
+        self.__source = self.__source[order]
+
+
+    def __Column(self, label: str) -> str:
+        if label not in self.__labels:
+            raise ValueError(f"Unknown column {label!r}")
+        return self.__labels[label]
+
+
+    def Mask(self, filters: FilterSpec | None) -> np.ndarray:
+        """
+            Explanation:
+                Evaluates filters (Range, DateRange, InSet or an And of them) as one boolean mask
+                Rows are kept in id order, so id ranges are two bisects giving a window of rows, the other conditions are only evaluated inside it
+                Date ranges bisect the snapshot's sorted date index. Multiselects on categorical columns are ORs of the snapshot's bitmaps,
+                ANDed across columns and unpacked once, other multiselects compare values
+            Args:
+                filters (_FilterSpec | None_): Filter spec, None matches every row
+            Returns:
+                mask (_np.ndarray_): True for every row that passes all filters
+        """
+        idName: str = self.__snapshot.schema[0][0]
+        ids: np.ndarray = self.__arrays[idName]
+        start, stop = 0, self.rowCount
+        conditions: list[FilterSpec] = []
+        for condition in Conditions(filters):
+            if isinstance(condition, Range) and self.__Column(condition.GetColumn()) == idName:
+                start = max(start, int(np.searchsorted(ids, condition.GetLow(), side = "left")))
+                stop = min(stop, int(np.searchsorted(ids, condition.GetHigh(), side = "right")))
+            else:
+                conditions.append(condition)
+        stop = max(start, stop)
+        selections: list[tuple[str, list[int]]] = self.__Selections(conditions)
+        conditions = [condition for condition in conditions if not self.__UsesBitmap(condition)]
+
+        window: np.ndarray | None = self.__BitmapMask(selections)[start:stop] if selections else None #Mask of rows start to stop
+        for condition in conditions:
+            label: str = condition.GetColumn() #type: ignore
+            name: str = self.__Column(label)
+            kind: str = self.__kinds[name]
+            if kind == "str":
+                raise ValueError(f"Cannot filter on text column {label!r}")
+            array: np.ndarray = self.__arrays[name][start:stop]
+            match condition, kind:
+                case Range(), "date":
+                    part: np.ndarray = self.__DayMask(name, DateToDay(condition.GetLow()), DateToDay(condition.GetHigh()))[start:stop]
+                case Range(), "int" | "float":
+                    part = (array >= condition.GetLow()) & (array <= condition.GetHigh())
+                case InSet(), "cat":
+                    categories: list = self.__categories[name]
+                    part = np.isin(array, [categories.index(val) for val in condition.GetValues() if val in categories])
+                case InSet(), _:
+                    values: tuple = condition.GetValues()
+                    part = np.isin(array, [DateToDay(val) for val in values] if kind == "date" else list(values))
+                case _:
+                    raise ValueError(f"Unsupported filter condition {condition!r} on {label!r}")
+            if window is None:
+                window = part
+            else:
+                window &= part
+
+        if window is None and (start, stop) == (0, self.rowCount):
+            return np.ones(self.rowCount, dtype = bool)
+        mask: np.ndarray = np.zeros(self.rowCount, dtype = bool)
+        mask[start:stop] = True if window is None else window
+        return mask
+
+
+    def __UsesBitmap(self, condition: FilterSpec) -> bool:
+        if not isinstance(condition, InSet):
+            return False
+        name: str = self.__Column(condition.GetColumn())
+        return self.__kinds[name] == "cat" and self.__snapshot.HasBitmap(name)
+
+
+    def __Selections(self, conditions: list[FilterSpec]) -> list[tuple[str, list[int]]]:
+        """
+            Returns: (_list[tuple[str, list[int]]]_): (column, selected codes) of every condition answered by a bitmap index
+        """
+        selections: list[tuple[str, list[int]]] = []
+        for condition in conditions:
+            if self.__UsesBitmap(condition):
+                name: str = self.__Column(condition.GetColumn()) #type: ignore
+                categories: list = self.__categories[name]
+                selections.append((name, [categories.index(val) for val in condition.GetValues() if val in categories])) #type: ignore
+        return selections
+
+
+    def __Packed(self, selections: list[tuple[str, list[int]]]) -> np.ndarray:
+        """
+            Returns: (_np.ndarray_): Packed bits of the snapshot rows passing every selection, OR within a column and AND across
+        """
+        packed: np.ndarray | None = None
+        for name, codes in selections:
+            bits: np.ndarray = self.__snapshot.Bitmap(name, codes) #type: ignore
+            packed = bits if packed is None else packed & bits
+        return packed #type: ignore
+
+
+    def __BitmapMask(self, selections: list[tuple[str, list[int]]]) -> np.ndarray:
+        """
+            Explanation: Unpacks the combined bitmaps once, rows from the journal overlay compare their codes directly
+            Returns: (_np.ndarray_): True for every row passing every selection
+        """
+        inSnapshot: np.ndarray = np.unpackbits(self.__Packed(selections), count = self.__snapshot.rowCount).view(bool)
+        if not self.__replayed:
+            return inSnapshot
+        rows: np.ndarray = np.zeros(self.rowCount, dtype = bool)
+        fromSnapshot: np.ndarray = self.__source >= 0
+        rows[fromSnapshot] = inSnapshot[self.__source[fromSnapshot]]
+        overlay: np.ndarray = np.flatnonzero(~fromSnapshot)
+        match: np.ndarray = np.ones(len(overlay), dtype = bool)
+        for name, codes in selections:
+            match &= np.isin(self.__arrays[name][overlay], codes)
+        rows[overlay] = match
+        return rows
+
+
+    def __DayMask(self, name: str, low: int, high: int) -> np.ndarray:
+        """
+            Explanation:
+                Resolves low <= day <= high with a bisect of the snapshot's sorted date index, which gives the matching rows as one slice
+                Rows from the journal overlay are compared directly. A range covering much of the table is cheaper to compare than to scatter
+            Returns: (_np.ndarray_): True for every row dated within the range
+        """
+        positions: np.ndarray = self.__snapshot.DayRange(name, low, high)
+        if len(positions) * 8 > self.rowCount:
+            array: np.ndarray = self.__arrays[name]
+            return (array >= low) & (array <= high)
+        inRange: np.ndarray = np.zeros(self.rowCount, dtype = bool)
+        if not self.__replayed: #Frame rows are the snapshot rows
+            inRange[positions] = True
+            return inRange
+        if self.__rowOf is None:
+            fromSnapshot: np.ndarray = self.__source >= 0
+            self.__rowOf = np.full(self.__snapshot.rowCount, -1, dtype = np.int64)
+            self.__rowOf[self.__source[fromSnapshot]] = np.flatnonzero(fromSnapshot)
+        rows: np.ndarray = self.__rowOf[positions]
+        inRange[rows[rows >= 0]] = True #Rows dropped for a journal record are -1
+        overlay: np.ndarray = np.flatnonzero(self.__source < 0)
+        days: np.ndarray = self.__arrays[name][overlay]
+        inRange[overlay] = (days >= low) & (days <= high)
+        return inRange
+
+
+    def __Decode(self, name: str, mask: np.ndarray) -> np.ndarray:
+        """
+            Returns: (_np.ndarray_): Values of column name for the rows selected by mask, text as Python str objects
+        """
+        kind: str = self.__kinds[name]
+        if kind == "str": #Only text is left in the snapshot, read straight from its heap
+            source: np.ndarray = self.__source[mask]
+            fromSnapshot: np.ndarray = source >= 0
+            if fromSnapshot.all():
+                return np.array(self.__snapshot.Decode(name, source), dtype = object)
+            column: int = [col for col, _ in self.__snapshot.schema].index(name)
+            values: np.ndarray = np.empty(len(source), dtype = object)
+            values[fromSnapshot] = self.__snapshot.Decode(name, source[fromSnapshot])
+            values[~fromSnapshot] = [self.__overlay[-1 - i][column] for i in source[~fromSnapshot].tolist()]
+            return values
+        return self.__DecodeValues(name, self.__arrays[name][mask])
+
+
+    def __DecodeValues(self, name: str, array: np.ndarray) -> np.ndarray:
+        match self.__kinds[name]:
+            case "date":
+                return DaysToDates(array)
+            case "cat":
+                return np.array(self.__categories[name] + [None], dtype = object)[array] #Code -1 indexes the trailing None
+            case _:
+                return array
+
+
+    def Rows(self, mask: np.ndarray, labels: list[str]) -> pd.DataFrame:
+        """
+            Args:
+                mask (_np.ndarray_): Rows to return, from Mask()
+                labels (_list[str]_): DataFrame column labels in order
+            Returns:
+                df (_pd.DataFrame_): Selected rows in id order
+        """
+        if not mask.any():
+            return pd.DataFrame([], columns = labels)
+        return pd.DataFrame({label: self.__Decode(self.__Column(label), mask) for label in labels}, columns = labels)
+
+
+    def Page(self, mask: np.ndarray, labels: list[str], sortBy: str, descending: bool = False, after: tuple | None = None, size: int = 50) -> tuple[pd.DataFrame, tuple | None]:
+        """
+            Explanation:
+                One page of the masked rows, ordered by sortBy with the id breaking ties, using keyset pagination:
+                after is the (sort key, id) of the last row of the previous page, so a page never depends on how many rows came before it
+                Only the rows of the page are decoded. Sorting by id is two bisects since rows are kept in id order
+            Args:
+                mask (_np.ndarray_): Rows to page through, from Mask()
+                labels (_list[str]_): DataFrame column labels in order
+                sortBy (_str_): Column label to sort by, text columns cannot be sorted
+                descending (_bool_): Sort largest first
+                after (_tuple | None_): Cursor returned with the previous page, None for the first page
+                size (_int_): Rows per page
+            Returns:
+                df (_pd.DataFrame_): Rows of the page
+                cursor (_tuple | None_): Pass as after to get the next page, None on the last page
+        """
+        idName: str = self.__snapshot.schema[0][0]
+        name: str = self.__Column(sortBy)
+        rows: np.ndarray = np.flatnonzero(mask)
+        ids: np.ndarray = self.__arrays[idName][rows]
+        if name == idName:
+            keys: np.ndarray = ids
+            cut: int = len(rows) if descending else 0
+            if after is not None:
+                cut = int(np.searchsorted(ids, after[1], side = "left" if descending else "right"))
+            order: np.ndarray = np.arange(cut - 1, max(cut - size - 2, -1), -1) if descending else np.arange(cut, min(cut + size + 1, len(rows)))
+        else:
+            keys = self.__SortKeys(name)[rows]
+            order = np.lexsort((ids, keys))
+            if descending:
+                order = order[::-1]
+            if after is not None:
+                key, id = after
+                later: np.ndarray = ((keys < key) | ((keys == key) & (ids < id))) if descending else ((keys > key) | ((keys == key) & (ids > id)))
+                order = order[later[order]]
+            order = order[:size + 1]
+
+        cursor: tuple | None = None
+        if len(order) > size: #One row past the page tells whether another page follows
+            order = order[:size]
+            cursor = (keys[order[-1]].item(), ids[order[-1]].item())
+        if not len(order):
+            return pd.DataFrame([], columns = labels), None
+        positions: np.ndarray = rows[order]
+        return pd.DataFrame({label: self.__Decode(self.__Column(label), positions) for label in labels}, columns = labels), cursor
+
+
+    def __SortKeys(self, name: str) -> np.ndarray:
+        """
+            Returns: (_np.ndarray_): Column name as numbers ordered like its values, categories by their rank and missing values first
+        """
+        if self.__kinds[name] == "str":
+            raise ValueError(f"Cannot sort by text column {name!r}")
+        array: np.ndarray = self.__arrays[name]
+        match self.__kinds[name]:
+            case "cat":
+                categories: list = self.__categories[name]
+                ranks: np.ndarray = np.empty(len(categories) + 1, dtype = np.int32)
+                ranks[sorted(range(len(categories)), key = lambda code: (categories[code] is not None, str(categories[code])))] = np.arange(len(categories))
+                ranks[-1] = -1 #Code -1 (None) indexes the trailing rank
+                return ranks[array]
+            case "float":
+                return np.where(np.isnan(array), -np.inf, array)
+            case _:
+                return array
+
+
+    def Count(self, mask: np.ndarray) -> int:
+        return int(np.count_nonzero(mask))
+
+
+    def CountWhere(self, filters: FilterSpec | None) -> int:
+        """
+            Explanation: Rows passing filters. When every condition is a bitmap indexed multiselect this is a popcount of the packed bits
+        """
+        conditions: tuple[FilterSpec, ...] = Conditions(filters)
+        if conditions and not self.__replayed and all(self.__UsesBitmap(condition) for condition in conditions):
+            return int(np.bitwise_count(self.__Packed(self.__Selections(list(conditions)))).sum())
+        return self.Count(self.Mask(filters))
+
+
+    def ValueCounts(self, label: str, mask: np.ndarray) -> tuple[list, list[int]]:
+        """
+            Explanation:
+                Counts each distinct value of label among the masked rows with a single hash pass over the encoded column
+                Values come back in order of first appearance, the order the per row loops used to produce
+            Returns:
+                values (_list_): Distinct values
+                counts (_list[int]_): Number of rows holding each value
+        """
+        name: str = self.__Column(label)
+        if self.__kinds[name] == "str":
+            raise ValueError(f"Cannot group by text column {label!r}")
+        counts: pd.Series = pd.Series(self.__arrays[name][mask]).value_counts(sort = False)
+        return self.__DecodeValues(name, counts.index.to_numpy()).tolist(), counts.tolist()
+
+
+    def GroupBy(self, label: str, mask: np.ndarray, aggregates: dict[str, tuple[str, str]] | None = None) -> pd.DataFrame:
+        """
+            Explanation:
+                Groups the masked rows by label and aggregates numeric columns per group
+                Groups are found with one hash pass (pd.factorize) over the encoded column, so cost stays linear in rows
+                Missing values are skipped by sum/min/max/mean, the same as pandas
+            Args:
+                label (_str_): Column to group by
+                mask (_np.ndarray_): Rows to include, from Mask()
+                aggregates (_dict[str, tuple[str, str]] | None_): Output column to (label, "count" | "sum" | "min" | "max" | "mean"),
+                    e.g. {"Total Size": ("file_size_mb", "sum")}
+            Returns:
+                df (_pd.DataFrame_): Columns label, "Count" and one per aggregate, sorted by label with missing values last
+        """
+        name: str = self.__Column(label)
+        if self.__kinds[name] == "str":
+            raise ValueError(f"Cannot group by text column {label!r}")
+        codes, groups = pd.factorize(self.__arrays[name][mask], use_na_sentinel = False)
+        result: dict[str, Any] = {label: self.__DecodeValues(name, np.asarray(groups)), "Count": np.bincount(codes, minlength = len(groups))}
+
+        for output, (column, func) in (aggregates or {}).items():
+            valueName: str = self.__Column(column)
+            if self.__kinds[valueName] not in ("int", "float"):
+                raise ValueError(f"Cannot aggregate non numeric column {column!r}")
+            if func not in ("count", "sum", "min", "max", "mean"):
+                raise ValueError(f"Unsupported aggregate {func!r}")
+            values: pd.Series = pd.Series(self.__arrays[valueName][mask])
+            result[output] = values.groupby(codes).agg(func).reindex(range(len(groups))).to_numpy()
+
+        df: pd.DataFrame = pd.DataFrame(result)
+        return df.sort_values(label, kind = "stable", na_position = "last", ignore_index = True)
+
+
+    def CountFrame(self, label: str, mask: np.ndarray) -> pd.DataFrame:
+        """
+            Returns: (_pd.DataFrame_): Columns label and "Count" sorted by label, the DataFrame GetColCount() returns
+        """
+        return self.GroupBy(label, mask)
+
+
+    def CountDict(self, label: str, mask: np.ndarray) -> dict[Any, int]:
+        """
+            Returns: (_dict_): {value: count} in first appearance order
+        """
+        values, counts = self.ValueCounts(label, mask)
+        return dict(zip(values, counts))
+
+
+class DashboardResult:
+    """
+        Everything one render of an Analysis tab shows, computed by a data module's DashboardQuery()
+        from a single frame and a single filter mask. Widgets read from here instead of querying again.
+        Rows are not included, the table fetches only the page it shows with GetPage()
+    """
+    def __init__(self, rowCount: int, colCounts: dict[str, pd.DataFrame], metrics: tuple) -> None:
+        self.__rowCount: int = rowCount
+        self.__colCounts: dict[str, pd.DataFrame] = colCounts
+        self.__metrics: tuple = metrics
+
+    #Get Functions
+    def GetRowCnt(self) -> int:
+        return self.__rowCount
+    def GetColCount(self, col: str) -> pd.DataFrame:
+        return self.__colCounts.get(col, pd.DataFrame())
+    def GetMetrics(self) -> tuple:
+        return self.__metrics
@@ -0,0 +1,167 @@
+from abc import ABC, abstractmethod
+from datetime import date
+from typing import Any, Iterable
+
+
+MAX_IDS: int = 10000 #Most rows one bulk action may change, see ParseIDs()
+
+
+class FilterSpec(ABC):
+    """
+        Base of every filter. Specs are immutable values: two specs describing the same filter compare equal and hash the same,
+        so they can be used as cache keys, compared between reruns and compiled to SQL or NumPy masks.
+        Key() is abstract, a spec that does not define it fails when it is constructed instead of when it is first hashed
+    """
+    __slots__ = ()
+
+    @abstractmethod
+    def Key(self) -> tuple:
+        """
+            Returns: (_tuple_): Hashable description of the filter, equal for equal filters
+        """
+
+    def Conditions(self) -> tuple["FilterSpec", ...]:
+        """
+            Returns: (_tuple[FilterSpec, ...]_): Single column conditions that must all hold
+        """
+        return (self,)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, FilterSpec) and self.Key() == other.Key()
+
+    def __hash__(self) -> int:
+        return hash(self.Key())
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}{self.Key()[1:]}"
+
+
+class Range(FilterSpec):
+    """
+        Matches low <= column <= high
+    """
+    __slots__ = ("__column", "__low", "__high")
+
+    def __init__(self, column: str, low: Any, high: Any) -> None:
+        self.__column: str = column
+        self.__low: Any = low
+        self.__high: Any = high
+
+    #Get Functions
+    def GetColumn(self) -> str:
+        return self.__column
+    def GetLow(self) -> Any:
+        return self.__low
+    def GetHigh(self) -> Any:
+        return self.__high
+
+    def Key(self) -> tuple:
+        return (type(self).__name__, self.__column, self.__low, self.__high)
+
+
+class DateRange(Range):
+    """
+        Matches start <= column <= stop for a date column, dates are kept as YYYY-MM-DD strings
+    """
+    __slots__ = ()
+
+    def __init__(self, column: str, start: str | date, stop: str | date) -> None:
+        super().__init__(column, str(start), str(stop)) #date.__str__ is YYYY-MM-DD
+
+
+class InSet(FilterSpec):
+    """
+        Matches a column holding any of values, an empty set matches nothing
+    """
+    __slots__ = ("__column", "__values")
+
+    def __init__(self, column: str, values: Iterable[Any]) -> None:
+        self.__column: str = column
+        self.__values: tuple = tuple(sorted(set(values), key = str)) #Selection order does not change the filter
+
+    #Get Functions
+    def GetColumn(self) -> str:
+        return self.__column
+    def GetValues(self) -> tuple:
+        return self.__values
+
+    def Key(self) -> tuple:
+        return ("InSet", self.__column, self.__values)
+
+
+class And(FilterSpec):
+    """
+        Matches rows passing every spec. Nested Ands are flattened and None is skipped, so And() matches everything
+    """
+    __slots__ = ("__specs",)
+
+    def __init__(self, *specs: FilterSpec | None) -> None:
+        conditions: list[FilterSpec] = [cond for spec in specs if spec is not None for cond in spec.Conditions()]
+        self.__specs: tuple[FilterSpec, ...] = tuple(sorted(set(conditions), key = repr)) #Order and duplicates do not change the filter
+
+    def Conditions(self) -> tuple[FilterSpec, ...]:
+        return self.__specs
+
+    def Key(self) -> tuple:
+        return ("And",) + tuple(spec.Key() for spec in self.__specs)
+
+    def __len__(self) -> int:
+        return len(self.__specs)
+
+
+def Conditions(filters: FilterSpec | None) -> tuple[FilterSpec, ...]:
+    """
+        Returns: (_tuple[FilterSpec, ...]_): Single column conditions of filters, () for no filter
+    """
+    return () if filters is None else filters.Conditions()
+
+
+def Where(filters: FilterSpec | None, columns: dict[str, str]) -> tuple[str, tuple]:
+    """
+        Explanation:
+            Compiles filters into a parameterised WHERE clause, conditions are ANDed
+            Only column names found in columns are written into the SQL, every value is bound as a parameter
+        Args:
+            filters (_FilterSpec | None_): Range, DateRange, InSet or an And of them
+            columns (_dict[str, str]_): Filter column to SQL column, e.g. {"last_updated": "last_update"}
+        Returns:
+            where (_str_): "" if there are no filters, else " WHERE ..."
+            params (_tuple_): Values for the placeholders in where
+    """
+    clauses: list[str] = []
+    params: list[Any] = []
+    for condition in Conditions(filters):
+        key: str = condition.GetColumn() #type: ignore
+        if key not in columns:
+            raise ValueError(f"Cannot filter on unknown column {key!r}")
+        column: str = columns[key]
+        match condition:
+            case Range():
+                clauses.append(f"{column} BETWEEN ? AND ?")
+                params += [condition.GetLow(), condition.GetHigh()]
+            case InSet() if condition.GetValues():
+                clauses.append(f"{column} IN ({', '.join('?' * len(condition.GetValues()))})")
+                params += condition.GetValues()
+            case InSet(): #Nothing selected matches nothing
+                clauses.append("0")
+            case _:
+                raise ValueError(f"Unsupported filter condition {condition!r}")
+    if not clauses:
+        return "", ()
+    return " WHERE " + " AND ".join(clauses), tuple(params)
+
+
+def ParseIDs(text: str) -> list[int] | None:
+    """
+        Explanation: Parses comma separated ids and inclusive ranges typed into a bulk action, e.g. "3, 7, 10-20"
+        Returns: (_list[int] | None_): Ids in the order typed without repeats, None if text is malformed
+    """
+    ids: dict[int, None] = {}
+    for part in text.split(","):
+        if not part.strip():
+            continue
+        low, dash, high = (val.strip() for val in part.partition("-"))
+        if not low.isdigit() or (dash and not high.isdigit()):
+            return None
+        ids.update(dict.fromkeys(range(int(low), min(int(high or low), int(low) + MAX_IDS) + 1))) #Stops one past MAX_IDS, enough for the caller to reject it
+    return list(ids)
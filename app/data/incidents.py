@@ -1,191 +1,141 @@
 from app.services.database_manager import DatabaseManager
-from models.incidents import Incident
+from app.data.journal import Journal, Replay, Dirty, Valid
+from app.data.engine import TableFrame, DashboardResult
+from app.data.filters import FilterSpec, Where
+from app.data.cache import queryCache
+from app.data.aggregates import MaterializedCounts
+from app.data.keyindex import KeyIndex
+from app.data.store import TableStore
+from app.data.columnar import ColumnarTable, OpenSnapshot, WriteSnapshot, ValidDate
+from app.data.search import SearchIndex
 from pathlib import Path
 from typing import Any
 import pandas as pd
-import pickle
+import numpy as np
 
 
-def TransferFromDB():
-    """
-        Gets all rows from IT_incidents and creates a list of Incident
-        Returns: itincidents (_list[Incident]_): List containing all incidents in database
-    """
-    dbMgr = DatabaseManager(str(Path("DATA") / "intelligence_platform.db"))
-    df = dbMgr.FetchAll("SELECT * FROM Cyber_Incidents ORDER BY id")
-    cyberIncidents: list[Incident] = []
-    ids: list[int] = df["id"].tolist()
-    incType: list[str] = df["incident_type"].tolist()
-    sevs: list[str] = df["severity"].tolist()
-    stats: list[str] = df["status"].tolist()
-    crDates: list[str] = df["date"].tolist()
-    for i in range(len(df)):
-        incident: Incident = Incident(int(ids[i]), incType[i], sevs[i], stats[i], crDates[i])
-        cyberIncidents.append(incident)
-    
-    return cyberIncidents
+_journal: Journal = Journal(Path("DATA") / "incidents.journal") #Row level changes not yet folded into the incidents snapshot
+_COLUMNS: tuple[tuple[str, str], ...] = (("id", "int"), ("incident_type", "cat"), ("severity", "cat"), ("status", "cat"), ("date", "date")) #Snapshot layout, same order as the row tuples
+_LABELS: dict[str, str] = {"id": "id", "incident_type": "incident_type", "severity": "severity", "status": "status", "date": "date"} #Filter/DataFrame label to column name, the same in the snapshot and in Cyber_Incidents
+_GROUP_COLUMNS: tuple[str, ...] = ("incident_type", "severity", "status", "date") #Columns GetColCount() can group by
+_counts: MaterializedCounts = MaterializedCounts({"incident_type": 1, "severity": 2, "status": 3}) #Whole table counts behind Metrics(), adjusted by every write
+_keys: KeyIndex = KeyIndex() #Rows changed since the snapshot by id, for O(1) CRUD checks
+_store: TableStore = TableStore(lambda: BuildFrame()) #Current frame shared by every session, rebuilt after writes
+_search: SearchIndex = SearchIndex(str(Path("DATA") / "intelligence_platform.db"), "Cyber_Incidents", "id", "incident_type", 1) #Full text index of incident types, kept in step with the journal
 
 
-def GetColumn(col: str, incident: Incident):
+@queryCache.Cached("incidents")
+def GetRows(filters: FilterSpec | None) -> pd.DataFrame:
     """
-        Matches string to respective column value
+        Explanation: 
+            Evaluates filters as one boolean mask over the incidents columns and returns the matching rows
         Args:
-            col (_str_): Contains string form of column
-            inc (_Incident_): Incident to get column value
+            filters (_FilterSpec | None_): Filter spec built from filters.Range/DateRange/InSet/And
         Returns:
-            (_int_ | _str_): Value of incident[col]
+            df (_df.DataFrame_): Contains DataFrame with all rows and labelled columns
     """
-    match col:
-        case "id":
-            return incident.GetID()
-        case "incident_type":
-            return incident.GetIncident()
-        case "severity":
-            return incident.GetSev()
-        case "status":
-            return incident.GetStatus()
-        case "date":
-            return incident.GetCrDate()
-        case _: # * = "All"
-            return incident.GetAll()
+    frame: TableFrame = LoadFrame()
+    return frame.Rows(frame.Mask(filters), list(_LABELS))
 
 
-def CheckFilters(filters: dict | None, incident: Incident):
+def GetCommittedRows(filters: FilterSpec | None) -> pd.DataFrame:
     """
-        Explanation: 
-            Iterates through filters and checks if the function value returns True for all, if one returns False, break and return False
+        Explanation:
+            Same rows and labels as GetRows(), but read from Cyber_Incidents with filters compiled to a parameterised WHERE clause by filters.Where(),
+            so SQLite and the indexes in schema.INDEXES do the filtering. Edits still in incidents.journal are not included until Commit()
         Args:
-            filters (_dict_): Dictionary of form dict[str, function]
-            incident (_Incident_): Incident which filter is being checked on
+            filters (_FilterSpec | None_): Filter spec built from filters.Range/DateRange/InSet/And
         Returns:
-            check (_bool_): If True, passed all filters. If False, failed one filter
-    """
-    if not filters:
-        return True
-    check: bool = True
-    for column in filters:
-        if not filters[column](GetColumn(column, incident)): #type: ignore
-            check = False
-            break
-    
-    return check
+            df (_df.DataFrame_): Committed rows matching filters, ordered by id
+    """
+    where, params = Where(filters, _LABELS)
+    dbMgr = DatabaseManager(str(Path("DATA") / "intelligence_platform.db"), concurrent = True)
+    return dbMgr.FetchAll(f"SELECT {', '.join(f'{col} AS {label}' for label, col in _LABELS.items())} FROM Cyber_Incidents{where} ORDER BY id", params)
 
 
-def AddCnt(hash: dict, col: Any, colName: str) -> None:
+@queryCache.Cached("incidents")
+def GetPage(filters: FilterSpec | None, sortBy: str = "id", descending: bool = False, after: tuple | None = None, size: int = 50) -> tuple[pd.DataFrame, tuple | None]:
     """
-        Explanation:
-            Modifies hash to update col if found or not found
-        Args: 
-            hash (_dict_): Dictionary of type {column: count(column)}
-            col (_Any_): Contains column value of incident
-            colName (_str_): Contains value of x-axis to be shown in charts
+        Explanation: 
+            Returns one page of the incidents matching filters with keyset pagination, only the rows of the page are decoded
+        Args:
+            filters (_FilterSpec | None_): Filter spec built from filters.Range/DateRange/InSet/And
+            sortBy (_str_): Column to sort by, ties broken by id
+            descending (_bool_): Sort largest first
+            after (_tuple | None_): Cursor returned with the previous page, None for the first page
+            size (_int_): Rows per page
+        Returns:
+            df (_df.DataFrame_): Rows of the page with labelled columns
+            cursor (_tuple | None_): after for the next page, None on the last page
     """
-    if col in hash[colName]:
-        index: int = hash[colName].index(col)
-        hash["Count"][index] += 1
-    else:
-        hash[colName].append(col)
-        hash["Count"].append(1)
+    frame: TableFrame = LoadFrame()
+    return frame.Page(frame.Mask(filters), list(_LABELS), sortBy, descending, after, size)
 
 
-def GetRows(filters: dict) -> pd.DataFrame:
+@queryCache.Cached("incidents")
+def Search(query: str, limit: int = 10) -> pd.DataFrame:
     """
         Explanation: 
-            Iterates through all rows of incidents, if filter pass, it appends to dataframe
+            Full text search of incident types through the SQLite FTS5 index, every word must match and the last one may be a prefix
         Args:
-            filters (_dict_): Contains filters of form dict[str, function]
+            query (_str_): Search box text, e.g. "phish att"
+            limit (_int_): Number of matches to return
         Returns:
-            df (_df.DataFrame_): Contains DataFrame with all rows and labelled columns
+            df (_df.DataFrame_): Best matching incidents first, with labelled columns
     """
-    incidents: list[Incident] = GetIncidents()
-    allRows: list = []
-    for incident in incidents:
-        if CheckFilters(filters, incident):
-            allRows.append(GetColumn("*", incident))
-    
-    df: pd.DataFrame = pd.DataFrame(allRows, columns = ["id", "incident_type", "severity", "status", "date"])
-    return df
+    ids: list[int] = LoadSearch().Search(query, limit)
+    keys: KeyIndex = LoadKeys()
+    snapshot: ColumnarTable = LoadSnapshot()
+    rows: list[tuple | None] = [keys.Row(id, snapshot) for id in ids]
+    return pd.DataFrame([row for row in rows if row is not None], columns = list(_LABELS))
 
 
-def GetColCount(filters: dict, col: str) -> pd.DataFrame:
+@queryCache.Cached("incidents")
+def GetColCount(filters: FilterSpec | None, col: str) -> pd.DataFrame:
     """
         Explanation: 
-            Iterates through all rows of incidents, gets number of occurances of each value in col and returns respective dataframe
+            Counts the occurances of each value in col among the rows matching filters with one hash pass over the encoded column
+            Rows are sorted by value, so dates come out in date order for the line chart
         Args:
-            filters (_dict_): Contains filters of form dict[str, function]
+            filters (_FilterSpec | None_): Filter spec built from filters.Range/DateRange/InSet/And
             col (_str_): Contains column/attribute of Incident to get DataFrame from
         Returns:
-            df (_df.DataFrame_): Contains DataFrame with all rows and labelled columns
+            df (_df.DataFrame_): Columns col and "Count", empty if col cannot be grouped by
     """
-    incidents: list[Incident] = GetIncidents() #Create dictionaries
-    incidentTypes: dict[str, list[str | int]] = {col: [], "Count": []}
-    severities: dict[str, list[str | int]] = {col: [], "Count": []}
-    statusS: dict[str, list[str | int]] = {col: [], "Count": []}
-    dates: dict[str, list[str | int]] = {col: [], "Count": []}
-    noIncidents: int = len(incidents)
-    
-    for i in range(noIncidents):
-        incident = incidents[i]
-        if not CheckFilters(filters, incident):
-            print(1)
-            continue
-        
-        column = GetColumn(col, incident) #Get number of occurances of each value in col
-        match col:
-            case "incident_type":
-                AddCnt(incidentTypes, column, col)
-            case "severity":
-                AddCnt(severities, column, col)
-            case "status":
-                AddCnt(statusS, column, col)
-            case "date":
-                AddCnt(dates, column, col)
-                
-    dfToReturn: dict = {}           
-    match col: #Return correct DataFrame
-        case "incident_type":
-                dfToReturn = incidentTypes
-        case "severity":
-                dfToReturn = severities
-        case "status":
-                dfToReturn = statusS
-        case "date":
-                dfToReturn = dates
-    
-    return pd.DataFrame(dfToReturn)
+    if col not in _GROUP_COLUMNS:
+        return pd.DataFrame()
+    frame: TableFrame = LoadFrame()
+    return frame.CountFrame(col, frame.Mask(filters))
 
 
-def GetRowCnt(filters: dict) -> int:
+@queryCache.Cached("incidents")
+def GetRowCnt(filters: FilterSpec | None) -> int:
     """
         Args:
-            filters (_dict_): Contains filters of form dict[str, function]
+            filters (_FilterSpec | None_): Filter spec built from filters.Range/DateRange/InSet/And
         Returns:
-            cnt (_int_): Contains number of rows that fulfill filters        
+            cnt (_int_): Contains number of rows that fulfill filters
     """
-    incidents: list[Incident] = GetIncidents()
-    cnt: int = 0
-    for incident in incidents:
-        if CheckFilters(filters, incident):
-            cnt += 1
-    
-    return cnt
+    return LoadFrame().CountWhere(filters)
 
 
-def GetIDs(incidents: list[Incident]) -> list[int]:
+def ValidID(id) -> bool:
     """
-        Args:
-            incidents (_list[Incident]_): List of all incidents
-        Returns:
-            ids (_list[int]_): Contains list of all ids in incidents
+        Returns: (_bool_): True if id is a whole number, typed into a CRUD form or already an int
     """
-    ids: list[int] = []
-    for incident in incidents:
-        ids.append(incident.GetID())
-    return ids
+    return str(id).strip().isdigit()
 
 
-def CheckID(incidents: list[Incident], id: int) -> bool:
-    return True if id in GetIDs(incidents) else False
+def IDExists(id: int) -> bool:
+    """
+        Explanation:
+            Checks id against the primary key index, O(1) for dense ids, without building the whole table
+        Args:
+            id (int): id to look for
+        Returns:
+            bool: True if a row with id exists
+    """
+    return ValidID(id) and LoadKeys().Exists(int(id), LoadSnapshot())
 
 
 def InsertIncident(tID: int, sub: str, prio: str, status: str, crDate: str) -> bool:
@@ -198,48 +148,22 @@ def InsertIncident(tID: int, sub: str, prio: str, status: str, crDate: str) -> b
             crDate (str): Contains new incident createdDate
 
         Returns:
-            None | bool: False if ID exists in incidents, else None
+            bool: False if ID is not a number or exists in Cyber_Incidents or crDate is not YYYY-MM-DD, else True
     """    
-
-    
-    incidents: list[Incident] = GetIncidents()
-    incident: Incident = Incident(tID, sub, prio, status, crDate)
-    if not CheckID(incidents, tID):
+    if not ValidID(tID) or not ValidDate(crDate):
         return False
-    incidents.append(incident)
-    Writeincidents(incidents)
+    row: tuple = (int(tID), sub, prio, status, crDate)
+    with _journal.Lock(): #Check and append as one step so two sessions cannot insert the same id
+        if IDExists(row[0]):
+            return False
+        LogChange("I", row[0], row)
     return True
 
 
-def GetIndex(lst: list[Incident], target: int) -> int:
+def UpdateIncident(id: int, newId: int, newInc: str, newSev: str, newStat :str, newDate: str) -> bool:
     """
         Explanation:
-            Uses BinarySearch algorithm to search for target in most efficient manner
-            For more info go to https://www.geeksforgeeks.org/dsa/binary-search/
-        Args:
-            lst (list[Incident]): Contains all incidents
-            target (int): Target to be searched for
-        Returns:
-            int: Index location of target
-    """    
-    low: int = 0
-    high: int = len(lst) - 1
-    while low <= high:
-        mid: int = low + (high - low) // 2
-        if lst[mid].GetID() == target:
-            return mid
-        elif int(lst[mid].GetID()) < target:
-            low = mid + 1
-        else:
-            high = mid - 1
-
-    return -1
-
-
-def UpdateIncident(id: int, newId: int, newInc: str, newSev: str, newStat :str, newDate: str) -> None:
-    """
-        Explanation:
-            Updates incident after finding index of id and calls WriteIncidents()
+            Logs the update of id to incidents.journal, Cyber_Incidents is updated on Commit()
         Args:
             id (int): ID to update
             newId (int): ID of new incident
@@ -247,38 +171,105 @@ def UpdateIncident(id: int, newId: int, newInc: str, newSev: str, newStat :str,
             newSev (str): severity of new incident
             newStat (str): status of new incident
             newDate (str): date of new incident
+        Returns:
+            bool: False if id does not exist, newId is not a number, the date is not YYYY-MM-DD or newId belongs to another incident, else True
     """    
-    incidents: list[Incident] = GetIncidents()
-    index: int = GetIndex(incidents, int(id))
-    incidents[index] = Incident(newId, newInc, newSev, newStat, newDate)
-    Writeincidents(incidents)
+    if not ValidID(newId) or not ValidDate(newDate):
+        return False
+    row: tuple = (int(newId), newInc, newSev, newStat, newDate)
+    with _journal.Lock():
+        if not IDExists(id) or (row[0] != int(id) and IDExists(row[0])):
+            return False
+        LogChange("U", int(id), row)
+    return True
 
 
-def DeleteIncident(id: str):
+def DeleteIncident(id: str) -> bool:
     """
         Explanation:
-            Deletes incident after finding index of id and calls Writeincidents()
+            Logs the deletion of id to incidents.journal, the row is removed from Cyber_Incidents on Commit()
         Args:
             id (str): Contains id of incident to be deleted
+        Returns:
+            bool: False if id does not exist, else True
     """    
-    incidents: list[Incident] = GetIncidents()
-    index: int = GetIndex(incidents, int(id))
-    incidents.remove(incidents[index])
-    Writeincidents(incidents)
+    with _journal.Lock():
+        if not IDExists(id):
+            return False
+        LogChange("D", int(id), None)
+    return True
 
 
-def IncCount(column: str, dictionary: dict) -> None:
+def InsertIncidents(rows: list[tuple]) -> bool:
     """
         Explanation:
-            Increments dictionary[column] value by 1 if exists, else sets value to 1
+            Inserts every row or none: ids are checked against incidents and against each other, then all rows are journaled in one write
         Args:
-            column (str): Value in dictionary to increment/set
-            dictionary (dict): Dictionary containing various columns
-    """    
-    if column in dictionary:
-        dictionary[column] += 1 #type: ignore
-    else:
-        dictionary[column] = 1 #type: ignore
+            rows (list[tuple]): Rows of form (id, incident_type, severity, status, date)
+        Returns:
+            bool: False if any id is not a number, exists or repeats or any date is not YYYY-MM-DD, else True
+    """
+    if not all(ValidID(row[0]) and ValidDate(row[-1]) for row in rows): #The date is the last column
+        return False
+    records: list[tuple] = [("I", int(row[0]), (int(row[0]),) + tuple(row[1:])) for row in rows]
+    with _journal.Lock():
+        keys: KeyIndex = LoadKeys()
+        snapshot: ColumnarTable = LoadSnapshot()
+        if not Valid(records, lambda id: keys.Exists(id, snapshot)):
+            return False
+        LogChanges(records)
+    return True
+
+
+def UpdateIncidents(ids: list[int], changes: dict[str, Any]) -> bool:
+    """
+        Explanation:
+            Sets the columns in changes on every incident in ids with one journal write, e.g. UpdateIncidents([1, 2], {"status": "resolved"})
+            Ids cannot be changed in bulk, UpdateIncident() does that for a single incident
+        Args:
+            ids (list[int]): ids of the incidents to update
+            changes (dict[str, Any]): Column label to new value
+        Returns:
+            bool: False if any id is not a number, does not exist or repeats or changes names the id or an unknown column or a date that is not YYYY-MM-DD, else True
+    """
+    names: list[str] = [name for name, _ in _COLUMNS]
+    if not all(ValidID(id) for id in ids) or any(_LABELS.get(label) not in names[1:] for label in changes) or len(set(map(int, ids))) != len(ids):
+        return False
+    values: dict[int, Any] = {names.index(_LABELS[label]): val for label, val in changes.items()} #Row position to new value
+    if not ValidDate(values.get(len(names) - 1)): #The date is the last column
+        return False
+    with _journal.Lock():
+        keys: KeyIndex = LoadKeys()
+        snapshot: ColumnarTable = LoadSnapshot()
+        records: list[tuple] = []
+        for id in map(int, ids):
+            row: tuple | None = keys.Row(id, snapshot)
+            if row is None:
+                return False
+            records.append(("U", id, tuple(values.get(col, val) for col, val in enumerate(row))))
+        LogChanges(records)
+    return True
+
+
+def DeleteIncidents(ids: list[int]) -> bool:
+    """
+        Explanation:
+            Deletes every incident in ids or none, with one journal write
+        Args:
+            ids (list[int]): ids of the incidents to delete
+        Returns:
+            bool: False if any id is not a number, does not exist or repeats, else True
+    """
+    if not all(ValidID(id) for id in ids):
+        return False
+    records: list[tuple] = [("D", int(id), None) for id in ids]
+    with _journal.Lock():
+        keys: KeyIndex = LoadKeys()
+        snapshot: ColumnarTable = LoadSnapshot()
+        if not Valid(records, lambda id: keys.Exists(id, snapshot)):
+            return False
+        LogChanges(records)
+    return True
 
 
 def GetMaxMin(dictionary: dict[str, str | int]) -> None: 
@@ -306,6 +297,7 @@ def GetMaxMin(dictionary: dict[str, str | int]) -> None:
             dictionary["MinCol"] = col
     
 
+@queryCache.Cached("incidents")
 def Metrics():
     """
         Explanation:  
@@ -315,20 +307,44 @@ def Metrics():
         Returns:
             tuple[dict[str, str | int]]: Contains 3 dictionaries containing maximum/minimum column name and value
     """
-    incidents: list[Incident] = GetIncidents()
+    return MaterializedMetrics()
+
+
+def MetricsOf(frame: TableFrame, mask: np.ndarray) -> tuple:
+    """
+        Explanation: Builds the Metrics() dictionaries from frame's rows selected by mask
+        Returns:
+            tuple[dict[str, str | int]]: Dictionaries containing maximum/minimum column name and value
+    """
+    incidentTypes: dict[str, str | int] = frame.CountDict("incident_type", mask) #Dict of form value : count, in first appearance order
+    severities: dict[str, str | int] = frame.CountDict("severity", mask)
+    statusS: dict[str, str | int] = frame.CountDict("status", mask)
     
-    incidentTypes: dict[str, str | int] = dict() #Dict of form subjectName : dict["Count": 0]
-    severities: dict[str, str | int]  = dict()
-    statusS: dict[str, str | int]  = dict()
-
-    for i in range(len(incidents)):
-        incident = incidents[i]
-        incType: str = incident.GetIncident()
-        severity: str = incident.GetSev()
-        status: str = incident.GetStatus()
-        IncCount(incType, incidentTypes) #type: ignore
-        IncCount(severity, severities) #type: ignore
-        IncCount(status, statusS) #type: ignore
+    GetMaxMin(incidentTypes)
+    GetMaxMin(severities)
+    GetMaxMin(statusS)
+
+    return incidentTypes, severities, statusS
+
+
+def MaterializedMetrics() -> tuple:
+    """
+        Explanation: 
+            Builds the Metrics() dictionaries from the materialized whole table counts
+            Only the first call after start up or RebuildSnapshot() scans the incidents, later calls cost O(distinct values)
+        Returns:
+            tuple[dict[str, str | int]]: Dictionaries containing maximum/minimum column name and value
+    """
+    while True:
+        frame: TableFrame | None = None if _counts.IsBuilt() else LoadFrame() #Loaded outside the journal lock, building a frame takes the store's build lock first
+        with _journal.Lock(): #Writes adjust the counts under the same lock, so a build from the current frame cannot miss one
+            if frame is not None and not _counts.IsBuilt() and _store.IsCurrent(frame):
+                _counts.Build(frame)
+            if _counts.IsBuilt():
+                incidentTypes: dict[str, str | int] = _counts.Counts("incident_type") #Dict of form value : count
+                severities: dict[str, str | int] = _counts.Counts("severity")
+                statusS: dict[str, str | int] = _counts.Counts("status")
+                break
     
     GetMaxMin(incidentTypes)
     GetMaxMin(severities)
@@ -337,37 +353,186 @@ def Metrics():
     return incidentTypes, severities, statusS
 
 
-def GetIncidents() -> list[Incident]:
+@queryCache.Cached("incidents")
+def DashboardQuery(filters: FilterSpec | None, counts: tuple = _GROUP_COLUMNS) -> DashboardResult:
+    """
+        Explanation:
+            Computes everything an Analysis tab render needs (row count, column counts, metrics) from one frame and one filter mask,
+            instead of every widget loading and scanning the table again
+            Metrics cover every incident, as Metrics() always has
+        Args:
+            filters (_FilterSpec | None_): Filter spec built from filters.Range/DateRange/InSet/And
+            counts (_tuple_): Columns to count for the charts
+        Returns:
+            result (_DashboardResult_): Bundle the widgets read from
+    """
+    frame: TableFrame = LoadFrame()
+    mask: np.ndarray = frame.Mask(filters)
+    colCounts: dict[str, pd.DataFrame] = {col: frame.CountFrame(col, mask) for col in counts if col in _GROUP_COLUMNS}
+    return DashboardResult(frame.Count(mask), colCounts, MaterializedMetrics())
+
+
+def LoadFrame() -> TableFrame:
+    """
+        Explanation:
+            Current incidents frame from the process wide store, read by GetRows/GetRowCnt/GetColCount/Metrics
+            Every session shares it and it is only rebuilt after a write, so reruns do not reread the snapshot or journal
+        Returns:
+            frame (TableFrame): Filterable, countable view of every incident
+    """
+    return _store.Get()
+
+
+def BuildFrame() -> TableFrame:
+    """
+        Explanation:
+            Column arrays of the last incidents snapshot with incidents.journal replayed over them
+        Returns:
+            frame (TableFrame): Filterable, countable view of every incident
+    """
+    with _journal.Lock():
+        snapshot: ColumnarTable = LoadSnapshot()
+        records, _ = _journal.Read()
+    return TableFrame(snapshot, records, _LABELS)
+
+
+def LoadSnapshot() -> ColumnarTable:
     """
         Explanation:
-            Uses pickle module to read(Deserialise) incidents.bin containing incidents
+            Memory maps the newest incidents snapshot, rebuilds it from Cyber_Incidents if it does not exist
+            Already open snapshots are reused, so this costs a directory listing rather than a full read
         Returns: 
-            incidents (list[Incident]): Contains all incidents
+            snapshot (ColumnarTable): Column arrays of all incidents as of the last snapshot
     """
-    with open(Path("DATA") / "incidents.bin", "rb") as incidentsObjs:
-        incidents = pickle.load(incidentsObjs) 
-    return incidents
+    snapshot: ColumnarTable | None = OpenSnapshot(Path("DATA"), "incidents")
+    return snapshot if snapshot is not None else RebuildSnapshot()
 
 
-def Writeincidents(incidents: list[Incident]):
+def RebuildSnapshot() -> ColumnarTable:
+    """
+        Explanation:
+            Commits pending changes, then writes a fresh incidents snapshot from Cyber_Incidents and empties incidents.journal
+        Returns: 
+            snapshot (ColumnarTable): Column arrays of all incidents
+    """
+    dbMgr = DatabaseManager(str(Path("DATA") / "intelligence_platform.db"), concurrent = True)
+    with _journal.Lock():
+        if OpenSnapshot(Path("DATA"), "incidents") is not None: #Without a snapshot there is nothing to replay changes over
+            Commit()
+        Writeincidents(dbMgr.FetchIter("SELECT id, incident_type, severity, status, date FROM Cyber_Incidents ORDER BY id"))
+        _journal.Reset()
+        _counts.Reset()
+        _keys.Reset()
+        _search.Sync() #Only the rows the database changed, the index already follows the journal
+        _store.Bump()
+        queryCache.Bump("incidents") #Rows now come from the database, which may have changed outside the app
+        return OpenSnapshot(Path("DATA"), "incidents") #type: ignore
+
+
+def LogChange(op: str, id: int, row: tuple | None) -> None:
     """
+        Explanation:
+            Appends one change to incidents.journal (O(1)) instead of rewriting the snapshot
+            Once the journal passes its size threshold it is folded into a new snapshot on a background thread
         Args:
-            incidents (list[Incident]): Contains all incidents in incidents.bin
+            op (str): "I" (insert), "U" (update), "D" (delete) or "C" (committed to the database)
+            id (int): id of the changed row, the old id for updates
+            row (tuple | None): New row values, None for delete
+    """
+    LogChanges([(op, id, row)])
+
+
+def LogChanges(records: list[tuple]) -> None:
+    """
+        Explanation:
+            Appends records of form (op, id, row) to incidents.journal in one write, then brings the key index, counts and caches up to date
+            Callers hold the journal lock and have validated the records
+    """
+    keys: KeyIndex = LoadKeys() #Loaded before appending, so it does not already contain records
+    snapshot: ColumnarTable = LoadSnapshot()
+    appended: bool = _journal.AppendMany(records)
+    for op, id, row in records:
+        old: tuple | None = keys.Row(id, snapshot) if op in ("U", "D") and _counts.IsBuilt() else None
+        keys.Apply(op, id, row)
+        if op != "C":
+            _counts.Apply(old, row)
+    _search.Apply(records)
+    if any(op != "C" for op, _, _ in records): #Commits do not change the rows, every other record does
+        queryCache.Bump("incidents")
+        _store.Bump()
+    if appended:
+        _journal.CompactInBackground(LoadSnapshot, Fold, WriteCompacted)
+
+
+def LoadKeys() -> KeyIndex:
+    """
+        Explanation: Builds the primary key index from incidents.journal the first time it is needed, later writes keep it current
+    """
+    with _journal.Lock():
+        LoadSnapshot() #May rebuild the snapshot, which resets the index
+        if not _keys.IsLoaded():
+            records, _ = _journal.Read()
+            _keys.Load(records)
+        return _keys
+
+
+def LoadSearch() -> SearchIndex:
+    """
+        Explanation: Builds the full text index from the incidents snapshot and journal if it does not exist yet, later writes keep it current
+    """
+    with _journal.Lock():
+        snapshot: ColumnarTable = LoadSnapshot()
+        if not _search.IsBuilt():
+            records, _ = _journal.Read()
+            _search.Build(zip(snapshot.Array("id").tolist(), snapshot.Decode("incident_type")), records)
+        return _search
+
+
+def Fold(snapshot: ColumnarTable, records: list[tuple]) -> tuple[list[tuple], set[int]]:
+    """
+        Returns: (_tuple_): Rows of snapshot with records replayed, and the ids still waiting for Commit()
+    """
+    return Replay(snapshot.Rows(), records), Dirty(snapshot.meta.get("dirty", ()), records)
+
+
+def WriteCompacted(state: tuple[list[tuple], set[int]]) -> None:
+    """
+        Explanation:
+            Writes the snapshot a compaction folded with Fold(), called under the journal lock
+            The key index is dropped too, the next LoadKeys() rebuilds it from the records left in incidents.journal, so it does not grow until a full rebuild
+    """
+    Writeincidents(*state)
+    _keys.Reset()
+
+
+def Writeincidents(rows, dirty = ()) -> None:
+    """
+        Explanation:
+            Writes rows as the next incidents snapshot generation (DATA/incidents.NNNNNN.snap), older generations are removed
+        Args:
+            rows (Iterable[tuple]): Row tuples in _COLUMNS order
+            dirty (Iterable[int]): Ids not yet committed to Cyber_Incidents, kept in the snapshot header so compaction does not lose them
     """    
-    with open(Path("DATA") / "incidents.bin", "wb") as incidentsObjs:
-        pickle.dump(incidents, incidentsObjs)
-        
+    WriteSnapshot(Path("DATA"), "incidents", _COLUMNS, rows, {"dirty": sorted(dirty)})
+
 
 def Commit():
     """
         Explanation:
             Commits all changes made to incidents after logging out
-            Iterates through every incident and adds incident to IT_incidents in intelligence_platform.db
+            Only rows inserted, updated or deleted since the last commit are written, as upserts and deletes inside one transaction
     """
-    incidents = GetIncidents()
-    dbMgr = DatabaseManager(str(Path("DATA") / "intelligence_platform.db"))
-    dbMgr.Exec("DELETE FROM Cyber_Incidents")
-    for incident in incidents:
-        dbMgr.Exec("INSERT INTO Cyber_Incidents (id, incident_type, severity, status, date) VALUES (?, ?, ?, ?, ?)", (str(incident.GetID()), incident.GetIncident(), incident.GetSev(), incident.GetStatus(), incident.GetCrDate()) )
+    dbMgr = DatabaseManager(str(Path("DATA") / "intelligence_platform.db"), concurrent = True)
+    with _journal.Lock():
+        snapshot: ColumnarTable = LoadSnapshot()
+        records, _ = _journal.Read()
+        dirty: list[int] = sorted(Dirty(snapshot.meta.get("dirty", ()), records))
+        if not dirty:
+            return
+        current: dict[int, tuple] = {row[0]: row for row in Replay(snapshot.Lookup(dirty), records)} #Latest values of the dirty rows only
+        with dbMgr.Transaction():
+            dbMgr.ExecMany("DELETE FROM Cyber_Incidents WHERE id = ?", ((id,) for id in dirty if id not in current))
+            dbMgr.ExecMany("INSERT INTO Cyber_Incidents (id, incident_type, severity, status, date) VALUES (?, ?, ?, ?, ?) ON CONFLICT(id) DO UPDATE SET incident_type = excluded.incident_type, severity = excluded.severity, status = excluded.status, date = excluded.date", (current[id] for id in dirty if id in current))
+        LogChange("C", 0, None)
     
     dbMgr.Close()
\ No newline at end of file
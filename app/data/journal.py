@@ -0,0 +1,208 @@
+from pathlib import Path
+from typing import Any, Callable, Iterable
+import threading
+import pickle
+import struct
+import os
+
+
+_HEADER = struct.Struct("<I") #Length prefix of every record
+
+
+class Journal:
+    """
+        Append-only change log kept next to a table snapshot (e.g. DATA/incidents.journal next to DATA/incidents.000001.snap)
+        Every write appends one record of form (op, id, row) where op is "I" (insert), "U" (update) or "D" (delete).
+        A "C" (commit) record marks that every earlier change has been written to the database.
+        Readers replay the records over the last snapshot, Compact() folds them into a new snapshot.
+    """
+    def __init__(self, path: Path, threshold: int = 256 * 1024) -> None:
+        self.__path: Path = path
+        self.__threshold: int = threshold
+        self.__lock = threading.RLock()
+        self.__epoch: int = 0 #Bumped by Reset() so a compaction that raced a rebuild throws its result away
+        self.__compacting: bool = False
+
+
+    def Lock(self) -> threading.RLock:
+        """Lock held while reading or replacing the snapshot together with the journal"""
+        return self.__lock
+
+
+    def Append(self, op: str, id: int, row: tuple | None) -> bool:
+        """
+            Args:
+                op (_str_): "I", "U", "D" or "C"
+                id (_int_): id of the row being inserted, updated (old id) or deleted
+                row (_tuple | None_): New row values, None for delete
+            Returns:
+                (_bool_): True if the journal has grown past its compaction threshold
+        """
+        return self.AppendMany([(op, id, row)])
+
+
+    def AppendMany(self, records: list[tuple]) -> bool:
+        """
+            Explanation: Appends records of form (op, id, row) with a single write, however many there are
+            Returns: (_bool_): True if the journal has grown past its compaction threshold
+        """
+        data: bytes = b"".join(_HEADER.pack(len(rec)) + rec for rec in (pickle.dumps(tuple(record), protocol = pickle.HIGHEST_PROTOCOL) for record in records))
+        with self.__lock:
+            with open(self.__path, "ab") as journalFile:
+                journalFile.write(data)
+                size: int = journalFile.tell()
+        return size >= self.__threshold
+
+
+    def Read(self) -> tuple[list[tuple], int]:
+        """
+            Returns:
+                records (_list[tuple]_): Every complete record in append order, a torn last record is ignored
+                end (_int_): Byte offset just after the last complete record
+        """
+        with self.__lock:
+            try:
+                with open(self.__path, "rb") as journalFile:
+                    data: bytes = journalFile.read()
+            except FileNotFoundError:
+                return [], 0
+
+        records: list[tuple] = []
+        offset: int = 0
+        while offset + _HEADER.size <= len(data):
+            (length,) = _HEADER.unpack_from(data, offset)
+            if offset + _HEADER.size + length > len(data):
+                break
+            records.append(pickle.loads(data[offset + _HEADER.size : offset + _HEADER.size + length]))
+            offset += _HEADER.size + length
+        return records, offset
+
+
+    def Reset(self) -> None:
+        """Empties the journal, used when the snapshot was rebuilt straight from the database"""
+        with self.__lock:
+            self.__epoch += 1
+            self.__path.unlink(missing_ok = True)
+
+
+    def __DropPrefix(self, end: int) -> None:
+        """Removes the first end bytes (already folded into the snapshot), keeping records appended since"""
+        try:
+            with open(self.__path, "rb") as journalFile:
+                journalFile.seek(end)
+                tail: bytes = journalFile.read()
+        except FileNotFoundError:
+            return
+        tmpPath: Path = self.__path.with_suffix(".tmp")
+        with open(tmpPath, "wb") as journalFile:
+            journalFile.write(tail)
+        os.replace(tmpPath, self.__path)
+
+
+    def Compact(self, load: Callable[[], Any], fold: Callable[[Any, list[tuple]], Any], write: Callable[[Any], None]) -> None:
+        """
+            Explanation:
+                Folds the journal into a new snapshot. Replaying runs outside the lock so writers are not blocked,
+                the lock is only taken again to swap the snapshot and drop the folded records
+            Args:
+                load (_Callable_): Reads the current snapshot
+                fold (_Callable_): Returns the snapshot with the records replayed over it
+                write (_Callable_): Writes a snapshot
+        """
+        with self.__lock:
+            if self.__compacting:
+                return
+            self.__compacting = True
+        try:
+            with self.__lock:
+                epoch: int = self.__epoch
+                snapshot = load()
+                records, end = self.Read()
+            if not records:
+                return
+            snapshot = fold(snapshot, records)
+            with self.__lock:
+                if epoch != self.__epoch: #Snapshot was rebuilt meanwhile, ours is stale
+                    return
+                write(snapshot)
+                self.__DropPrefix(end)
+        finally:
+            self.__compacting = False
+
+
+    def CompactInBackground(self, load: Callable[[], Any], fold: Callable[[Any, list[tuple]], Any], write: Callable[[Any], None]) -> None:
+        """Runs Compact() on a daemon thread so the write that crossed the threshold returns immediately"""
+        threading.Thread(target = self.Compact, args = (load, fold, write), daemon = True).start()
+
+
+def Replay(rows: list[tuple], records: list[tuple]) -> list[tuple]:
+    """
+        Explanation:
+            Applies journal records over rows (row tuples sorted by id) and returns the new list sorted by id
+            Replaying is idempotent, so records already contained in rows are harmless
+        Args:
+            rows (_list[tuple]_): Row tuples with the id first
+            records (_list[tuple]_): Records of form (op, id, row)
+        Returns:
+            (_list[tuple]_): Row tuples with every record applied
+    """
+    if not records:
+        return rows
+    byId: dict[int, tuple] = {row[0]: row for row in rows}
+    for op, id, row in records:
+        if op == "C":
+            continue
+        byId.pop(id, None)
+        if row is not None: #Insert/Update, update may also change the id
+            byId[row[0]] = tuple(row)
+    return [byId[id] for id in sorted(byId)]
+
+
+def Valid(records: list[tuple], exists: Callable[[int], bool]) -> bool:
+    """
+        Explanation:
+            Checks a batch of records against the table and against each other, as if applied in order:
+            inserts need a free id, updates an existing id and a free new id, deletes an existing id
+        Args:
+            records (_list[tuple]_): Records of form (op, id, row)
+            exists (_Callable[[int], bool]_): Whether id exists before the batch
+        Returns:
+            (_bool_): False if any record would fail
+    """
+    pending: dict[int, bool] = {}
+    Has: Callable[[int], bool] = lambda id: pending[id] if id in pending else exists(id)
+    for op, id, row in records:
+        match op:
+            case "I" if Has(row[0]):
+                return False
+            case "U" if not Has(id) or (row[0] != id and Has(row[0])):
+                return False
+            case "D" if not Has(id):
+                return False
+        if op != "C":
+            pending[id] = False
+            if row is not None:
+                pending[row[0]] = True
+    return True
+
+
+def Dirty(dirty: Iterable[int], records: list[tuple]) -> set[int]:
+    """
+        Explanation:
+            Ids changed since the last commit to the database, a "C" record clears everything before it
+            An update marks both its old and new id, so Commit() can delete the old row
+        Args:
+            dirty (_Iterable[int]_): Ids already dirty in the snapshot the records are replayed over
+            records (_list[tuple]_): Records of form (op, id, row)
+        Returns:
+            (_set[int]_): Ids whose rows must be upserted or deleted
+    """
+    ids: set[int] = set(dirty)
+    for op, id, row in records:
+        if op == "C":
+            ids.clear()
+            continue
+        ids.add(id)
+        if row is not None:
+            ids.add(row[0])
+    return ids
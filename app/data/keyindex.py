@@ -0,0 +1,71 @@
+from app.data.columnar import ColumnarTable
+from threading import RLock
+
+
+class KeyIndex:
+    """
+        Primary key index of one table: the rows the journal has changed since the snapshot, kept in a dict by id,
+        in front of the snapshot's own id -> position table. Built once from the journal, then kept in step by Apply()
+        on every insert, update (including id changes) and delete, so CRUD lookups never rescan the journal
+    """
+    def __init__(self) -> None:
+        self.__rows: dict[int, tuple | None] | None = None #id -> current row, None once deleted
+        self.__lock: RLock = RLock()
+
+
+    def Load(self, records: list[tuple]) -> None:
+        """
+            Explanation: Rebuilds the index from every journal record since the snapshot
+        """
+        rows: dict[int, tuple | None] = {}
+        for op, id, row in records:
+            if op != "C":
+                self.__Set(rows, id, row)
+        with self.__lock:
+            self.__rows = rows
+
+
+    def Apply(self, op: str, id: int, row: tuple | None) -> None:
+        """
+            Explanation: Applies one journal record, ignored until Load() has run
+        """
+        with self.__lock:
+            if self.__rows is not None and op != "C":
+                self.__Set(self.__rows, id, row)
+
+
+    @staticmethod
+    def __Set(rows: dict[int, tuple | None], id: int, row: tuple | None) -> None:
+        rows[int(id)] = None #An update with a new id frees the old one
+        if row is not None:
+            rows[int(row[0])] = tuple(row)
+
+
+    def Reset(self) -> None:
+        with self.__lock:
+            self.__rows = None
+
+
+    def IsLoaded(self) -> bool:
+        return self.__rows is not None
+
+
+    def Exists(self, id: int, snapshot: ColumnarTable) -> bool:
+        """
+            Returns: (_bool_): True if a row with id exists, O(1) for dense ids
+        """
+        with self.__lock:
+            if self.__rows is not None and int(id) in self.__rows:
+                return self.__rows[int(id)] is not None
+        return snapshot.Contains(int(id))
+
+
+    def Row(self, id: int, snapshot: ColumnarTable) -> tuple | None:
+        """
+            Returns: (_tuple | None_): Current row of id, None if it does not exist
+        """
+        with self.__lock:
+            if self.__rows is not None and int(id) in self.__rows:
+                return self.__rows[int(id)]
+        rows: list[tuple] = snapshot.Lookup([int(id)])
+        return rows[0] if rows else None
@@ -67,9 +67,99 @@ def CreateITTicketsTable(conn):
     conn.commit()
 
 
+#Secondary indexes of form {index name: (table, columns)}
+#They serve GetCommittedRows(): the sidebar multiselects lead the composite indexes, the date range filter that every applied filter
+#includes comes second. The incidents and tickets date indexes also hold every selected column (id is the rowid), so they cover the query
+INDEXES: dict[str, tuple[str, tuple[str, ...]]] = {
+    "idx_incidents_sev_date": ("Cyber_Incidents", ("severity", "date")),
+    "idx_incidents_status_date": ("Cyber_Incidents", ("status", "date")),
+    "idx_incidents_date_cover": ("Cyber_Incidents", ("date", "incident_type", "severity", "status")),
+    "idx_tickets_prio_date": ("IT_Tickets", ("priority", "created_date")),
+    "idx_tickets_status_date": ("IT_Tickets", ("status", "created_date")),
+    "idx_tickets_date_cover": ("IT_Tickets", ("created_date", "subject", "priority", "status")),
+    "idx_datasets_source_upd": ("Datasets_Metadata", ("source", "last_update")),
+    "idx_datasets_ctgry_upd": ("Datasets_Metadata", ("category", "last_update")),
+    "idx_datasets_upd": ("Datasets_Metadata", ("last_update",)),
+}
+
+
+#Queries of form (description, sql, params) that the app runs against SQLite, checked by CheckQueryPlans()
+#The filtered reads are GetCommittedRows() with the WHERE clause filters.Where() compiles for typical sidebar selections
+#The full ORDER BY id reads that rebuild the snapshots scan every row by design and are left out
+APP_QUERIES: list[tuple[str, str, tuple]] = [
+    ("Incidents by severity in a date range", "SELECT id AS id, incident_type AS incident_type, severity AS severity, status AS status, date AS date FROM Cyber_Incidents WHERE date BETWEEN ? AND ? AND severity IN (?, ?) ORDER BY id", ("2020-01-01", "2025-12-31", "critical", "high")),
+    ("Incidents in a date range", "SELECT id AS id, incident_type AS incident_type, severity AS severity, status AS status, date AS date FROM Cyber_Incidents WHERE date BETWEEN ? AND ? ORDER BY id", ("2024-01-01", "2024-03-31")),
+    ("Tickets by status in a date range", "SELECT ticket_id AS ticket_id, subject AS subject, priority AS priority, status AS status, created_date AS created_date FROM IT_Tickets WHERE created_date BETWEEN ? AND ? AND status IN (?) ORDER BY ticket_id", ("2020-01-01", "2025-12-31", "open")),
+    ("Tickets in a date range", "SELECT ticket_id AS ticket_id, subject AS subject, priority AS priority, status AS status, created_date AS created_date FROM IT_Tickets WHERE created_date BETWEEN ? AND ? ORDER BY ticket_id", ("2024-01-01", "2024-03-31")),
+    ("Tickets in an id range", "SELECT ticket_id AS ticket_id, subject AS subject, priority AS priority, status AS status, created_date AS created_date FROM IT_Tickets WHERE ticket_id BETWEEN ? AND ? ORDER BY ticket_id", (1, 100)),
+    ("Datasets by source in a date range", "SELECT id AS id, dataset_name AS dataset_name, category AS category, file_size_mb AS file_size_mb, source AS source, last_update AS last_updated FROM Datasets_Metadata WHERE last_update BETWEEN ? AND ? AND source IN (?, ?) ORDER BY id", ("2020-01-01", "2025-12-31", "Kaggle", "Public API")),
+    ("Datasets in a date range", "SELECT id AS id, dataset_name AS dataset_name, category AS category, file_size_mb AS file_size_mb, source AS source, last_update AS last_updated FROM Datasets_Metadata WHERE last_update BETWEEN ? AND ? ORDER BY id", ("2024-01-01", "2024-03-31")),
+    ("Commit deletes incidents", "DELETE FROM Cyber_Incidents WHERE id = ?", (1,)),
+    ("Commit deletes tickets", "DELETE FROM IT_Tickets WHERE ticket_id = ?", (1,)),
+    ("Commit deletes datasets", "DELETE FROM Datasets_Metadata WHERE id = ?", (1,)),
+    ("Login looks up a user", "SELECT username, password_hash FROM Users WHERE username = ?", ("admin",)),
+]
+
+
+def CreateIndexes(conn):
+    """
+        Explanation:
+            Creates every index in INDEXES that does not exist yet
+            Planner statistics are only refreshed (ANALYZE) when an index was created, Home.py calls this on every rerun
+    """
+    cursor = conn.cursor()
+    existing: set[str] = {row[0] for row in cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    missing: list[str] = [name for name in INDEXES if name not in existing]
+    for name in missing:
+        table, columns = INDEXES[name]
+        cursor.execute(f"CREATE INDEX {name} ON {table} ({', '.join(columns)})")
+    if missing:
+        cursor.execute("ANALYZE")
+    conn.commit()
+
+
+def ExplainQueryPlan(conn, sql: str, params: tuple = ()) -> list[str]:
+    """
+        Args:
+            conn (_sqlite3.Connection_): Connection to run the query plan on
+            sql (_str_): Query to explain
+            params (_tuple_): Query parameters
+        Returns:
+            (_list[str]_): Detail column of every EXPLAIN QUERY PLAN row, e.g. "SEARCH IT_Tickets USING INDEX ..."
+    """
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()]
+
+
+def UsesIndex(plan: list[str]) -> bool:
+    """
+        Explanation: A step passes if it searches an index or the primary key, any SCAN (even USING COVERING INDEX) reads every row and fails
+        Returns: (_bool_): True if plan has a search step and no scan step
+    """
+    searched: bool = False
+    for step in plan:
+        if step.startswith("SCAN"):
+            return False
+        if step.startswith("SEARCH") and ("USING INDEX" in step or "USING COVERING INDEX" in step or "USING INTEGER PRIMARY KEY" in step):
+            searched = True
+    return searched
+
+
+def CheckQueryPlans(conn) -> dict[str, tuple[bool, list[str]]]:
+    """
+        Explanation: Runs EXPLAIN QUERY PLAN on every query in APP_QUERIES
+        Returns:
+            (_dict_): Of form {description: (uses index, plan steps)}
+    """
+    results: dict[str, tuple[bool, list[str]]] = {}
+    for description, sql, params in APP_QUERIES:
+        plan: list[str] = ExplainQueryPlan(conn, sql, params)
+        results[description] = (UsesIndex(plan), plan)
+    return results
+
+
 def CreateAllTables() -> None:
     """
-        Explanation: Creates Users, Cyber_Incidents, Datasets_Metadata, It_Tickets Tables in intelligence_platform.db
+        Explanation: Creates Users, Cyber_Incidents, Datasets_Metadata, It_Tickets Tables and their indexes in intelligence_platform.db
     """
     import sqlite3
     from pathlib import Path
@@ -78,4 +168,5 @@ def CreateAllTables() -> None:
     CreateUsersTable(conn)
     CreateCyberIncidentsTable(conn)
     CreateDatasetsMetadataTable(conn)
-    CreateITTicketsTable(conn)
\ No newline at end of file
+    CreateITTicketsTable(conn)
+    CreateIndexes(conn)
\ No newline at end of file
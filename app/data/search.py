@@ -0,0 +1,129 @@
+from app.services.database_manager import DatabaseManager
+from threading import RLock
+from typing import Iterable
+import re
+
+
+_TOKEN = re.compile(r"\w+") #Words of a search box query, everything else (quotes, operators) is dropped
+
+
+class SearchIndex:
+    """
+        SQLite FTS5 index over one text column of a table, stored in the table's database as <table>_fts with the row id as rowid.
+        Kept in step with the journal rather than the database: Apply() runs for every insert, update and delete as it is logged,
+        so searches see changes before Commit(). Built once from the snapshot and journal, after that each write costs one small transaction.
+        Triggers on the source table record every id the database changes in <table>_fts_dirty (repeats allowed), Sync() re-reads just those rows
+        when the snapshot is rebuilt, which also picks up edits made outside the app
+    """
+    def __init__(self, dbPath: str, table: str, key: str, text: str, column: int) -> None:
+        """
+            Args:
+                dbPath (_str_): Path of SQLite database file
+                table (_str_): Source table name, e.g. "IT_Tickets"
+                key (_str_): Id column of table, e.g. "ticket_id"
+                text (_str_): Indexed column of table, e.g. "subject"
+                column (_int_): Position of text in the row tuples, e.g. 1 for subject
+        """
+        self.__dbMgr: DatabaseManager = DatabaseManager(dbPath, concurrent = True)
+        self.__table: str = table
+        self.__key: str = key
+        self.__text: str = text
+        self.__name: str = f"{table}_fts"
+        self.__dirty: str = f"{table}_fts_dirty"
+        self.__create: str = f"CREATE VIRTUAL TABLE {self.__name} USING fts5(text, prefix = '2 3')" #Prefix indexes keep "vpn*" style queries off a full term scan
+        self.__createDirty: str = f"CREATE TABLE {self.__dirty} (id INTEGER)" #No key: an upsert's conflict handling overrides the triggers' OR IGNORE, so a unique id would abort Commit()
+        self.__column: int = column
+        self.__built: bool | None = None #None until sqlite_master has been checked
+        self.__lock: RLock = RLock()
+
+
+    def IsBuilt(self) -> bool:
+        """
+            Returns: (_bool_): True if the index exists with the current definition, built by this or an earlier process
+        """
+        with self.__lock:
+            if self.__built is None:
+                found = self.__dbMgr.FetchAll("SELECT name, sql FROM sqlite_master WHERE type = 'table' AND name IN (?, ?)", (self.__name, self.__dirty))
+                self.__built = dict(zip(found["name"], found["sql"])) == {self.__name: self.__create, self.__dirty: self.__createDirty}
+            return self.__built
+
+
+    def Build(self, rows: Iterable[tuple[int, str | None]], records: list[tuple]) -> None:
+        """
+            Explanation:
+                Creates the index from (id, text) pairs of the snapshot, then applies records (the journal since that snapshot)
+                An index from an older definition is dropped first, an index that is already current is kept
+        """
+        with self.__lock, self.__dbMgr.Transaction():
+            self.__dbMgr.Exec(f"DROP TABLE IF EXISTS {self.__name}")
+            self.__dbMgr.Exec(self.__create)
+            self.__dbMgr.Exec(f"DROP TABLE IF EXISTS {self.__dirty}")
+            self.__dbMgr.Exec(self.__createDirty)
+            for event, ids in (("INSERT", ("new",)), ("UPDATE", ("old", "new")), ("DELETE", ("old",))):
+                self.__dbMgr.Exec(f"DROP TRIGGER IF EXISTS {self.__dirty}_{event.lower()}") #Triggers belong to the source table and outlive the dirty table
+                inserts: str = " ".join(f"INSERT INTO {self.__dirty} (id) VALUES ({row}.{self.__key});" for row in ids)
+                self.__dbMgr.Exec(f"CREATE TRIGGER {self.__dirty}_{event.lower()} AFTER {event} ON {self.__table} BEGIN {inserts} END")
+            self.__dbMgr.ExecMany(f"INSERT INTO {self.__name} (rowid, text) VALUES (?, ?)", ((id, text) for id, text in rows if text is not None))
+            self.__Write(records)
+            self.__built = True
+
+
+    def Apply(self, records: list[tuple]) -> None:
+        """
+            Explanation: Applies journal records of form (op, id, row) in one transaction, ignored until the index is built
+        """
+        with self.__lock:
+            if self.IsBuilt():
+                with self.__dbMgr.Transaction():
+                    self.__Write(records)
+
+
+    def __Write(self, records: list[tuple]) -> None:
+        for op, id, row in records:
+            if op == "C":
+                continue
+            self.__dbMgr.Exec(f"DELETE FROM {self.__name} WHERE rowid = ?", (int(id),)) #An update with a new id frees the old one
+            if row is not None and row[self.__column] is not None:
+                self.__dbMgr.Exec(f"INSERT OR REPLACE INTO {self.__name} (rowid, text) VALUES (?, ?)", (int(row[0]), row[self.__column]))
+
+
+    def Sync(self) -> None:
+        """
+            Explanation:
+                Re-reads the rows the database changed since the last Sync() and empties the dirty list, costs O(changed rows)
+                Called when the snapshot is rebuilt from the database, after Commit(), so the database holds every change
+        """
+        with self.__lock:
+            if not self.IsBuilt():
+                return
+            with self.__dbMgr.Transaction():
+                self.__dbMgr.Exec(f"DELETE FROM {self.__name} WHERE rowid IN (SELECT DISTINCT id FROM {self.__dirty})")
+                self.__dbMgr.Exec(f"INSERT INTO {self.__name} (rowid, text) SELECT {self.__key}, {self.__text} FROM {self.__table} WHERE {self.__key} IN (SELECT DISTINCT id FROM {self.__dirty}) AND {self.__text} IS NOT NULL")
+                self.__dbMgr.Exec(f"DELETE FROM {self.__dirty}")
+
+
+    def Search(self, query: str, limit: int = 10) -> list[int]:
+        """
+            Explanation:
+                Every word of query must match, the last one as a prefix so results appear while typing
+                Rows matching the words exactly come first, then prefix matches, each ranked by bm25 best first (FTS5's own top-k)
+            Args:
+                query (_str_): Search box text, e.g. "vpn conn"
+                limit (_int_): Number of ids to return
+            Returns:
+                ids (_list[int]_): Ids of the best matches
+        """
+        words: list[str] = _TOKEN.findall(query.lower())
+        if not words:
+            return []
+        exact: str = " ".join(f'"{word}"' for word in words)
+        ids: list[int] = self.__Ranked(exact, limit)
+        if len(ids) < limit:
+            ids += [id for id in self.__Ranked(exact + "*", limit + len(ids)) if id not in ids][:limit - len(ids)]
+        return ids
+
+
+    def __Ranked(self, match: str, limit: int) -> list[int]:
+        with self.__dbMgr.Checkout() as conn:
+            rows = conn.execute(f"SELECT rowid FROM {self.__name} WHERE {self.__name} MATCH ? ORDER BY rank LIMIT ?", (match, int(limit))).fetchall()
+        return [row[0] for row in rows]
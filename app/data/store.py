@@ -0,0 +1,64 @@
+from app.data.engine import TableFrame
+from threading import Lock
+from typing import Callable
+
+
+class TableStore:
+    """
+        Latest TableFrame of one table, loaded once and shared by every Streamlit session in the process
+        Frames are never modified after being built, so readers use them without locking. A write only bumps the version,
+        the next reader builds a new frame (copy on write) and swaps it in with one assignment; sessions still
+        holding the old frame keep a complete, consistent table. Callers must not hold the journal lock while calling Get()
+    """
+    def __init__(self, build: Callable[[], TableFrame]) -> None:
+        """
+            Args:
+                build (_Callable[[], TableFrame]_): Builds a frame from the snapshot and journal
+        """
+        self.__build: Callable[[], TableFrame] = build
+        self.__current: tuple[TableFrame | None, int] = (None, -1) #(frame, version it was built for), replaced as a whole
+        self.__version: int = 0
+        self.__lock: Lock = Lock()
+        self.__buildLock: Lock = Lock() #Held by the one thread rebuilding, taken before the journal lock inside build
+
+
+    def Get(self) -> TableFrame:
+        """
+            Explanation:
+                Returns the current frame, building a new one if a write has happened since
+                Only one thread builds (single flight): others that find the frame stale wait for it and reuse its frame
+                Readers of an up to date frame never take a lock
+        """
+        frame, version = self.__current
+        if frame is not None and version == self.__version:
+            return frame
+        with self.__buildLock:
+            frame, version = self.__current
+            wanted: int = self.__version
+            if frame is not None and version == wanted: #Built by the thread this one waited for
+                return frame
+            frame = self.__build() #Sees every write up to wanted, possibly later ones too
+            with self.__lock:
+                if self.__current[1] < wanted:
+                    self.__current = (frame, wanted)
+            return frame
+
+
+    def IsCurrent(self, frame: TableFrame) -> bool:
+        """
+            Returns: (_bool_): True if frame is the stored frame and no write has happened since it was built
+        """
+        return self.__current[0] is frame and self.__current[1] == self.__version
+
+
+    def Bump(self) -> None:
+        """
+            Explanation: Called after every write, the next Get() rebuilds
+        """
+        with self.__lock:
+            self.__version += 1
+
+
+    #Get Functions
+    def GetVersion(self) -> int:
+        return self.__version
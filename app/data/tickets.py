@@ -1,191 +1,141 @@
 from app.services.database_manager import DatabaseManager
-from models.it_ticket import ITTicket
+from app.data.journal import Journal, Replay, Dirty, Valid
+from app.data.engine import TableFrame, DashboardResult
+from app.data.filters import FilterSpec, Conditions, Where
+from app.data.cache import queryCache
+from app.data.aggregates import MaterializedCounts
+from app.data.keyindex import KeyIndex
+from app.data.store import TableStore
+from app.data.columnar import ColumnarTable, OpenSnapshot, WriteSnapshot, ValidDate
+from app.data.search import SearchIndex
 from pathlib import Path
 from typing import Any
 import pandas as pd
-import pickle
+import numpy as np
 
 
-def TransferFromDB():
-    """
-        Gets all rows from IT_Tickets and creates a list of ITTicket
-        Returns: itTickets (_list[ITTicket]_): List containing all tickets in database
-    """
-    dbMgr = DatabaseManager(str(Path("DATA") / "intelligence_platform.db"))
-    df = dbMgr.FetchAll("SELECT * FROM IT_Tickets ORDER BY ticket_id")
-    itTickets: list[ITTicket] = []
-    ids: list[str] = df["ticket_id"].tolist() #Converted to int later
-    subs: list[str] = df["subject"].tolist()
-    prios: list[str] = df["priority"].tolist()
-    stats: list[str] = df["status"].tolist()
-    crDates: list[str] = df["created_date"].tolist()
-    for i in range(len(df)):
-        ticket: ITTicket = ITTicket(int(ids[i]), subs[i], prios[i], stats[i], crDates[i])
-        itTickets.append(ticket)
-    
-    return itTickets
+_journal: Journal = Journal(Path("DATA") / "tickets.journal") #Row level changes not yet folded into the tickets snapshot
+_COLUMNS: tuple[tuple[str, str], ...] = (("ticket_id", "int"), ("subject", "cat"), ("priority", "cat"), ("status", "cat"), ("created_date", "date")) #Snapshot layout, same order as the row tuples
+_LABELS: dict[str, str] = {"ticket_id": "ticket_id", "subject": "subject", "priority": "priority", "status": "status", "created_date": "created_date"} #Filter/DataFrame label to column name, the same in the snapshot and in IT_Tickets
+_GROUP_COLUMNS: tuple[str, ...] = ("subject", "priority", "status", "created_date") #Columns GetColCount() can group by
+_counts: MaterializedCounts = MaterializedCounts({"subject": 1, "priority": 2, "status": 3}) #Whole table counts behind Metrics(), adjusted by every write
+_keys: KeyIndex = KeyIndex() #Rows changed since the snapshot by id, for O(1) CRUD checks
+_store: TableStore = TableStore(lambda: BuildFrame()) #Current frame shared by every session, rebuilt after writes
+_search: SearchIndex = SearchIndex(str(Path("DATA") / "intelligence_platform.db"), "IT_Tickets", "ticket_id", "subject", 1) #Full text index of ticket subjects, kept in step with the journal
 
 
-def GetColumn(col: str, ticket: ITTicket):
+@queryCache.Cached("tickets")
+def GetRows(filters: FilterSpec | None) -> pd.DataFrame:
     """
-        Matches string to respective column value
+        Explanation: 
+            Evaluates filters as one boolean mask over the tickets columns and returns the matching rows
         Args:
-            col (_str_): Contains string form of column
-            ticket (_ITTicket_): Ticket to get column value
+            filters (_FilterSpec | None_): Filter spec built from filters.Range/DateRange/InSet/And
         Returns:
-            (_int_ | _str_): Value of ticket[col]
+            df (_df.DataFrame_): Contains DataFrame with all rows and labelled columns
     """
-    match col:
-        case "ticket_id":
-            return ticket.GetID()
-        case "subject":
-            return ticket.GetSub()
-        case "priority":
-            return ticket.GetPrio()
-        case "status":
-            return ticket.GetStatus()
-        case "created_date":
-            return ticket.GetCrDate()
-        case _: # * = "All"
-            return ticket.GetAll()
+    frame: TableFrame = LoadFrame()
+    return frame.Rows(frame.Mask(filters), list(_LABELS))
 
 
-def CheckFilters(filters: dict | None, ticket: ITTicket):
+def GetCommittedRows(filters: FilterSpec | None) -> pd.DataFrame:
     """
-        Explanation: 
-            Iterates through filters and checks if the function value returns True for all, if one returns False, break and return False
+        Explanation:
+            Same rows and labels as GetRows(), but read from IT_Tickets with filters compiled to a parameterised WHERE clause by filters.Where(),
+            so SQLite and the indexes in schema.INDEXES do the filtering. Edits still in tickets.journal are not included until Commit()
         Args:
-            filters (_dict_): Dictionary of form dict[str, function]
-            ticket (_ITTicket_): Ticket which filter is being checked on
+            filters (_FilterSpec | None_): Filter spec built from filters.Range/DateRange/InSet/And
         Returns:
-            check (_bool_): If True, passed all filters. If False, failed one filter
-    """
-    if not filters:
-        return True
-    check: bool = True
-    for column in filters:
-        if not filters[column](GetColumn(column, ticket)): #type: ignore
-            check = False
-            break
-    
-    return check
+            df (_df.DataFrame_): Committed rows matching filters, ordered by id
+    """
+    where, params = Where(filters, _LABELS)
+    dbMgr = DatabaseManager(str(Path("DATA") / "intelligence_platform.db"), concurrent = True)
+    return dbMgr.FetchAll(f"SELECT {', '.join(f'{col} AS {label}' for label, col in _LABELS.items())} FROM IT_Tickets{where} ORDER BY ticket_id", params)
 
 
-def AddCnt(hash: dict, col: Any, colName: str) -> None:
+@queryCache.Cached("tickets")
+def GetPage(filters: FilterSpec | None, sortBy: str = "ticket_id", descending: bool = False, after: tuple | None = None, size: int = 50) -> tuple[pd.DataFrame, tuple | None]:
     """
-        Explanation:
-            Modifies hash to update col if found or not found
-        Args: 
-            hash (_dict_): Dictionary of type {column: count(column)}
-            col (_Any_): Contains column value of ticket
-            colName (_str_): Contains value of x-axis to be shown in charts
+        Explanation: 
+            Returns one page of the tickets matching filters with keyset pagination, only the rows of the page are decoded
+        Args:
+            filters (_FilterSpec | None_): Filter spec built from filters.Range/DateRange/InSet/And
+            sortBy (_str_): Column to sort by, ties broken by ticket_id
+            descending (_bool_): Sort largest first
+            after (_tuple | None_): Cursor returned with the previous page, None for the first page
+            size (_int_): Rows per page
+        Returns:
+            df (_df.DataFrame_): Rows of the page with labelled columns
+            cursor (_tuple | None_): after for the next page, None on the last page
     """
-    if col in hash[colName]:
-        index: int = hash[colName].index(col)
-        hash["Count"][index] += 1
-    else:
-        hash[colName].append(col)
-        hash["Count"].append(1)
+    frame: TableFrame = LoadFrame()
+    return frame.Page(frame.Mask(filters), list(_LABELS), sortBy, descending, after, size)
 
 
-def GetRows(filters: dict) -> pd.DataFrame:
+@queryCache.Cached("tickets")
+def Search(query: str, limit: int = 10) -> pd.DataFrame:
     """
         Explanation: 
-            Iterates through all rows of incidents, if filter pass, it appends to dataframe
+            Full text search of ticket subjects through the SQLite FTS5 index, every word must match and the last one may be a prefix
         Args:
-            filters (_dict_): Contains filters of form dict[str, function]
+            query (_str_): Search box text, e.g. "vpn conn"
+            limit (_int_): Number of matches to return
         Returns:
-            df (_df.DataFrame_): Contains DataFrame with all rows and labelled columns
+            df (_df.DataFrame_): Best matching tickets first, with labelled columns
     """
-    tickets: list[ITTicket] = GetTickets()
-    allRows: list = []
-    for ticket in tickets:
-        if CheckFilters(filters, ticket):
-            allRows.append(GetColumn("*", ticket))
-    
-    df: pd.DataFrame = pd.DataFrame(allRows, columns = ["ticket_id", "subject", "priority", "status", "created_date"])
-    return df
+    ids: list[int] = LoadSearch().Search(query, limit)
+    keys: KeyIndex = LoadKeys()
+    snapshot: ColumnarTable = LoadSnapshot()
+    rows: list[tuple | None] = [keys.Row(id, snapshot) for id in ids]
+    return pd.DataFrame([row for row in rows if row is not None], columns = list(_LABELS))
 
 
-def GetColCount(filters: dict, col: str) -> pd.DataFrame:
+@queryCache.Cached("tickets")
+def GetColCount(filters: FilterSpec | None, col: str) -> pd.DataFrame:
     """
         Explanation: 
-            Iterates through all rows of tickets, gets number of occurances of each value in col and returns respective dataframe
+            Counts the occurances of each value in col among the rows matching filters with one hash pass over the encoded column
+            Rows are sorted by value, so dates come out in date order for the line chart
         Args:
-            filters (_dict_): Contains filters of form dict[str, function]
+            filters (_FilterSpec | None_): Filter spec built from filters.Range/DateRange/InSet/And
             col (_str_): Contains column/attribute of ITTicket to get DataFrame from
         Returns:
-            df (_df.DataFrame_): Contains DataFrame with all rows and labelled columns
+            df (_df.DataFrame_): Columns col and "Count", empty if col cannot be grouped by
     """
-    tickets: list[ITTicket] = GetTickets() #Create dictionaries
-    subjects: dict[str, list[str | int]] = {col: [], "Count": []}
-    priorities: dict[str, list[str | int]] = {col: [], "Count": []}
-    statusS: dict[str, list[str | int]] = {col: [], "Count": []}
-    dates: dict[str, list[str | int]] = {col: [], "Count": []}
-    noTickets: int = len(tickets)
-    
-    for i in range(noTickets):
-        ticket = tickets[i]
-        if not CheckFilters(filters, ticket):
-            continue
-        
-        column = GetColumn(col, ticket) #Get number of occurances of each value in col
-        match col:
-            case "subject":
-                AddCnt(subjects, column, col)
-            case "priority":
-                AddCnt(priorities, column, col)
-            case "status":
-                AddCnt(statusS, column, col)
-            case "created_date":
-                AddCnt(dates, column, col)
-                
-    dfToReturn = {}           
-    match col: #Return correct DataFrame
-        case "subject":
-                dfToReturn = subjects
-        case "priority":
-                dfToReturn = priorities
-        case "status":
-                dfToReturn = statusS
-        case "created_date":
-                dfToReturn = dates
-    
-    return pd.DataFrame(dfToReturn)
+    if col not in _GROUP_COLUMNS:
+        return pd.DataFrame()
+    frame: TableFrame = LoadFrame()
+    return frame.CountFrame(col, frame.Mask(filters))
 
 
-def GetRowCnt(filters: dict) -> int:
+@queryCache.Cached("tickets")
+def GetRowCnt(filters: FilterSpec | None) -> int:
     """
         Args:
-            filters (_dict_): Contains filters of form dict[str, function]
+            filters (_FilterSpec | None_): Filter spec built from filters.Range/DateRange/InSet/And
         Returns:
-            cnt (_int_): Contains number of rows that fulfill filters        
+            cnt (_int_): Contains number of rows that fulfill filters
     """
-    tickets: list[ITTicket] = GetTickets()
-    cnt: int = 0
-    for ticket in tickets:
-        if CheckFilters(filters, ticket):
-            cnt += 1
-    
-    return cnt
+    return LoadFrame().CountWhere(filters)
 
 
-def GetIDs(tickets: list[ITTicket]) -> list[int]:
+def ValidID(id) -> bool:
     """
-        Args:
-            tickets (_list[ITTIcket]_): List of all tickets
-        Returns:
-            ids (_list[int]_): Contains list of all ids in tickets
+        Returns: (_bool_): True if id is a whole number, typed into a CRUD form or already an int
     """
-    ids: list[int] = []
-    for ticket in tickets:
-        ids.append(ticket.GetID())
-    return ids
+    return str(id).strip().isdigit()
 
 
-def CheckID(tickets: list[ITTicket], id: int) -> bool:
-    """If found return True, if not found return false"""
-    return True if id in GetIDs(tickets) else False
+def IDExists(id: int) -> bool:
+    """
+        Explanation:
+            Checks id against the primary key index, O(1) for dense ids, without building the whole table
+        Args:
+            id (int): id to look for
+        Returns:
+            bool: True if a row with id exists
+    """
+    return ValidID(id) and LoadKeys().Exists(int(id), LoadSnapshot())
 
 
 def InsertTicket(tID: int, sub: str, prio: str, status: str, crDate: str) -> bool:
@@ -198,47 +148,22 @@ def InsertTicket(tID: int, sub: str, prio: str, status: str, crDate: str) -> boo
             crDate (str): Contains new ticket createdDate
 
         Returns:
-            bool: True if ticket added, False if not added
+            bool: True if ticket added, False if not added (id taken or not a number, crDate not YYYY-MM-DD)
     """    
-    tickets: list[ITTicket] = GetTickets()
-    ticket: ITTicket = ITTicket(tID, sub, prio, status, crDate)
-    check = CheckID(tickets, tID)
-    if check:
+    if not ValidID(tID) or not ValidDate(crDate):
         return False
-    tickets.append(ticket)
-    WriteTickets(tickets)
+    row: tuple = (int(tID), sub, prio, status, crDate)
+    with _journal.Lock(): #Check and append as one step so two sessions cannot insert the same id
+        if IDExists(row[0]):
+            return False
+        LogChange("I", row[0], row)
     return True
 
 
-def GetIndex(lst: list[ITTicket], target: int) -> int:
-    """
-        Explanation:
-            Uses BinarySearch algorithm to search for target in most efficient manner
-            For more info go to https://www.geeksforgeeks.org/dsa/binary-search/
-        Args:
-            lst (list[ITTicket]): Contains all tickets
-            target (int): Target to be searched for
-        Returns:
-            int: Index location of target
-    """    
-    low: int = 0
-    high: int = len(lst) - 1
-    while low <= high:
-        mid: int = low + (high - low) // 2
-        if lst[mid].GetID() == target:
-            return mid
-        elif int(lst[mid].GetID()) < target:
-            low = mid + 1
-        else:
-            high = mid - 1
-
-    return -1
-
-
-def UpdateTicket(id: int, newId: int, newSub: str, newPrio: str, newStat :str, newDate: str) -> None:
+def UpdateTicket(id: int, newId: int, newSub: str, newPrio: str, newStat :str, newDate: str) -> bool:
     """
         Explanation:
-            Updates ticket after finding index of id and calls WriteTickets()
+            Logs the update of id to tickets.journal, IT_Tickets is updated on Commit()
         Args:
             id (int): Contains ticket id to update
             newId (int): Contains new ticket id
@@ -246,38 +171,105 @@ def UpdateTicket(id: int, newId: int, newSub: str, newPrio: str, newStat :str, n
             newPrio (str): Contains new ticket priority
             newStat (str): Contains new ticket status
             newDate (str): Contains new ticket created_date
+        Returns:
+            bool: False if id does not exist, newId is not a number, the date is not YYYY-MM-DD or newId belongs to another ticket, else True
     """    
-    tickets: list[ITTicket] = GetTickets()
-    index: int = GetIndex(tickets, int(id))
-    tickets[index] = ITTicket(newId, newSub, newPrio, newStat, newDate)
-    WriteTickets(tickets)
+    if not ValidID(newId) or not ValidDate(newDate):
+        return False
+    row: tuple = (int(newId), newSub, newPrio, newStat, newDate)
+    with _journal.Lock():
+        if not IDExists(id) or (row[0] != int(id) and IDExists(row[0])):
+            return False
+        LogChange("U", int(id), row)
+    return True
 
 
-def DeleteTicket(id: str):
+def DeleteTicket(id: str) -> bool:
     """
         Explanation:
-            Deletes ticket after finding index of id and calls WriteTickets()
+            Logs the deletion of id to tickets.journal, the row is removed from IT_Tickets on Commit()
         Args:
             id (str): Contains id of ticket to be deleted
+        Returns:
+            bool: False if id does not exist, else True
     """    
-    tickets: list[ITTicket] = GetTickets()
-    index: int = GetIndex(tickets, int(id))
-    tickets.remove(tickets[index])
-    WriteTickets(tickets)
+    with _journal.Lock():
+        if not IDExists(id):
+            return False
+        LogChange("D", int(id), None)
+    return True
 
 
-def IncCount(column: str, dictionary: dict) -> None:
+def InsertTickets(rows: list[tuple]) -> bool:
     """
         Explanation:
-            Increments dictionary[column] value by 1 if exists, else sets value to 1
+            Inserts every row or none: ids are checked against tickets and against each other, then all rows are journaled in one write
         Args:
-            column (str): Value in dictionary to increment/set
-            dictionary (dict): Dictionary containing various columns
-    """    
-    if column in dictionary:
-        dictionary[column] += 1 #type: ignore
-    else:
-        dictionary[column] = 1 #type: ignore
+            rows (list[tuple]): Rows of form (ticket_id, subject, priority, status, created_date)
+        Returns:
+            bool: False if any id is not a number, exists or repeats or any date is not YYYY-MM-DD, else True
+    """
+    if not all(ValidID(row[0]) and ValidDate(row[-1]) for row in rows): #The date is the last column
+        return False
+    records: list[tuple] = [("I", int(row[0]), (int(row[0]),) + tuple(row[1:])) for row in rows]
+    with _journal.Lock():
+        keys: KeyIndex = LoadKeys()
+        snapshot: ColumnarTable = LoadSnapshot()
+        if not Valid(records, lambda id: keys.Exists(id, snapshot)):
+            return False
+        LogChanges(records)
+    return True
+
+
+def UpdateTickets(ids: list[int], changes: dict[str, Any]) -> bool:
+    """
+        Explanation:
+            Sets the columns in changes on every ticket in ids with one journal write, e.g. UpdateTickets([1, 2], {"status": "resolved"})
+            Ids cannot be changed in bulk, UpdateTicket() does that for a single ticket
+        Args:
+            ids (list[int]): ids of the tickets to update
+            changes (dict[str, Any]): Column label to new value
+        Returns:
+            bool: False if any id is not a number, does not exist or repeats or changes names the id or an unknown column or a date that is not YYYY-MM-DD, else True
+    """
+    names: list[str] = [name for name, _ in _COLUMNS]
+    if not all(ValidID(id) for id in ids) or any(_LABELS.get(label) not in names[1:] for label in changes) or len(set(map(int, ids))) != len(ids):
+        return False
+    values: dict[int, Any] = {names.index(_LABELS[label]): val for label, val in changes.items()} #Row position to new value
+    if not ValidDate(values.get(len(names) - 1)): #The date is the last column
+        return False
+    with _journal.Lock():
+        keys: KeyIndex = LoadKeys()
+        snapshot: ColumnarTable = LoadSnapshot()
+        records: list[tuple] = []
+        for id in map(int, ids):
+            row: tuple | None = keys.Row(id, snapshot)
+            if row is None:
+                return False
+            records.append(("U", id, tuple(values.get(col, val) for col, val in enumerate(row))))
+        LogChanges(records)
+    return True
+
+
+def DeleteTickets(ids: list[int]) -> bool:
+    """
+        Explanation:
+            Deletes every ticket in ids or none, with one journal write
+        Args:
+            ids (list[int]): ids of the tickets to delete
+        Returns:
+            bool: False if any id is not a number, does not exist or repeats, else True
+    """
+    if not all(ValidID(id) for id in ids):
+        return False
+    records: list[tuple] = [("D", int(id), None) for id in ids]
+    with _journal.Lock():
+        keys: KeyIndex = LoadKeys()
+        snapshot: ColumnarTable = LoadSnapshot()
+        if not Valid(records, lambda id: keys.Exists(id, snapshot)):
+            return False
+        LogChanges(records)
+    return True
 
 
 def GetMaxMin(dictionary: dict[str, str | int]) -> None: 
@@ -305,7 +297,8 @@ def GetMaxMin(dictionary: dict[str, str | int]) -> None:
             dictionary["MinCol"] = col
     
 
-def Metrics(filters: dict):
+@queryCache.Cached("tickets")
+def Metrics(filters: FilterSpec | None):
     """
         Explanation:  
             Creates 3 dictionaries (subjects, priorities, statusS) of form dict[str, str | int]
@@ -314,23 +307,47 @@ def Metrics(filters: dict):
         Returns:
             tuple[dict[str, str | int]]: Contains 3 dictionaries containing maximum/minimum column name and value
     """
-    tickets: list[ITTicket] = GetTickets()
+    if not Conditions(filters):
+        return MaterializedMetrics()
+    frame: TableFrame = LoadFrame()
+    return MetricsOf(frame, frame.Mask(filters))
+
+
+def MetricsOf(frame: TableFrame, mask: np.ndarray) -> tuple:
+    """
+        Explanation: Builds the Metrics() dictionaries from frame's rows selected by mask
+        Returns:
+            tuple[dict[str, str | int]]: Dictionaries containing maximum/minimum column name and value
+    """
+    subjects: dict[str, str | int] = frame.CountDict("subject", mask) #Dict of form value : count, in first appearance order
+    priorities: dict[str, str | int] = frame.CountDict("priority", mask)
+    statusS: dict[str, str | int] = frame.CountDict("status", mask)
     
-    subjects: dict[str, str | int] = dict() #Dict of form subjectName : dict["Count": 0]
-    priorities: dict[str, str | int]  = dict()
-    statusS: dict[str, str | int]  = dict()
-
-    for i in range(len(tickets)):
-        if not CheckFilters(filters, tickets[i]):
-            continue 
-        ticket = tickets[i]
-        
-        subject: str = ticket.GetSub()
-        priority: str = ticket.GetPrio()
-        status: str = ticket.GetStatus()
-        IncCount(subject, subjects) #type: ignore
-        IncCount(priority, priorities) #type: ignore
-        IncCount(status, statusS) #type: ignore
+    GetMaxMin(subjects)
+    GetMaxMin(priorities)
+    GetMaxMin(statusS)
+
+    return subjects, priorities, statusS
+
+
+def MaterializedMetrics() -> tuple:
+    """
+        Explanation: 
+            Builds the Metrics() dictionaries from the materialized whole table counts
+            Only the first call after start up or RebuildSnapshot() scans the tickets, later calls cost O(distinct values)
+        Returns:
+            tuple[dict[str, str | int]]: Dictionaries containing maximum/minimum column name and value
+    """
+    while True:
+        frame: TableFrame | None = None if _counts.IsBuilt() else LoadFrame() #Loaded outside the journal lock, building a frame takes the store's build lock first
+        with _journal.Lock(): #Writes adjust the counts under the same lock, so a build from the current frame cannot miss one
+            if frame is not None and not _counts.IsBuilt() and _store.IsCurrent(frame):
+                _counts.Build(frame)
+            if _counts.IsBuilt():
+                subjects: dict[str, str | int] = _counts.Counts("subject") #Dict of form value : count
+                priorities: dict[str, str | int] = _counts.Counts("priority")
+                statusS: dict[str, str | int] = _counts.Counts("status")
+                break
     
     GetMaxMin(subjects)
     GetMaxMin(priorities)
@@ -339,37 +356,186 @@ def Metrics(filters: dict):
     return subjects, priorities, statusS
 
 
-def GetTickets() -> list[ITTicket]:
+@queryCache.Cached("tickets")
+def DashboardQuery(filters: FilterSpec | None, counts: tuple = _GROUP_COLUMNS) -> DashboardResult:
+    """
+        Explanation:
+            Computes everything an Analysis tab render needs (row count, column counts, metrics) from one frame and one filter mask,
+            instead of every widget loading and scanning the table again
+            Metrics cover the filtered tickets, like Metrics(filters)
+        Args:
+            filters (_FilterSpec | None_): Filter spec built from filters.Range/DateRange/InSet/And
+            counts (_tuple_): Columns to count for the charts
+        Returns:
+            result (_DashboardResult_): Bundle the widgets read from
+    """
+    frame: TableFrame = LoadFrame()
+    mask: np.ndarray = frame.Mask(filters)
+    colCounts: dict[str, pd.DataFrame] = {col: frame.CountFrame(col, mask) for col in counts if col in _GROUP_COLUMNS}
+    return DashboardResult(frame.Count(mask), colCounts, MetricsOf(frame, mask) if Conditions(filters) else MaterializedMetrics())
+
+
+def LoadFrame() -> TableFrame:
+    """
+        Explanation:
+            Current tickets frame from the process wide store, read by GetRows/GetRowCnt/GetColCount/Metrics
+            Every session shares it and it is only rebuilt after a write, so reruns do not reread the snapshot or journal
+        Returns:
+            frame (TableFrame): Filterable, countable view of every ticket
+    """
+    return _store.Get()
+
+
+def BuildFrame() -> TableFrame:
+    """
+        Explanation:
+            Column arrays of the last tickets snapshot with tickets.journal replayed over them
+        Returns:
+            frame (TableFrame): Filterable, countable view of every ticket
+    """
+    with _journal.Lock():
+        snapshot: ColumnarTable = LoadSnapshot()
+        records, _ = _journal.Read()
+    return TableFrame(snapshot, records, _LABELS)
+
+
+def LoadSnapshot() -> ColumnarTable:
     """
         Explanation:
-            Uses pickle module to read(Deserialise) tickets.bin containing tickets
+            Memory maps the newest tickets snapshot, rebuilds it from IT_Tickets if it does not exist
+            Already open snapshots are reused, so this costs a directory listing rather than a full read
         Returns: 
-            tickets (list[ITTicket]): Contains all tickets
+            snapshot (ColumnarTable): Column arrays of all tickets as of the last snapshot
     """
-    with open(Path("DATA") / "tickets.bin", "rb") as ticketsObjs:
-        tickets = pickle.load(ticketsObjs) 
-    return tickets
+    snapshot: ColumnarTable | None = OpenSnapshot(Path("DATA"), "tickets")
+    return snapshot if snapshot is not None else RebuildSnapshot()
 
 
-def WriteTickets(tickets: list[ITTicket]):
+def RebuildSnapshot() -> ColumnarTable:
     """
+        Explanation:
+            Commits pending changes, then writes a fresh tickets snapshot from IT_Tickets and empties tickets.journal
+        Returns: 
+            snapshot (ColumnarTable): Column arrays of all tickets
+    """
+    dbMgr = DatabaseManager(str(Path("DATA") / "intelligence_platform.db"), concurrent = True)
+    with _journal.Lock():
+        if OpenSnapshot(Path("DATA"), "tickets") is not None: #Without a snapshot there is nothing to replay changes over
+            Commit()
+        WriteTickets(dbMgr.FetchIter("SELECT ticket_id, subject, priority, status, created_date FROM IT_Tickets ORDER BY ticket_id"))
+        _journal.Reset()
+        _counts.Reset()
+        _keys.Reset()
+        _search.Sync() #Only the rows the database changed, the index already follows the journal
+        _store.Bump()
+        queryCache.Bump("tickets") #Rows now come from the database, which may have changed outside the app
+        return OpenSnapshot(Path("DATA"), "tickets") #type: ignore
+
+
+def LogChange(op: str, id: int, row: tuple | None) -> None:
+    """
+        Explanation:
+            Appends one change to tickets.journal (O(1)) instead of rewriting the snapshot
+            Once the journal passes its size threshold it is folded into a new snapshot on a background thread
+        Args:
+            op (str): "I" (insert), "U" (update), "D" (delete) or "C" (committed to the database)
+            id (int): id of the changed row, the old id for updates
+            row (tuple | None): New row values, None for delete
+    """
+    LogChanges([(op, id, row)])
+
+
+def LogChanges(records: list[tuple]) -> None:
+    """
+        Explanation:
+            Appends records of form (op, id, row) to tickets.journal in one write, then brings the key index, counts and caches up to date
+            Callers hold the journal lock and have validated the records
+    """
+    keys: KeyIndex = LoadKeys() #Loaded before appending, so it does not already contain records
+    snapshot: ColumnarTable = LoadSnapshot()
+    appended: bool = _journal.AppendMany(records)
+    for op, id, row in records:
+        old: tuple | None = keys.Row(id, snapshot) if op in ("U", "D") and _counts.IsBuilt() else None
+        keys.Apply(op, id, row)
+        if op != "C":
+            _counts.Apply(old, row)
+    _search.Apply(records)
+    if any(op != "C" for op, _, _ in records): #Commits do not change the rows, every other record does
+        queryCache.Bump("tickets")
+        _store.Bump()
+    if appended:
+        _journal.CompactInBackground(LoadSnapshot, Fold, WriteCompacted)
+
+
+def LoadKeys() -> KeyIndex:
+    """
+        Explanation: Builds the primary key index from tickets.journal the first time it is needed, later writes keep it current
+    """
+    with _journal.Lock():
+        LoadSnapshot() #May rebuild the snapshot, which resets the index
+        if not _keys.IsLoaded():
+            records, _ = _journal.Read()
+            _keys.Load(records)
+        return _keys
+
+
+def LoadSearch() -> SearchIndex:
+    """
+        Explanation: Builds the full text index from the tickets snapshot and journal if it does not exist yet, later writes keep it current
+    """
+    with _journal.Lock():
+        snapshot: ColumnarTable = LoadSnapshot()
+        if not _search.IsBuilt():
+            records, _ = _journal.Read()
+            _search.Build(zip(snapshot.Array("ticket_id").tolist(), snapshot.Decode("subject")), records)
+        return _search
+
+
+def Fold(snapshot: ColumnarTable, records: list[tuple]) -> tuple[list[tuple], set[int]]:
+    """
+        Returns: (_tuple_): Rows of snapshot with records replayed, and the ids still waiting for Commit()
+    """
+    return Replay(snapshot.Rows(), records), Dirty(snapshot.meta.get("dirty", ()), records)
+
+
+def WriteCompacted(state: tuple[list[tuple], set[int]]) -> None:
+    """
+        Explanation:
+            Writes the snapshot a compaction folded with Fold(), called under the journal lock
+            The key index is dropped too, the next LoadKeys() rebuilds it from the records left in tickets.journal, so it does not grow until a full rebuild
+    """
+    WriteTickets(*state)
+    _keys.Reset()
+
+
+def WriteTickets(rows, dirty = ()) -> None:
+    """
+        Explanation:
+            Writes rows as the next tickets snapshot generation (DATA/tickets.NNNNNN.snap), older generations are removed
         Args:
-            tickets (list[ITTicket]): Contains all tickets in tickets.bin
+            rows (Iterable[tuple]): Row tuples in _COLUMNS order
+            dirty (Iterable[int]): Ids not yet committed to IT_Tickets, kept in the snapshot header so compaction does not lose them
     """    
-    with open(Path("DATA") / "tickets.bin", "wb") as ticketsObjs:
-        pickle.dump(tickets, ticketsObjs)
-        
+    WriteSnapshot(Path("DATA"), "tickets", _COLUMNS, rows, {"dirty": sorted(dirty)})
+
 
 def Commit():
     """
         Explanation:
             Commits all changes made to tickets after logging out
-            Iterates through every ticket and adds ticket to IT_Tickets in intelligence_platform.db
+            Only rows inserted, updated or deleted since the last commit are written, as upserts and deletes inside one transaction
     """
-    tickets = GetTickets()
-    dbMgr = DatabaseManager(str(Path("DATA") / "intelligence_platform.db"))
-    dbMgr.Exec("DELETE FROM IT_Tickets")
-    for ticket in tickets:
-        dbMgr.Exec("INSERT INTO IT_Tickets (ticket_id, subject, priority, status, created_date) VALUES (?, ?, ?, ?, ?)", (str(ticket.GetID()), ticket.GetSub(), ticket.GetPrio(), ticket.GetStatus(), ticket.GetCrDate()) )
+    dbMgr = DatabaseManager(str(Path("DATA") / "intelligence_platform.db"), concurrent = True)
+    with _journal.Lock():
+        snapshot: ColumnarTable = LoadSnapshot()
+        records, _ = _journal.Read()
+        dirty: list[int] = sorted(Dirty(snapshot.meta.get("dirty", ()), records))
+        if not dirty:
+            return
+        current: dict[int, tuple] = {row[0]: row for row in Replay(snapshot.Lookup(dirty), records)} #Latest values of the dirty rows only
+        with dbMgr.Transaction():
+            dbMgr.ExecMany("DELETE FROM IT_Tickets WHERE ticket_id = ?", ((id,) for id in dirty if id not in current))
+            dbMgr.ExecMany("INSERT INTO IT_Tickets (ticket_id, subject, priority, status, created_date) VALUES (?, ?, ?, ?, ?) ON CONFLICT(ticket_id) DO UPDATE SET subject = excluded.subject, priority = excluded.priority, status = excluded.status, created_date = excluded.created_date", (current[id] for id in dirty if id in current))
+        LogChange("C", 0, None)
     
     dbMgr.Close()
\ No newline at end of file
@@ -6,7 +6,7 @@ import pickle
 
 
 def LoginUser(username: str, password: str):
-    dbMgr = DatabaseManager(str(Path("DATA") / "intelligence_platform.db"))
+    dbMgr = DatabaseManager(str(Path("DATA") / "intelligence_platform.db"), concurrent = True)
     authMgr = AuthManager(dbMgr)
     loginResult = authMgr.LoginUser(username, password)
     if loginResult == True:
@@ -16,7 +16,7 @@ def LoginUser(username: str, password: str):
 
 def RegisterUser(username: str, password: str, confPass: str):
     users: list[User] = GetUsers()
-    dbMgr = DatabaseManager(str(Path("DATA") / "intelligence_platform.db"))
+    dbMgr = DatabaseManager(str(Path("DATA") / "intelligence_platform.db"), concurrent = True)
     authMgr = AuthManager(dbMgr)
     registerResult: tuple = authMgr.RegisterUser(username, password, confPass)
     if registerResult[0] == True:
@@ -39,14 +39,14 @@ def WriteUsers(users: list[User]):
 def Commit():
     """
         Explanation:
-            Commits all changes made to tickets after logging out
-            Iterates through every ticket and adds ticket to IT_Tickets in intelligence_platform.db
+            Commits all changes made to users after logging out
+            Replaces every row of Users in intelligence_platform.db with users inside one transaction
     """
     users: list[User] = GetUsers()
-    dbMgr = DatabaseManager(str(Path("DATA") / "intelligence_platform.db"))
-    dbMgr.Exec("DELETE FROM Users")
-    for user in users:
-        dbMgr.Exec("INSERT INTO IT_Tickets (username, password_hash) VALUES (?, ?)", (user.GetUserName(), user.__passwdHash) )
+    dbMgr = DatabaseManager(str(Path("DATA") / "intelligence_platform.db"), concurrent = True)
+    with dbMgr.Transaction():
+        dbMgr.Exec("DELETE FROM Users")
+        dbMgr.ExecMany("INSERT INTO Users (username, password_hash) VALUES (?, ?)", ((user.GetUserName(), user.GetPassHash()) for user in users))
     
     dbMgr.Close()
 
@@ -56,14 +56,10 @@ def TransferFromDB():
         Gets all rows from Users and creates a list of User
         Returns: users (_list[User]_): List containing all tickets in database
     """
-    dbMgr = DatabaseManager(str(Path("DATA") / "intelligence_platform.db"))
-    df = dbMgr.FetchAll("SELECT * FROM Users")
+    dbMgr = DatabaseManager(str(Path("DATA") / "intelligence_platform.db"), concurrent = True)
     users: list[User] = []
-    userName: list[str] = df["username"].tolist()
-    passHash: list[str] = df["password_hash"].tolist()
-    for i in range(len(df)):
-        user: User = User(userName[i], passHash[i])
-        users.append(user)
+    for userName, passHash in dbMgr.FetchIter("SELECT username, password_hash FROM Users"):
+        users.append(User(userName, passHash))
     
     return users
 
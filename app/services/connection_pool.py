@@ -0,0 +1,240 @@
+import sqlite3
+import threading
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+
+
+def OpenConnection(dbPath: str, concurrent: bool = False, busyTimeout: float = 5.0, readOnly: bool = False) -> sqlite3.Connection:
+    """
+        Explanation:
+            Opens a connection that waits up to busyTimeout seconds on a locked database instead of failing at once
+            In concurrent mode the database is switched to WAL journaling so readers never block on the writer
+        Args:
+            dbPath (_str_): Path of SQLite database file
+            concurrent (_bool_): Enables WAL journaling
+            busyTimeout (_float_): Seconds to wait for a lock before raising "database is locked"
+            readOnly (_bool_): Sets PRAGMA query_only so the connection can only read
+        Returns:
+            conn (_sqlite3.Connection_): Configured connection, usable from any thread (one thread at a time)
+    """
+    conn = sqlite3.connect(dbPath, timeout = busyTimeout, check_same_thread = False)
+    conn.execute(f"PRAGMA busy_timeout = {int(busyTimeout * 1000)}")
+    if concurrent:
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL") #Safe with WAL, avoids an fsync per commit
+    if readOnly:
+        conn.execute("PRAGMA query_only = ON")
+    return conn
+
+
+class ConnectionPool:
+    """
+        Keeps warm sqlite3 connections for one database file.
+        A thread checks out one connection and keeps it until its outermost Release(),
+        nested checkouts on the same thread get the same connection back.
+        Released connections go to an idle queue so the next Streamlit script thread reuses them.
+    """
+    def __init__(self, dbPath: str, maxIdle: int = 4, concurrent: bool = False, busyTimeout: float = 5.0) -> None:
+        self.__dbPath: str = dbPath
+        self.__maxIdle: int = maxIdle
+        self.__concurrent: bool = concurrent
+        self.__busyTimeout: float = busyTimeout
+        self.__idle: deque[sqlite3.Connection] = deque()
+        self.__lock = threading.Lock()
+        self.__local = threading.local()
+
+
+    def __Open(self) -> sqlite3.Connection:
+        #In concurrent mode pooled connections are readers only, writes go through WriterConnection
+        return OpenConnection(self.__dbPath, self.__concurrent, self.__busyTimeout, readOnly = self.__concurrent)
+
+
+    def __Healthy(self, conn: sqlite3.Connection) -> bool:
+        """
+            Returns: (_bool_): True if conn can still run a query, False if it is closed or broken
+        """
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+
+    def Acquire(self) -> sqlite3.Connection:
+        """
+            Explanation:
+                Returns the connection already held by this thread, otherwise takes a healthy idle one or opens a new one
+            Returns:
+                conn (_sqlite3.Connection_): Connection bound to the calling thread until Release()
+        """
+        if getattr(self.__local, "conn", None) is not None:
+            self.__local.depth += 1
+            return self.__local.conn
+
+        conn: sqlite3.Connection | None = None
+        while conn is None:
+            with self.__lock:
+                candidate = self.__idle.pop() if self.__idle else None
+            if candidate is None:
+                conn = self.__Open()
+            elif self.__Healthy(candidate):
+                conn = candidate
+            else:
+                candidate.close()
+
+        self.__local.conn = conn
+        self.__local.depth = 1
+        self.__local.txDepth = 0
+        return conn
+
+
+    def Release(self) -> None:
+        """
+            Explanation:
+                Undoes one Acquire(). On the outermost release any open transaction is rolled back
+                and the connection is returned to the idle queue (or closed if the queue is full)
+        """
+        conn: sqlite3.Connection | None = getattr(self.__local, "conn", None)
+        if conn is None:
+            return
+        self.__local.depth -= 1
+        if self.__local.depth > 0:
+            return
+
+        self.__local.conn = None
+        if conn.in_transaction:
+            conn.rollback()
+        with self.__lock:
+            if len(self.__idle) < self.__maxIdle:
+                self.__idle.append(conn)
+                return
+        conn.close()
+
+
+    def InTransaction(self) -> bool:
+        """Returns True if the calling thread is inside a DatabaseManager.Transaction() scope"""
+        return getattr(self.__local, "txDepth", 0) > 0
+
+
+    def EnterTransaction(self) -> bool:
+        """
+            Returns: (_bool_): True if this is the outermost transaction scope on the calling thread
+        """
+        self.__local.txDepth = getattr(self.__local, "txDepth", 0) + 1
+        return self.__local.txDepth == 1
+
+
+    def ExitTransaction(self) -> None:
+        self.__local.txDepth -= 1
+
+
+    @contextmanager
+    def Checkout(self):
+        """
+            Explanation: Context managed Acquire()/Release(), use as `with pool.Checkout() as conn:`
+        """
+        conn = self.Acquire()
+        try:
+            yield conn
+        finally:
+            self.Release()
+
+
+    def CloseAll(self) -> None:
+        """
+            Closes every idle connection. Connections currently checked out are closed when released into a full queue
+        """
+        with self.__lock:
+            while self.__idle:
+                self.__idle.pop().close()
+
+
+class WriterConnection:
+    """
+        Single write connection shared by every thread for one database file.
+        Acquire() takes a re-entrant lock so writes from different Streamlit sessions run one after another
+        instead of failing with "database is locked". Same Acquire/Release/Transaction interface as ConnectionPool.
+    """
+    def __init__(self, dbPath: str, busyTimeout: float = 5.0) -> None:
+        self.__conn: sqlite3.Connection = OpenConnection(dbPath, True, busyTimeout)
+        self.__lock = threading.RLock()
+        self.__owner: int | None = None
+        self.__depth: int = 0
+        self.__txDepth: int = 0
+
+
+    def Acquire(self) -> sqlite3.Connection:
+        self.__lock.acquire()
+        self.__owner = threading.get_ident()
+        self.__depth += 1
+        return self.__conn
+
+
+    def Release(self) -> None:
+        if self.__owner != threading.get_ident():
+            return
+        self.__depth -= 1
+        if self.__depth == 0:
+            if self.__conn.in_transaction:
+                self.__conn.rollback()
+            self.__owner = None
+        self.__lock.release()
+
+
+    def HeldByCurrentThread(self) -> bool:
+        return self.__owner == threading.get_ident()
+
+
+    def InTransaction(self) -> bool:
+        return self.HeldByCurrentThread() and self.__txDepth > 0
+
+
+    def EnterTransaction(self) -> bool:
+        self.__txDepth += 1
+        return self.__txDepth == 1
+
+
+    def ExitTransaction(self) -> None:
+        self.__txDepth -= 1
+
+
+    @contextmanager
+    def Checkout(self):
+        conn = self.Acquire()
+        try:
+            yield conn
+        finally:
+            self.Release()
+
+
+_pools: dict[tuple, ConnectionPool] = {}
+_writers: dict[str, WriterConnection] = {}
+_poolsLock = threading.Lock()
+
+
+def GetPool(dbPath: str, concurrent: bool = False, busyTimeout: float = 5.0) -> ConnectionPool:
+    """
+        Args:
+            dbPath (_str_): Path of SQLite database file
+            concurrent (_bool_): If True the pool hands out WAL, read only connections
+            busyTimeout (_float_): Seconds a connection waits on a lock
+        Returns:
+            pool (_ConnectionPool_): Process wide pool for these settings, created on first use
+    """
+    key: tuple = (str(Path(dbPath).resolve()), concurrent, busyTimeout)
+    with _poolsLock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(dbPath, concurrent = concurrent, busyTimeout = busyTimeout)
+        return _pools[key]
+
+
+def GetWriter(dbPath: str, busyTimeout: float = 5.0) -> WriterConnection:
+    """
+        Returns: writer (_WriterConnection_): The one serialized write connection for dbPath in this process
+    """
+    key: str = str(Path(dbPath).resolve())
+    with _poolsLock:
+        if key not in _writers:
+            _writers[key] = WriterConnection(dbPath, busyTimeout)
+        return _writers[key]
@@ -1,53 +1,152 @@
 import sqlite3
 import pandas as pd
-from typing import Any, Iterable
+from contextlib import contextmanager
+from typing import Any, Iterable, Iterator
+from app.services.connection_pool import ConnectionPool, WriterConnection, GetPool, GetWriter
 
 class DatabaseManager:
-    def __init__(self, dbPath: str) -> None:
+    def __init__(self, dbPath: str, concurrent: bool = False, busyTimeout: float = 5.0) -> None:
+        """
+            Args:
+                dbPath (_str_): Path of SQLite database file
+                concurrent (_bool_): Multi-session mode. WAL journaling, reads on pooled read only connections,
+                                     writes serialized through one shared writer connection
+                busyTimeout (_float_): Seconds to wait on a locked database before raising
+        """
         self.__dbPath = dbPath
+        self.__pool: ConnectionPool = GetPool(dbPath, concurrent, busyTimeout)
+        self.__writer: ConnectionPool | WriterConnection = GetWriter(dbPath, busyTimeout) if concurrent else self.__pool
         self.__connection: sqlite3.Connection | None = None
-        
+
     def Connect(self):
+        """Checks out a pooled connection and holds it until Close()"""
         if not self.__connection:
-            self.__connection = sqlite3.connect(self.__dbPath)
-    
+            self.__connection = self.__pool.Acquire()
+
     def Close(self):
+        """Returns the held connection to the pool, the connection itself stays open for reuse"""
         if self.__connection:
-            self.__connection.close() #type: ignore
-    
+            self.__pool.Release()
+            self.__connection = None
+
+    @contextmanager
+    def Checkout(self):
+        """
+            Explanation: 
+                Yields this thread's pooled connection, use as `with dbMgr.Checkout() as conn:`
+                Inside a Transaction() the writer is returned instead so reads see the uncommitted writes
+        """
+        source = self.__writer if self.__writer is not self.__pool and self.__writer.HeldByCurrentThread() else self.__pool #type: ignore
+        with source.Checkout() as conn:
+            yield conn
+
+    @contextmanager
+    def WriteCheckout(self):
+        """
+            Explanation: Yields the connection writes go through (the serialized writer in concurrent mode)
+        """
+        with self.__writer.Checkout() as conn:
+            yield conn
+
+    @contextmanager
+    def Transaction(self):
+        """
+            Explanation:
+                Groups every Exec()/ExecMany() inside `with dbMgr.Transaction():` into a single commit
+                Rolls back everything if the block raises. Nested scopes join the outermost one
+        """
+        with self.WriteCheckout() as conn:
+            outermost: bool = self.__writer.EnterTransaction()
+            try:
+                if outermost and not conn.in_transaction:
+                    conn.execute("BEGIN IMMEDIATE") #Take the write lock up front instead of upgrading mid transaction
+                yield self
+                if outermost:
+                    conn.commit()
+            except BaseException:
+                if outermost:
+                    conn.rollback()
+                raise
+            finally:
+                self.__writer.ExitTransaction()
+
     def Exec(self, sql: str, params: Iterable[Any] = ()):
-        if self.__connection is None:
-            self.Connect()
+        with self.WriteCheckout() as conn:
+            cursor = conn.cursor()
+            cursor.execute(sql, tuple(params))
+            if not self.__writer.InTransaction():
+                conn.commit()
+        return cursor
 
-        cursor = self.__connection.cursor() #type: ignore
-        cursor.execute(sql, tuple(params))
-        self.__connection.commit() #type: ignore
+    def ExecMany(self, sql: str, rows: Iterable[Iterable[Any]]):
+        """
+            Explanation: Runs sql once per row with cursor.executemany and commits once (or at the end of the enclosing Transaction())
+            Args:
+                sql (_str_): Parameterised statement
+                rows (_Iterable_): Parameters for each execution
+        """
+        with self.WriteCheckout() as conn:
+            cursor = conn.cursor()
+            cursor.executemany(sql, (tuple(row) for row in rows))
+            if not self.__writer.InTransaction():
+                conn.commit()
         return cursor
 
     def FetchOne(self, sqlQuery: str, params: Iterable[Any] = ()):
-        if self.__connection is None:
-            self.Connect()
-        cursor = self.__connection.cursor() #type: ignore
-        cursor.execute(sqlQuery, tuple(params))
-        row = cursor.fetchone()
-        self.Close()
+        with self.Checkout() as conn:
+            cursor = conn.cursor()
+            cursor.execute(sqlQuery, tuple(params))
+            row = cursor.fetchone()
         return row
 
     def FetchAll(self, sqlQuery: str, params: Iterable[Any] = ()):
-        if self.__connection is None:
-            self.Connect()
-        df = pd.read_sql_query(sqlQuery, self.__connection)
-        self.Close()
+        with self.Checkout() as conn:
+            df = pd.read_sql_query(sqlQuery, conn, params = tuple(params))
         return df
 
+    def FetchIter(self, sqlQuery: str, params: Iterable[Any] = (), chunkSize: int = 1000) -> Iterator[tuple]:
+        """
+            Explanation:
+                Streams rows with cursor.fetchmany so at most chunkSize rows are in memory at once
+                The pooled connection stays checked out until the generator is exhausted or closed on the same thread
+            Args:
+                sqlQuery (_str_): Query to run
+                params (_Iterable_): Query parameters
+                chunkSize (_int_): Rows fetched from SQLite per round trip
+            Returns:
+                (_Iterator[tuple]_): One tuple per row
+        """
+        with self.Checkout() as conn:
+            cursor = conn.cursor()
+            cursor.execute(sqlQuery, tuple(params))
+            while True:
+                rows = cursor.fetchmany(chunkSize)
+                if not rows:
+                    break
+                yield from rows
+
+    def FetchChunks(self, sqlQuery: str, params: Iterable[Any] = (), chunkSize: int = 10000) -> Iterator[pd.DataFrame]:
+        """
+            Explanation: Same as FetchAll() but yields the result as DataFrames of at most chunkSize rows
+            Returns:
+                (_Iterator[pd.DataFrame]_): DataFrames labelled with the query's column names
+        """
+        with self.Checkout() as conn:
+            cursor = conn.cursor()
+            cursor.execute(sqlQuery, tuple(params))
+            columns: list[str] = [desc[0] for desc in cursor.description]
+            while True:
+                rows = cursor.fetchmany(chunkSize)
+                if not rows:
+                    break
+                yield pd.DataFrame.from_records(rows, columns = columns)
+
     def FetchScript(self, sqlQueries: list[str]):
-        if self.__connection is None:
-            self.Connect()
-        cursor = self.__connection.cursor() #type: ignore
-        rows = []
-        for query in sqlQueries:
-            cursor.execute(query)
-            rows.append(cursor.fetchone())
-        
-        self.Close()
-        return rows
\ No newline at end of file
+        with self.Checkout() as conn:
+            cursor = conn.cursor()
+            rows = []
+            for query in sqlQueries:
+                cursor.execute(query)
+                rows.append(cursor.fetchone())
+
+        return rows
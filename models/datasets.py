@@ -1,4 +1,6 @@
 class Dataset:
+    __slots__ = ("__id", "__name", "__ctgry", "__fileSize", "__source", "__lastUpd") #No per instance __dict__, attributes are stored inline
+
     def __init__(self, id: int, name: str, ctgry: str, sizeMB :float, source: str, lastUpd: str) -> None:
         self.__id: int = id
         self.__name: str = name
@@ -10,6 +12,9 @@ class Dataset:
     def CalcSizeB(self):
         return self.__fileSize * 1048576 #1MB = 1048576B (2^20)
 
+    def __reduce__(self):
+        return (Dataset, self.GetAll()) #Pickled as its constructor arguments
+
     def __str__(self):
         return f"ID: {self.__id}, Name: {self.__name}, Category: {self.__ctgry}, File Size(MB): {self.__fileSize}, File Size (B): {self.CalcSizeB()}, Source: {self.__source}, Last Updated: {self.__lastUpd}"
 
@@ -1,4 +1,6 @@
 class Incident:
+    __slots__ = ("__id", "__inc", "__sev", "__status", "__crDate") #No per instance __dict__, attributes are stored inline
+
     def __init__(self, id: int, incType: str, severity: str, status: str, createdDate: str) -> None:
         self.__id = id
         self.__inc = incType
@@ -7,6 +9,10 @@ class Incident:
         self.__crDate = createdDate
     
     
+    def __reduce__(self):
+        return (Incident, self.GetAll()) #Pickled as its constructor arguments
+    
+    
     def __str__(self):
         return f"ID: {self.__id}, Incident Type: {self.__inc}, Severity: {self.__sev}, Status: {self.__status}, Created Date: {self.__crDate}"
     
@@ -1,4 +1,6 @@
 class ITTicket:
+    __slots__ = ("__tid", "__sub", "__prio", "__status", "__crDate") #No per instance __dict__, attributes are stored inline
+
     def __init__(self, tid: int, sub: str, prio: str, status: str, createdDate: str) -> None:
         self.__tid = tid
         self.__sub = sub
@@ -7,6 +9,10 @@ class ITTicket:
         self.__crDate = createdDate
     
     
+    def __reduce__(self):
+        return (ITTicket, self.GetAll()) #Pickled as its constructor arguments
+    
+    
     def __str__(self):
         return f"ID: {self.__tid}, Subject: {self.__sub}, Priority: {self.__prio}, Status: {self.__status}, Created Date: {self.__crDate}"
     
@@ -1,4 +1,6 @@
 class User:
+    __slots__ = ("__userName", "__passwdHash") #No per instance __dict__, attributes are stored inline
+
     def __init__(self, userName: str, passwdHash: str):
         self.__userName = userName
         self.__passwdHash = passwdHash
@@ -14,5 +16,9 @@ class User:
         return hasher.checkPasswd(plainText, self.__passwdHash)
     
     
+    def __reduce__(self):
+        return (User, (self.__userName, self.__passwdHash)) #Pickled as its constructor arguments
+    
+    
     def __str__(self):
         return f"Username: {self.__userName}"
\ No newline at end of file
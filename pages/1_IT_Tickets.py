@@ -5,6 +5,7 @@ from openai import OpenAI
 from matplotlib.pyplot import subplots
 from datetime import date
 from typing import Literal
+from app.data.filters import FilterSpec, Range, DateRange, InSet, And, ParseIDs, MAX_IDS
 from app.services.ai_assistant import AIAssistant
 
 
@@ -50,7 +51,7 @@ def RowColumnCnt() -> None:
     """
         Displays metric containing number of rows in filtered output
     """
-    rowCnt = tickets.GetRowCnt(filterCons)
+    rowCnt = dashboard.GetRowCnt()
     st.metric("Row Count", rowCnt)
     
 
@@ -69,7 +70,7 @@ def AnalysisSummary() -> None:
         Explanation: Creates 6 metrics for most and least amounts of tickets, priorities, and statuses
         Returns: None
     """
-    subjects, priorities, statusS = tickets.Metrics(filterCons)  
+    subjects, priorities, statusS = dashboard.GetMetrics()  
     
     with st.container(horizontal = True):
         st.metric("Most Records of Tickets", f"{subjects["MaxCol"].title()}:\n{subjects["MaxVal"]}", width = "content", border = True) #type: ignore 
@@ -94,7 +95,8 @@ def GetDate(dateVal: str) -> date:
 def FilterConditions(idStart: str, idStop: str, titles: tuple, priorities :tuple, status: tuple, dateStart :str, dateStop: str):
     """
         Explanation: 
-            Checks every filter variable. If filled: adds key: value pair to filterCons of form {column: lambda function}
+            Checks every filter variable. If filled: adds its condition and sets filterCons to the And of them
+            filterCons is also saved in st.session_state, Filters() restores it on later reruns
         Args:
             idStart (_str_): Start range of ID
             idStop (_str_): Stop range of ID
@@ -105,25 +107,31 @@ def FilterConditions(idStart: str, idStop: str, titles: tuple, priorities :tuple
             dateStop (_str_): Stop range of date
     """
     global filterCons
+    conditions: list[FilterSpec] = []
     if idStart and idStop: #Both selected by default
-        filterCons["ticket_id"] = lambda tId: int(idStart) <= tId <= int(idStop)
+        conditions.append(Range("ticket_id", int(idStart), int(idStop)))
     if titles:
-        filterCons["subject"] = lambda sub: sub in titles
+        conditions.append(InSet("subject", titles))
     if priorities:
-        filterCons["priority"] = lambda prio: prio in priorities
+        conditions.append(InSet("priority", priorities))
     if status:
-        filterCons["status"] = lambda stat: stat in status
+        conditions.append(InSet("status", status))
     if dateStart: #Selected as today by default
-        filterCons["created_date"] = lambda date: GetDate(dateStart) <= GetDate(date) <= GetDate(dateStop)
+        conditions.append(DateRange("created_date", dateStart, dateStop))
+    filterCons = And(*conditions)
+    st.session_state.itFilters = filterCons #Kept for the reruns that follow, e.g. Next/Previous page clicks
 
 
 def Filters() -> None:
     """
         Creates widgets for filters which include textboxes, checkboxes, and date inputs
         When apply filters button clicked, pass user input values to FilterConditions()
+        Until then the filters applied on an earlier rerun are used
     """
+    global filterCons
     if curTab != "Analysis": #Only show when on analysis tab
         return
+    filterCons = st.session_state.get("itFilters", And()) #Filters applied on an earlier rerun stay applied
     
     with st.sidebar:
         st.title("Filters")
@@ -156,23 +164,54 @@ def BarCheck(column: str) -> None:
         Checks if filter has applied and updates chart everytime button is pressed
         It then calls BarChart() with 
     """
-    if filterApply:
-        data = tickets.GetColCount(filterCons, column)
-        BarChart(data, column)
-    else:
-        data = tickets.GetColCount(None, column) #type: ignore
-        BarChart(data, column)
+    BarChart(dashboard.GetColCount(column), column) #filterCons is And() until filters are applied, so one count serves both cases
 
 
 def Table() -> None:
     """
         Creates table using st.dataframe() 
-        Contains all filtered records
+        Shows one page of the filtered records, fetched by keyset pagination, with sorting and page size controls
     """
     st.subheader("Table")
-    data = tickets.GetRows(filterCons)
+    rowCnt: int = dashboard.GetRowCnt() if dashboard else tickets.GetRowCnt(filterCons) #CRUD tab has no dashboard bundle
+    sortCol, orderCol, sizeCol = st.columns(3)
+    sortBy: str = sortCol.selectbox("Sort By", ("ticket_id", "subject", "priority", "status", "created_date"), key = "itSortBy")
+    descending: bool = orderCol.selectbox("Order", ("Ascending", "Descending"), key = "itOrder") == "Descending"
+    size: int = sizeCol.selectbox("Rows Per Page", (25, 50, 100, 250), key = "itPageSize")
+
+    view: tuple = (filterCons, sortBy, descending, size)
+    if st.session_state.get("itPageView") != view: #Back to the first page whenever filters or sorting change
+        st.session_state.itPageView = view
+        st.session_state.itCursors = [None]
+    cursors: list = st.session_state.itCursors #Cursor of every page visited, the last one is the current page
+    data, cursor = tickets.GetPage(filterCons, sortBy, descending, cursors[-1], size)
     st.dataframe(data)
 
+    prevCol, pageCol, nextCol = st.columns([1, 3, 1])
+    if prevCol.button("Previous", key = "itPrevPage", disabled = len(cursors) == 1):
+        cursors.pop()
+        st.rerun()
+    pageCol.caption(f"Page {len(cursors)} of {max(1, -(-rowCnt // size))} ({rowCnt} rows)")
+    if nextCol.button("Next", key = "itNextPage", disabled = cursor is None):
+        cursors.append(cursor)
+        st.rerun()
+
+
+def SearchBox() -> None:
+    """
+        Search box over ticket subjects, matches come from the full text index best first
+        The last word matches as a prefix, so results update while typing
+    """
+    st.subheader("Search")
+    query: str = st.text_input("Search Subjects", key = "itSearch")
+    if not query:
+        return
+    results = tickets.Search(query, 20)
+    if results.empty:
+        st.info("No matching tickets")
+    else:
+        st.dataframe(results)
+
 
 def LineChart() -> None:
     """
@@ -181,7 +220,7 @@ def LineChart() -> None:
     """
     st.divider()
     st.subheader("Line Chart (Dates)")
-    data = tickets.GetColCount(filterCons, "created_date")
+    data = dashboard.GetColCount("created_date")
     st.line_chart(data, x = "created_date", y = "Count", color = "#4bd16f")
 
 
@@ -190,7 +229,7 @@ def PieChart(col: str) -> None:
         Creates pie chart taking values from GetColCount() and matplotlib.subplots()
         
     """
-    data = tickets.GetColCount(filterCons, col)
+    data = dashboard.GetColCount(col)
     labels = data[col].tolist()
     sizes = data["Count"].tolist()
     
@@ -214,23 +253,56 @@ def PromptTicketInfo() -> tuple:
     return tId, subjectType, priority, status, date
 
 
+def BulkActions() -> None:
+    """
+        Explanation:
+            Ids of tickets typed as a list of ids and ranges, and one action applied to all of them
+            The whole selection is validated together and written with a single call to tickets.UpdateTickets() or tickets.DeleteTickets(), which change nothing if any id does not exist
+    """
+    idText: str = st.text_input("Ticket IDs", placeholder = "e.g. 3, 7, 10-20")
+    action: str = st.selectbox("Action", ("Set Status", "Delete"))
+    if action == "Set Status":
+        newVal: str = st.selectbox("Status  ", ("open", "resolved", "in progress")) #type: ignore
+    
+    if st.button("Apply to Selected"):
+        ids: list[int] | None = ParseIDs(idText)
+        if ids is None:
+            st.error("IDs must be numbers or ranges like 10-20!")
+        elif not ids:
+            st.error("No tickets selected!")
+        elif len(ids) > MAX_IDS:
+            st.error(f"At most {MAX_IDS} tickets can be changed at once!")
+        elif action == "Delete":
+            if tickets.DeleteTickets(ids):
+                st.success(f"{len(ids)} tickets deleted!")
+            else:
+                st.error("Some selected tickets do not exist, nothing was changed!")
+        elif tickets.UpdateTickets(ids, {"status": newVal}): # type: ignore
+            st.success(f"{len(ids)} tickets updated!")
+        else:
+            st.error("Some selected tickets do not exist, nothing was changed!")
+
+
 def CRUDTicket():
     """
         Contains functions for creating, updating, and deleting tickets
         Explanation:
-            Allows user to choose selectbox between CRUD Operations
+            Allows user to choose selectbox between CRUD Operations, Bulk Actions applies one change to many rows
             Calls PromptTicketInfo() or displays necessary input prompt areas for getting user input
             When button pressed, take user input and call relevant function from ticketsClass.py
     """
     st.divider()
     with st.sidebar:
         st.header("CRUD Operations")
-        cudChoice: str = st.selectbox("Operation", ("Create Ticket", "Read Tickets", "Update Ticket", "Delete Ticket"))
+        cudChoice: str = st.selectbox("Operation", ("Create Ticket", "Read Tickets", "Update Ticket", "Delete Ticket", "Bulk Actions"))
     
     st.subheader(cudChoice)
     if cudChoice == "Read Tickets":
         Table()
         return
+    if cudChoice == "Bulk Actions":
+        BulkActions()
+        return
 
     if cudChoice == "Create Ticket":
         tId, subjectType, priority, status, date = PromptTicketInfo()
@@ -249,17 +321,21 @@ def CRUDTicket():
         #Calling necessary functions for each CUD Operation
         match cudChoice:
             case "Create Ticket":
-                result = tickets.InsertTicket(int(tId), subjectType, priority, status, date) # type: ignore
+                result = tickets.InsertTicket(tId, subjectType, priority, status, date) # type: ignore
                 if not result:
-                    st.error("Ticket ID Exists!")
+                    st.error("ID is not a number or already exists!")
                 else:      
                     st.success("Ticket Created!")
             case "Update Ticket":
-                tickets.UpdateTicket(tId, newId, newSub, newPrio, newStat, newDate)# type: ignore
-                st.success("Ticket Updated!")
+                if tickets.UpdateTicket(tId, newId, newSub, newPrio, newStat, newDate): # type: ignore
+                    st.success("Ticket Updated!")
+                else:
+                    st.error("Ticket ID not found or new ID exists!")
             case "Delete Ticket":
-                tickets.DeleteTicket(tId) # type: ignore
-                st.success("Ticket Deleted!")
+                if tickets.DeleteTicket(tId): # type: ignore
+                    st.success("Ticket Deleted!")
+                else:
+                    st.error("Ticket ID not found!")
 
 
 def Streaming(completion):
@@ -329,16 +405,18 @@ def DisplayAllWidgets() -> None:
     """
         Handles all UI elements in this page
         Allows user to switch between Analysis, CRUD Operations, and AI Assistant
-            Analysis: Contains Table, Barchart, Piechart, Linechart, Metrics, and Filters
+            Analysis: Contains Search, Table, Barchart, Piechart, Linechart, Metrics, and Filters
             CRUD Operations: Contains Create, Read, Update, and Delete tickets
             AI Assistant: Contains OpenAI API Interface with specialised chatbot for IT Related help
     """
-    global curTab
+    global curTab, dashboard
     curTab = st.selectbox("Tabs", ["Analysis", "CRUD Operations", "AI Assistant"], placeholder = "Analysis")
     match curTab:
         case "Analysis":
             Filters()
+            dashboard = tickets.DashboardQuery(filterCons) #One pass over the table for every widget below
             AnalysisSummary()
+            SearchBox()
             Table()
             col: str = SelectCol()
             RowColumnCnt()
@@ -374,9 +452,10 @@ def LogOut():
 if __name__ == "__main__": #Main function
     #Global Variables
     filterApply = False 
-    filterCons: dict = {} #Of form: {"ticket_id": lambda id: 100 <= id <= 200}
+    filterCons: FilterSpec = And() #Of form: And(Range("ticket_id", 100, 200), InSet("status", ["open"]))
     client = OpenAI(api_key = st.secrets["OPENAI_API_KEY"])
     curTab: str = ""
+    dashboard = None #DashboardResult of the current Analysis render
     
     #Preliminary Checks for login
     CheckLogIn()
@@ -5,6 +5,7 @@ from openai import OpenAI
 from matplotlib.pyplot import subplots
 from datetime import date
 from typing import Literal
+from app.data.filters import FilterSpec, Range, DateRange, InSet, And, ParseIDs, MAX_IDS
 from app.services.ai_assistant import AIAssistant
 
 
@@ -50,7 +51,7 @@ def RowColumnCnt() -> None:
     """
         Displays metric containing number of rows in filtered output
     """
-    rowCnt = incidents.GetRowCnt(filterCons)
+    rowCnt = dashboard.GetRowCnt()
     st.metric("Row Count", rowCnt)
     
 
@@ -69,7 +70,7 @@ def AnalysisSummary() -> None:
         Explanation: Creates 6 metrics for most and least amounts of incidents, priorities, and statuses
         Returns: None
     """
-    incidentTypes, severities, statusS = incidents.Metrics()  
+    incidentTypes, severities, statusS = dashboard.GetMetrics()  
     
     with st.container(horizontal = True):
         st.metric("Most Records of Incidents", f"{incidentTypes["MaxCol"].title()}:\n{incidentTypes["MaxVal"]}", width = "content", border = True) #type: ignore 
@@ -94,7 +95,8 @@ def GetDate(dateVal: str) -> date:
 def FilterConditions(idStart: str, idStop: str, incTypes: tuple, severities :tuple, status: tuple, dateStart :str, dateStop: str):
     """
         Explanation: 
-            Checks every filter variable. If filled: adds key: value pair to filterCons of form {column: lambda function}
+            Checks every filter variable. If filled: adds its condition and sets filterCons to the And of them
+            filterCons is also saved in st.session_state, Filters() restores it on later reruns
         Args:
             idStart (_str_): Start range of ID
             idStop (_str_): Stop range of ID
@@ -105,25 +107,31 @@ def FilterConditions(idStart: str, idStop: str, incTypes: tuple, severities :tup
             dateStop (_str_): Stop range of date
     """
     global filterCons
+    conditions: list[FilterSpec] = []
     if idStart and idStop: #Both selected by default
-        filterCons["id"] = lambda tId: int(idStart) <= tId <= int(idStop)
+        conditions.append(Range("id", int(idStart), int(idStop)))
     if incTypes:
-        filterCons["incident_type"] = lambda sub: sub in incTypes
+        conditions.append(InSet("incident_type", incTypes))
     if severities:
-        filterCons["severity"] = lambda prio: prio in severities
+        conditions.append(InSet("severity", severities))
     if status:
-        filterCons["status"] = lambda stat: stat in status
+        conditions.append(InSet("status", status))
     if dateStart: #Selected as today by default
-        filterCons["date"] = lambda date: GetDate(dateStart) <= GetDate(date) <= GetDate(dateStop)
+        conditions.append(DateRange("date", dateStart, dateStop))
+    filterCons = And(*conditions)
+    st.session_state.cyberFilters = filterCons #Kept for the reruns that follow, e.g. Next/Previous page clicks
 
 
 def Filters() -> None:
     """
         Creates widgets for filters which include textboxes, checkboxes, and date inputs
         When apply filters button clicked, pass user input values to FilterConditions()
+        Until then the filters applied on an earlier rerun are used
     """
+    global filterCons
     if curTab != "Analysis": #Only show when on analysis tab
         return
+    filterCons = st.session_state.get("cyberFilters", And()) #Filters applied on an earlier rerun stay applied
     
     with st.sidebar:
         st.title("Filters")
@@ -156,27 +164,54 @@ def BarCheck(column: str) -> None:
         Checks if filter has applied and updates chart everytime button is pressed
         It then calls BarChart() with 
     """
-    if filterApply:
-        print(1)
-        data = incidents.GetColCount(filterCons, column)
-        print(data)
-        BarChart(data, column)
-    else:
-        
-        data = incidents.GetColCount(None, column) #type: ignore
-        print(data)
-        BarChart(data, column)
+    BarChart(dashboard.GetColCount(column), column) #filterCons is And() until filters are applied, so one count serves both cases
 
 
 def Table() -> None:
     """
         Creates table using st.dataframe() 
-        Contains all filtered records
+        Shows one page of the filtered records, fetched by keyset pagination, with sorting and page size controls
     """
     st.subheader("Table")
-    data = incidents.GetRows(filterCons)
+    rowCnt: int = dashboard.GetRowCnt() if dashboard else incidents.GetRowCnt(filterCons) #CRUD tab has no dashboard bundle
+    sortCol, orderCol, sizeCol = st.columns(3)
+    sortBy: str = sortCol.selectbox("Sort By", ("id", "incident_type", "severity", "status", "date"), key = "cyberSortBy")
+    descending: bool = orderCol.selectbox("Order", ("Ascending", "Descending"), key = "cyberOrder") == "Descending"
+    size: int = sizeCol.selectbox("Rows Per Page", (25, 50, 100, 250), key = "cyberPageSize")
+
+    view: tuple = (filterCons, sortBy, descending, size)
+    if st.session_state.get("cyberPageView") != view: #Back to the first page whenever filters or sorting change
+        st.session_state.cyberPageView = view
+        st.session_state.cyberCursors = [None]
+    cursors: list = st.session_state.cyberCursors #Cursor of every page visited, the last one is the current page
+    data, cursor = incidents.GetPage(filterCons, sortBy, descending, cursors[-1], size)
     st.dataframe(data)
 
+    prevCol, pageCol, nextCol = st.columns([1, 3, 1])
+    if prevCol.button("Previous", key = "cyberPrevPage", disabled = len(cursors) == 1):
+        cursors.pop()
+        st.rerun()
+    pageCol.caption(f"Page {len(cursors)} of {max(1, -(-rowCnt // size))} ({rowCnt} rows)")
+    if nextCol.button("Next", key = "cyberNextPage", disabled = cursor is None):
+        cursors.append(cursor)
+        st.rerun()
+
+
+def SearchBox() -> None:
+    """
+        Search box over incident types, matches come from the full text index best first
+        The last word matches as a prefix, so results update while typing
+    """
+    st.subheader("Search")
+    query: str = st.text_input("Search Incident Types", key = "cyberSearch")
+    if not query:
+        return
+    results = incidents.Search(query, 20)
+    if results.empty:
+        st.info("No matching incidents")
+    else:
+        st.dataframe(results)
+
 
 def LineChart() -> None:
     """
@@ -185,7 +220,7 @@ def LineChart() -> None:
     """
     st.divider()
     st.subheader("Line Chart (Dates)")
-    data = incidents.GetColCount(filterCons, "date")
+    data = dashboard.GetColCount("date")
     st.line_chart(data, x = "date", y = "Count", color = "#4bd16f")
 
 
@@ -194,7 +229,7 @@ def PieChart(col: str) -> None:
         Creates pie chart taking values from GetColCount() and matplotlib.subplots()
         
     """
-    data = incidents.GetColCount(filterCons, col)
+    data = dashboard.GetColCount(col)
     labels = data[col].tolist()
     sizes = data["Count"].tolist()
     
@@ -218,23 +253,56 @@ def PromptTicketInfo() -> tuple:
     return tId, incidentType, severity, status, date
 
 
+def BulkActions() -> None:
+    """
+        Explanation:
+            Ids of incidents typed as a list of ids and ranges, and one action applied to all of them
+            The whole selection is validated together and written with a single call to incidents.UpdateIncidents() or incidents.DeleteIncidents(), which change nothing if any id does not exist
+    """
+    idText: str = st.text_input("Incident IDs", placeholder = "e.g. 3, 7, 10-20")
+    action: str = st.selectbox("Action", ("Set Status", "Delete"))
+    if action == "Set Status":
+        newVal: str = st.selectbox("Status  ", ("open", "resolved", "investigating")) #type: ignore
+    
+    if st.button("Apply to Selected"):
+        ids: list[int] | None = ParseIDs(idText)
+        if ids is None:
+            st.error("IDs must be numbers or ranges like 10-20!")
+        elif not ids:
+            st.error("No incidents selected!")
+        elif len(ids) > MAX_IDS:
+            st.error(f"At most {MAX_IDS} incidents can be changed at once!")
+        elif action == "Delete":
+            if incidents.DeleteIncidents(ids):
+                st.success(f"{len(ids)} incidents deleted!")
+            else:
+                st.error("Some selected incidents do not exist, nothing was changed!")
+        elif incidents.UpdateIncidents(ids, {"status": newVal}): # type: ignore
+            st.success(f"{len(ids)} incidents updated!")
+        else:
+            st.error("Some selected incidents do not exist, nothing was changed!")
+
+
 def CRUDTicket():
     """
         Contains functions for creating, updating, and deleting incidents
         Explanation:
-            Allows user to choose selectbox between CRUD Operations
+            Allows user to choose selectbox between CRUD Operations, Bulk Actions applies one change to many rows
             Calls PromptTicketInfo() or displays necessary input prompt areas for getting user input
             When button pressed, take user input and call relevant function from incidentsClass.py
     """
     st.divider()
     with st.sidebar:
         st.header("CRUD Operations")
-        cudChoice: str = st.selectbox("Operation", ("Create Incident", "Read Incident", "Update Incident", "Delete Incident"))
+        cudChoice: str = st.selectbox("Operation", ("Create Incident", "Read Incident", "Update Incident", "Delete Incident", "Bulk Actions"))
     
     st.subheader(cudChoice)
     if cudChoice == "Read Incident":
         Table()
         return
+    if cudChoice == "Bulk Actions":
+        BulkActions()
+        return
 
     if cudChoice == "Create Incident":
         tId, incType, severity, status, date = PromptTicketInfo()
@@ -255,15 +323,19 @@ def CRUDTicket():
             case "Create Incident":
                 result = incidents.InsertIncident(tId, incType, severity, status, date) #type: ignore
                 if not result:
-                    st.error("Ticket ID Exists!")
+                    st.error("ID is not a number or already exists!")
                 else:      
                     st.success("Ticket Created!")
             case "Update Incident":
-                incidents.UpdateIncident(tId, newId, newInc, newSev, newStat, newDate) #type: ignore
-                st.success("Ticket Updated!")
+                if incidents.UpdateIncident(tId, newId, newInc, newSev, newStat, newDate): #type: ignore
+                    st.success("Ticket Updated!")
+                else:
+                    st.error("Incident ID not found or new ID exists!")
             case "Delete Incident":
-                incidents.DeleteIncident(tId)
-                st.success("Ticket Deleted!")
+                if incidents.DeleteIncident(tId):
+                    st.success("Ticket Deleted!")
+                else:
+                    st.error("Incident ID not found!")
 
 
 def Streaming(completion):
@@ -334,16 +406,18 @@ def DisplayAllWidgets() -> None:
     """
         Handles all UI elements in this page
         Allows user to switch between Analysis, CRUD Operations, and AI Assistant
-            Analysis: Contains Table, Barchart, Piechart, Linechart, Metrics, and Filters
+            Analysis: Contains Search, Table, Barchart, Piechart, Linechart, Metrics, and Filters
             CRUD Operations: Contains Create, Read, Update, and Delete incidents
             AI Assistant: Contains OpenAI API Interface with specialised chatbot for IT Related help
     """
-    global curTab
+    global curTab, dashboard
     curTab = st.selectbox("Tabs", ["Analysis", "CRUD Operations", "AI Assistant"], placeholder = "Analysis")
     match curTab:
         case "Analysis":
             Filters()
+            dashboard = incidents.DashboardQuery(filterCons) #One pass over the table for every widget below
             AnalysisSummary()
+            SearchBox()
             Table()
             col: str = SelectCol()
             RowColumnCnt()
@@ -379,9 +453,10 @@ def LogOut():
 if __name__ == "__main__": #Main function
     #Global Variables
     filterApply = False 
-    filterCons: dict = {} #Of form: {"ticket_id": lambda id: 100 <= id <= 200}
+    filterCons: FilterSpec = And() #Of form: And(Range("ticket_id", 100, 200), InSet("status", ["open"]))
     client = OpenAI(api_key = st.secrets["OPENAI_API_KEY"])
     curTab: str = ""
+    dashboard = None #DashboardResult of the current Analysis render
     
     #Preliminary Checks for login
     CheckLogIn()
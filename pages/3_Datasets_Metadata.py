@@ -5,6 +5,7 @@ from openai import OpenAI
 from matplotlib.pyplot import subplots
 from datetime import date
 from typing import Literal
+from app.data.filters import FilterSpec, Range, DateRange, InSet, And, ParseIDs, MAX_IDS
 from app.services.ai_assistant import AIAssistant
 
 
@@ -50,7 +51,7 @@ def RowColumnCnt() -> None:
     """
         Displays metric containing number of rows in filtered output
     """
-    rowCnt = datasets.GetRowCnt(filterCons)
+    rowCnt = dashboard.GetRowCnt()
     st.metric("Row Count", rowCnt)
     
 
@@ -69,7 +70,7 @@ def AnalysisSummary() -> None:
         Explanation: Creates 6 metrics for most and least amounts of datasets, priorities, and statuses
         Returns: None
     """
-    ctgrys, sources = datasets.Metrics()  
+    ctgrys, sources = dashboard.GetMetrics()  
     
     with st.container(horizontal = True):
         st.metric("Most Records of Categories", f"{ctgrys["MaxCol"].title()}:\n{ctgrys["MaxVal"]}", width = "content", border = True) #type: ignore 
@@ -102,25 +103,31 @@ def FilterConditions(idStart: str, idStop: str, ctgrys: tuple, srcs: tuple, size
             dateStop (str): Stop value of date
     """    
     global filterCons
+    conditions: list[FilterSpec] = []
     if idStart and idStop: #Both selected by default
-        filterCons["id"] = lambda id: int(idStart) <= id and id <= int(idStop)
+        conditions.append(Range("id", int(idStart), int(idStop)))
     if ctgrys:
-        filterCons["category"] = lambda ctgry: ctgry in ctgrys
+        conditions.append(InSet("category", ctgrys))
     if srcs:
-        filterCons["source"] = lambda source: source in srcs
+        conditions.append(InSet("source", srcs))
     if sizeStart and sizeStop: #Both selected by default
-        filterCons["file_size_mb"] = lambda size: float(sizeStart) <= size and size <= float(sizeStop)
+        conditions.append(Range("file_size_mb", float(sizeStart), float(sizeStop)))
     if dateStart: #Selected as today by default
-        filterCons["last_updated"] = lambda date: GetDate(dateStart) <= GetDate(date) <= GetDate(dateStop)
+        conditions.append(DateRange("last_updated", dateStart, dateStop))
+    filterCons = And(*conditions)
+    st.session_state.metaFilters = filterCons #Kept for the reruns that follow, e.g. Next/Previous page clicks
 
 
 def Filters() -> None:
     """
         Creates widgets for filters which include textboxes, checkboxes, and date inputs
         When apply filters button clicked, pass user input values to FilterConditions()
+        Until then the filters applied on an earlier rerun are used
     """
+    global filterCons
     if curTab != "Analysis": #Only show when on analysis tab
         return
+    filterCons = st.session_state.get("metaFilters", And()) #Filters applied on an earlier rerun stay applied
 
     with st.sidebar:
         st.title("Filters")
@@ -163,23 +170,54 @@ def BarCheck(column: str) -> None:
         Checks if filter has applied and updates chart everytime button is pressed
         It then calls BarChart() with 
     """
-    if filterApply:
-        data = datasets.GetColCount(filterCons, column)
-        BarChart(data, column)
-    else:
-        data = datasets.GetColCount(None, column) #type: ignore
-        BarChart(data, column)
+    BarChart(dashboard.GetColCount(column), column) #filterCons is And() until filters are applied, so one count serves both cases
 
 
 def Table() -> None:
     """
         Creates table using st.dataframe() 
-        Contains all filtered records
+        Shows one page of the filtered records, fetched by keyset pagination, with sorting and page size controls
     """
     st.subheader("Table")
-    data = datasets.GetRows(filterCons)
+    rowCnt: int = dashboard.GetRowCnt() if dashboard else datasets.GetRowCnt(filterCons) #CRUD tab has no dashboard bundle
+    sortCol, orderCol, sizeCol = st.columns(3)
+    sortBy: str = sortCol.selectbox("Sort By", ("id", "category", "file_size_mb", "source", "last_updated"), key = "metaSortBy")
+    descending: bool = orderCol.selectbox("Order", ("Ascending", "Descending"), key = "metaOrder") == "Descending"
+    size: int = sizeCol.selectbox("Rows Per Page", (25, 50, 100, 250), key = "metaPageSize")
+
+    view: tuple = (filterCons, sortBy, descending, size)
+    if st.session_state.get("metaPageView") != view: #Back to the first page whenever filters or sorting change
+        st.session_state.metaPageView = view
+        st.session_state.metaCursors = [None]
+    cursors: list = st.session_state.metaCursors #Cursor of every page visited, the last one is the current page
+    data, cursor = datasets.GetPage(filterCons, sortBy, descending, cursors[-1], size)
     st.dataframe(data)
 
+    prevCol, pageCol, nextCol = st.columns([1, 3, 1])
+    if prevCol.button("Previous", key = "metaPrevPage", disabled = len(cursors) == 1):
+        cursors.pop()
+        st.rerun()
+    pageCol.caption(f"Page {len(cursors)} of {max(1, -(-rowCnt // size))} ({rowCnt} rows)")
+    if nextCol.button("Next", key = "metaNextPage", disabled = cursor is None):
+        cursors.append(cursor)
+        st.rerun()
+
+
+def SearchBox() -> None:
+    """
+        Search box over dataset names, matches come from the full text index best first
+        The last word matches as a prefix, so results update while typing
+    """
+    st.subheader("Search")
+    query: str = st.text_input("Search Dataset Names", key = "metaSearch")
+    if not query:
+        return
+    results = datasets.Search(query, 20)
+    if results.empty:
+        st.info("No matching datasets")
+    else:
+        st.dataframe(results)
+
 
 def LineChart() -> None:
     """
@@ -188,7 +226,7 @@ def LineChart() -> None:
     """
     st.divider()
     st.subheader("Line Chart (Dates)")
-    data = datasets.GetColCount(filterCons, "last_updated")
+    data = dashboard.GetColCount("last_updated")
     st.line_chart(data, x = "last_updated", y = "Count", color = "#4bd16f")
 
 
@@ -197,7 +235,7 @@ def PieChart(col: str) -> None:
         Creates pie chart taking values from GetColCount() and matplotlib.subplots()
         
     """
-    data = datasets.GetColCount(filterCons, col)
+    data = dashboard.GetColCount(col)
     labels = data[col].tolist()
     sizes = data["Count"].tolist()
     
@@ -222,23 +260,56 @@ def PromptTicketInfo() -> tuple:
     return id, name, category, fileSize, source, lastUpd
 
 
+def BulkActions() -> None:
+    """
+        Explanation:
+            Ids of datasets typed as a list of ids and ranges, and one action applied to all of them
+            The whole selection is validated together and written with a single call to datasets.UpdateDatasets() or datasets.DeleteDatasets(), which change nothing if any id does not exist
+    """
+    idText: str = st.text_input("Dataset IDs", placeholder = "e.g. 3, 7, 10-20")
+    action: str = st.selectbox("Action", ("Set Category", "Delete"))
+    if action == "Set Category":
+        newVal: str = st.selectbox("Category  ", categories) #type: ignore
+    
+    if st.button("Apply to Selected"):
+        ids: list[int] | None = ParseIDs(idText)
+        if ids is None:
+            st.error("IDs must be numbers or ranges like 10-20!")
+        elif not ids:
+            st.error("No datasets selected!")
+        elif len(ids) > MAX_IDS:
+            st.error(f"At most {MAX_IDS} datasets can be changed at once!")
+        elif action == "Delete":
+            if datasets.DeleteDatasets(ids):
+                st.success(f"{len(ids)} datasets deleted!")
+            else:
+                st.error("Some selected datasets do not exist, nothing was changed!")
+        elif datasets.UpdateDatasets(ids, {"category": newVal}): # type: ignore
+            st.success(f"{len(ids)} datasets updated!")
+        else:
+            st.error("Some selected datasets do not exist, nothing was changed!")
+
+
 def CRUDTicket():
     """
         Contains functions for creating, updating, and deleting datasets
         Explanation:
-            Allows user to choose selectbox between CRUD Operations
+            Allows user to choose selectbox between CRUD Operations, Bulk Actions applies one change to many rows
             Calls PromptTicketInfo() or displays necessary input prompt areas for getting user input
             When button pressed, take user input and call relevant function from datasetsClass.py
     """
     st.divider()
     with st.sidebar:
         st.header("CRUD Operations")
-        cudChoice: str = st.selectbox("Operation", ("Create Dataset", "Read Datasets", "Update Dataset", "Delete Dataset"))
+        cudChoice: str = st.selectbox("Operation", ("Create Dataset", "Read Datasets", "Update Dataset", "Delete Dataset", "Bulk Actions"))
     
     st.subheader(cudChoice)
     if cudChoice == "Read Datasets":
         Table()
         return
+    if cudChoice == "Bulk Actions":
+        BulkActions()
+        return
 
     if cudChoice == "Create Dataset":
         id, name, category, fileSize, source, lastUpd = PromptTicketInfo()
@@ -258,17 +329,21 @@ def CRUDTicket():
         #Calling necessary functions for each CUD Operation
         match cudChoice:
             case "Create Dataset":
-                result = datasets.InsertDataset(int(id), name, category, fileSize, source, lastUpd) #type: ignore
+                result = datasets.InsertDataset(id, name, category, fileSize, source, lastUpd) #type: ignore
                 if not result:
-                    st.error("Ticket ID Exists!")
+                    st.error("ID is not a number or already exists!")
                 else:      
                     st.success("Ticket Created!")
             case "Update Dataset":
-                datasets.UpdateDataset(id, newId, newName, newCtgry, newFileSize, newSource, newUpdate) #type: ignore
-                st.success("Ticket Updated!")
+                if datasets.UpdateDataset(id, newId, newName, newCtgry, newFileSize, newSource, newUpdate): #type: ignore
+                    st.success("Ticket Updated!")
+                else:
+                    st.error("Dataset ID not found or new ID exists!")
             case "Delete Dataset":
-                datasets.DeleteDataset(id) # type: ignore
-                st.success("Ticket Deleted!")
+                if datasets.DeleteDataset(id): # type: ignore
+                    st.success("Ticket Deleted!")
+                else:
+                    st.error("Dataset ID not found!")
 
 
 def Streaming(completion):
@@ -337,16 +412,18 @@ def DisplayAllWidgets() -> None:
     """
         Handles all UI elements in this page
         Allows user to switch between Analysis, CRUD Operations, and AI Assistant
-            Analysis: Contains Table, Barchart, Piechart, Linechart, Metrics, and Filters
+            Analysis: Contains Search, Table, Barchart, Piechart, Linechart, Metrics, and Filters
             CRUD Operations: Contains Create, Read, Update, and Delete datasets
             AI Assistant: Contains OpenAI API Interface with specialised chatbot for IT Related help
     """
-    global curTab
+    global curTab, dashboard
     curTab = st.selectbox("Tabs", ["Analysis", "CRUD Operations", "AI Assistant"], placeholder = "Analysis")
     match curTab:
         case "Analysis":
             Filters()
+            dashboard = datasets.DashboardQuery(filterCons) #One pass over the table for every widget below
             AnalysisSummary()
+            SearchBox()
             Table()
             col: str = SelectCol()
             RowColumnCnt()
@@ -382,9 +459,10 @@ def LogOut():
 if __name__ == "__main__": #Main function
     #Global Variables
     filterApply = False 
-    filterCons: dict = {} #Of form: {"ticket_id": lambda id: 100 <= id <= 200}
+    filterCons: FilterSpec = And() #Of form: And(Range("ticket_id", 100, 200), InSet("status", ["open"]))
     client = OpenAI(api_key = st.secrets["OPENAI_API_KEY"])
     curTab: str = ""
+    dashboard = None #DashboardResult of the current Analysis render
     categories: tuple = ("Finance", "Education", "Environment", "Retail", "Transportation", "Technology", "Healthcare")
     sources: tuple = ("Government Open Data", "Internal Analytics Team", "Kaggle", "Public API", "Research Institute")
     
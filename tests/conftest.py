@@ -0,0 +1,25 @@
+from pathlib import Path
+import pytest
+import shutil
+import sys
+import os
+
+
+_TABLES: tuple[str, ...] = ("app.data.incidents", "app.data.tickets", "app.data.datasets")
+
+
+@pytest.fixture(scope = "session")
+def data(tmp_path_factory):
+    """
+        Explanation:
+            Runs the table modules against a copy of DATA. They open DATA/intelligence_platform.db relative to the working directory
+            when imported, so tests import them inside the test body, after this fixture. One copy per session: the modules keep
+            their journals, snapshots and connections in module state
+    """
+    assert not any(name in sys.modules for name in _TABLES), "table module imported before the DATA copy, it would write to the real database"
+    root: Path = tmp_path_factory.mktemp("app")
+    shutil.copytree(Path(__file__).resolve().parents[1] / "DATA", root / "DATA")
+    cwd: str = os.getcwd()
+    os.chdir(root)
+    yield root / "DATA"
+    os.chdir(cwd)
@@ -0,0 +1,52 @@
+from app.data.columnar import OpenSnapshot, WriteSnapshot, DateToDay, ValidDate, NULL_DAY
+import numpy as np
+
+
+_SCHEMA: tuple[tuple[str, str], ...] = (("id", "int"), ("name", "str"), ("size", "float"))
+
+
+def Write(tmp_path, count: int):
+    WriteSnapshot(tmp_path, "test", _SCHEMA, ((id, f"dataset {id} ünïcode", id / 2) for id in range(1, count + 1)))
+    return OpenSnapshot(tmp_path, "test")
+
+
+def test_decode_positions_large_str_column(tmp_path):
+    snapshot = Write(tmp_path, 500_000)
+    positions = np.array([0, 1, 250_000, 499_999])
+    assert snapshot.Decode("name", positions) == [f"dataset {pos + 1} ünïcode" for pos in positions.tolist()]
+    assert snapshot.Lookup([3, 400_000]) == [(3, "dataset 3 ünïcode", 1.5), (400_000, "dataset 400000 ünïcode", 200_000.0)]
+
+
+class HeapSpy:
+    """
+        Stands in for the heap memoryview: slicing is recorded and allowed, copying the whole heap is not,
+        since bytes()/str() need the buffer protocol, which this class does not have
+    """
+    def __init__(self, view: memoryview) -> None:
+        self.view: memoryview = view
+        self.reads: list[int] = []
+
+    def __getitem__(self, part: slice) -> memoryview:
+        self.reads.append(len(self.view[part]))
+        return self.view[part]
+
+
+def test_decode_positions_never_copies_heap(tmp_path, monkeypatch):
+    snapshot = Write(tmp_path, 1_000)
+    spy: HeapSpy = HeapSpy(snapshot.Heap("name"))
+    monkeypatch.setattr(snapshot, "Heap", lambda name: spy)
+    assert snapshot.Decode("name", np.array([4, 999, 4])) == ["dataset 5 ünïcode", "dataset 1000 ünïcode", "dataset 5 ünïcode"]
+    assert snapshot.Lookup([7]) == [(7, "dataset 7 ünïcode", 3.5)]
+    assert spy.reads == [len("dataset 5 ünïcode".encode()), len("dataset 1000 ünïcode".encode()), len("dataset 5 ünïcode".encode()), len("dataset 7 ünïcode".encode())] #Only the wanted values
+
+
+def test_decode_every_row(tmp_path):
+    snapshot = Write(tmp_path, 1_000)
+    assert snapshot.Column("name") == [f"dataset {id} ünïcode" for id in range(1, 1_001)]
+    assert snapshot.Decode("name", np.array([], dtype = np.int64)) == []
+
+
+def test_valid_date_rejects_what_would_be_stored_as_null():
+    assert ValidDate("2024-02-29") and ValidDate(None)
+    for bad in ("", "29/02/2024", "2023-02-29", "yesterday"):
+        assert not ValidDate(bad) and DateToDay(bad) == NULL_DAY
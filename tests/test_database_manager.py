@@ -0,0 +1,72 @@
+from app.services.database_manager import DatabaseManager
+import pandas as pd
+import pytest
+
+
+def Manager(tmp_path, concurrent: bool) -> DatabaseManager:
+    dbMgr: DatabaseManager = DatabaseManager(str(tmp_path / f"manager_{concurrent}.db"), concurrent = concurrent)
+    dbMgr.Exec("CREATE TABLE Items (id INTEGER PRIMARY KEY, name TEXT)")
+    return dbMgr
+
+
+def Count(dbMgr: DatabaseManager) -> int:
+    return dbMgr.FetchOne("SELECT COUNT(*) FROM Items")[0]
+
+
+@pytest.mark.parametrize("concurrent", [False, True])
+def test_transaction_rolls_back_on_exception(tmp_path, concurrent):
+    dbMgr: DatabaseManager = Manager(tmp_path, concurrent)
+    with pytest.raises(RuntimeError):
+        with dbMgr.Transaction():
+            dbMgr.Exec("INSERT INTO Items VALUES (1, 'kept until the raise')")
+            dbMgr.ExecMany("INSERT INTO Items VALUES (?, ?)", [(2, "a"), (3, "b")])
+            raise RuntimeError
+    assert Count(dbMgr) == 0
+    dbMgr.Exec("INSERT INTO Items VALUES (1, 'after rollback')") #Writer is usable again
+    assert Count(dbMgr) == 1
+
+
+@pytest.mark.parametrize("concurrent", [False, True])
+def test_nested_transaction_joins_outer(tmp_path, concurrent):
+    dbMgr: DatabaseManager = Manager(tmp_path, concurrent)
+    with pytest.raises(RuntimeError):
+        with dbMgr.Transaction():
+            with dbMgr.Transaction():
+                dbMgr.Exec("INSERT INTO Items VALUES (1, 'inner')")
+            with dbMgr.Checkout() as conn:
+                assert conn.in_transaction #Leaving the inner scope did not commit
+            raise RuntimeError
+    assert Count(dbMgr) == 0 #The outer rollback undid the inner scope too
+
+    with dbMgr.Transaction():
+        with dbMgr.Transaction():
+            dbMgr.Exec("INSERT INTO Items VALUES (1, 'inner')")
+        dbMgr.Exec("INSERT INTO Items VALUES (2, 'outer')")
+    assert Count(dbMgr) == 2
+
+
+@pytest.mark.parametrize("concurrent", [False, True])
+def test_exec_many_commits_once(tmp_path, concurrent):
+    dbMgr: DatabaseManager = Manager(tmp_path, concurrent)
+    statements: list[str] = []
+    with dbMgr.WriteCheckout() as conn:
+        conn.set_trace_callback(statements.append)
+    try:
+        dbMgr.ExecMany("INSERT INTO Items VALUES (?, ?)", ((id, f"item {id}") for id in range(1000)))
+        with dbMgr.Transaction():
+            for id in range(1000, 1100):
+                dbMgr.Exec("INSERT INTO Items VALUES (?, ?)", (id, f"item {id}"))
+    finally:
+        with dbMgr.WriteCheckout() as conn:
+            conn.set_trace_callback(None)
+    assert Count(dbMgr) == 1100
+    assert sum(statement.upper().startswith("COMMIT") for statement in statements) == 2 #One per call/scope, not one per row
+
+
+def test_fetch_chunks_matches_fetch_all(tmp_path):
+    dbMgr: DatabaseManager = Manager(tmp_path, False)
+    dbMgr.ExecMany("INSERT INTO Items VALUES (?, ?)", ((id, f"item {id}") for id in range(25)))
+    chunks: list = list(dbMgr.FetchChunks("SELECT id, name FROM Items WHERE id >= ? ORDER BY id", (3,), chunkSize = 10))
+    assert [len(chunk) for chunk in chunks] == [10, 10, 2]
+    assert pd.concat(chunks, ignore_index = True).equals(dbMgr.FetchAll("SELECT id, name FROM Items WHERE id >= ? ORDER BY id", (3,)))
+    assert list(dbMgr.FetchChunks("SELECT id FROM Items WHERE id < 0")) == []
@@ -0,0 +1,131 @@
+from app.data.columnar import OpenSnapshot, WriteSnapshot, ColumnarTable
+from app.data.engine import TableFrame
+from app.data.filters import FilterSpec, Range, DateRange, InSet, And
+from app.data.journal import Replay
+from datetime import date, timedelta
+import pandas as pd
+import random
+import math
+
+
+_SCHEMA: tuple[tuple[str, str], ...] = (("id", "int"), ("name", "str"), ("kind", "cat"), ("level", "cat"), ("size", "float"), ("day", "date"))
+_LABELS: dict[str, str] = {"id": "id", "name": "name", "kind": "kind", "level": "level", "size": "size", "when": "day"}
+_KINDS: tuple[str, ...] = ("alpha", "beta", "gamma", "delta", "omega")
+_LEVELS: tuple[str | None, ...] = ("low", "medium", "high", None)
+
+
+def Day(rand: random.Random) -> str | None:
+    return None if rand.random() < 0.03 else (date(2020, 1, 1) + timedelta(days = rand.randrange(1500))).isoformat()
+
+
+def Row(rand: random.Random, id: int, kinds: tuple = _KINDS) -> tuple:
+    return (id, f"row {id}", rand.choice(kinds), rand.choice(_LEVELS), None if rand.random() < 0.05 else round(rand.uniform(0, 1000), 2), Day(rand))
+
+
+def Table(tmp_path) -> tuple[ColumnarTable, list[tuple]]:
+    """
+        Returns: snapshot and journal records that insert, update, move and delete rows, some with a kind the snapshot does not have
+    """
+    rand: random.Random = random.Random(7)
+    ids: list[int] = sorted(rand.sample(range(1, 20000), 3000)) #Gaps, so id ranges do not line up with positions
+    WriteSnapshot(tmp_path, "test", _SCHEMA, (Row(rand, id) for id in ids))
+    snapshot: ColumnarTable = OpenSnapshot(tmp_path, "test") #type: ignore
+    records: list[tuple] = []
+    for id in rand.sample(ids, 150):
+        match rand.randrange(3):
+            case 0:
+                records.append(("U", id, Row(rand, id, _KINDS + ("brand new",))))
+            case 1:
+                records.append(("U", id, Row(rand, 20000 + id, _KINDS + ("brand new",)))) #Moves the row to a new id
+            case _:
+                records.append(("D", id, None))
+    records += [("I", id, Row(rand, id, ("brand new",))) for id in range(40000, 40030)]
+    return snapshot, records
+
+
+def Reference(snapshot: ColumnarTable, records: list[tuple]) -> pd.DataFrame:
+    rows: list[tuple] = Replay(snapshot.Rows(), records)
+    return pd.DataFrame(rows, columns = list(_LABELS))
+
+
+def ReferenceMask(df: pd.DataFrame, filters: FilterSpec) -> pd.Series:
+    mask: pd.Series = pd.Series(True, index = df.index)
+    for condition in filters.Conditions():
+        column: pd.Series = df[condition.GetColumn()] #type: ignore
+        match condition:
+            case DateRange():
+                mask &= column.notna() & (column >= condition.GetLow()) & (column <= condition.GetHigh())
+            case Range():
+                mask &= (column >= condition.GetLow()) & (column <= condition.GetHigh())
+            case InSet():
+                mask &= column.isin(condition.GetValues())
+    return mask
+
+
+def RandomFilters(rand: random.Random) -> FilterSpec:
+    conditions: list[FilterSpec] = []
+    if rand.random() < 0.4:
+        low: int = rand.randrange(45000)
+        conditions.append(Range("id", low, low + rand.randrange(25000)))
+    if rand.random() < 0.6:
+        conditions.append(InSet("kind", rand.sample(_KINDS + ("brand new", "never seen"), rand.randrange(4))))
+    if rand.random() < 0.4:
+        conditions.append(InSet("level", rand.sample(("low", "medium", "high"), rand.randrange(1, 3))))
+    if rand.random() < 0.5:
+        start: date = date(2019, 12, 1) + timedelta(days = rand.randrange(1600))
+        conditions.append(DateRange("when", start, start + timedelta(days = rand.choice((3, 30, 400, 2000))))) #Narrow ranges use the date index, wide ones compare
+    if rand.random() < 0.3:
+        low = rand.randrange(1000)
+        conditions.append(Range("size", low, low + rand.randrange(500)))
+    return And(*conditions)
+
+
+def Tuples(df: pd.DataFrame) -> list[tuple]:
+    return [tuple(None if isinstance(val, float) and math.isnan(val) else val for val in row) for row in df.itertuples(index = False)]
+
+
+def SortKey(row: tuple, column: int) -> tuple:
+    return (row[column] is not None, row[column] if row[column] is not None else 0, row[0]) #Missing values first, ties by id
+
+
+def test_frame_matches_pandas(tmp_path):
+    snapshot, records = Table(tmp_path)
+    rand: random.Random = random.Random(11)
+    for frame, df in ((TableFrame(snapshot, records, _LABELS), Reference(snapshot, records)), (TableFrame(snapshot, [], _LABELS), Reference(snapshot, []))):
+        assert frame.rowCount == len(df)
+        ids: list[int] = df["id"].tolist()
+        fixed: list[FilterSpec] = [ #Bounds on existing ids, the new category alone, an empty selection
+            Range("id", ids[10], ids[500]), And(Range("id", ids[0], ids[-1]), InSet("kind", ["brand new"])), InSet("kind", []),
+            And(InSet("kind", ["alpha", "beta"]), InSet("level", ["high"]), DateRange("when", "2021-01-01", "2021-01-20")),
+        ]
+        for filters in fixed + [RandomFilters(rand) for _ in range(150)]:
+            mask = frame.Mask(filters)
+            expected: pd.DataFrame = df[ReferenceMask(df, filters).to_numpy()]
+            assert Tuples(frame.Rows(mask, list(_LABELS))) == Tuples(expected), filters
+            assert frame.CountWhere(filters) == len(expected), filters
+
+            counts: pd.DataFrame = frame.GroupBy("kind", mask, {"Total": ("size", "sum")})
+            grouped = expected.groupby("kind", dropna = False)
+            assert dict(zip(counts["kind"], counts["Count"])) == grouped.size().to_dict(), filters
+            assert all(math.isclose(total, grouped["size"].sum()[kind]) for kind, total in zip(counts["kind"], counts["Total"])), filters
+
+
+def test_page_walks_every_row_in_order(tmp_path):
+    snapshot, records = Table(tmp_path)
+    frame: TableFrame = TableFrame(snapshot, records, _LABELS)
+    df: pd.DataFrame = Reference(snapshot, records)
+    filters: FilterSpec = And(InSet("kind", ("alpha", "brand new")), DateRange("when", "2020-06-01", "2023-06-01"))
+    rows: list[tuple] = Tuples(df[ReferenceMask(df, filters).to_numpy()])
+    mask = frame.Mask(filters)
+    keys: dict = {"id": lambda row: row[0], "level": lambda row: SortKey(row, 3), "size": lambda row: SortKey(row, 4), "when": lambda row: SortKey(row, 5)}
+    for sortBy, key in keys.items():
+        for descending in (False, True):
+            expected: list[tuple] = sorted(rows, key = key, reverse = descending)
+            seen: list[tuple] = []
+            cursor: tuple | None = None
+            while True:
+                page, cursor = frame.Page(mask, list(_LABELS), sortBy, descending, cursor, size = 37)
+                seen += Tuples(page)
+                if cursor is None:
+                    break
+            assert seen == expected, (sortBy, descending)
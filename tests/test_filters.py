@@ -0,0 +1,35 @@
+from app.data.filters import FilterSpec, Range, DateRange, InSet, And, Where, ParseIDs, MAX_IDS
+import pytest
+
+
+def test_spec_without_key_fails_on_construction():
+    class NoKey(FilterSpec):
+        __slots__ = ()
+
+    with pytest.raises(TypeError):
+        NoKey()
+
+
+def test_equal_specs_share_cache_key():
+    first: And = And(Range("id", 1, 5), InSet("status", ["Open", "Closed"]))
+    second: And = And(Range("id", 1, 5), InSet("status", ["Open", "Closed"]))
+    assert first == second and hash(first) == hash(second)
+    assert first != And(Range("id", 1, 6))
+
+
+def test_where_binds_every_value():
+    filters: And = And(InSet("status", ["open", "closed"]), DateRange("last_updated", "2020-01-01", "2024-12-31"), Range("id", 1, 9))
+    where, params = Where(filters, {"id": "id", "status": "status", "last_updated": "last_update"})
+    assert where == " WHERE last_update BETWEEN ? AND ? AND status IN (?, ?) AND id BETWEEN ? AND ?"
+    assert params == ("2020-01-01", "2024-12-31", "closed", "open", 1, 9)
+    assert Where(And(), {}) == ("", ())
+    assert Where(InSet("status", []), {"status": "status"}) == (" WHERE 0", ())
+    with pytest.raises(ValueError):
+        Where(InSet("status; DROP TABLE Users", ["x"]), {"status": "status"})
+
+
+def test_parse_ids():
+    assert ParseIDs("3, 7, 10-12, 7,") == [3, 7, 10, 11, 12]
+    assert ParseIDs("") == []
+    assert ParseIDs("3, x") is None and ParseIDs("5-") is None and ParseIDs("-5") is None
+    assert len(ParseIDs(f"1-{10 ** 9}")) == MAX_IDS + 1 #type: ignore
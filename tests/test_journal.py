@@ -0,0 +1,56 @@
+from app.data.journal import Journal, Replay, Valid, Dirty
+
+
+_ROWS: list[tuple] = [(1, "a"), (2, "b"), (3, "c")]
+
+
+def test_read_skips_torn_record(tmp_path):
+    journal: Journal = Journal(tmp_path / "test.journal")
+    journal.AppendMany([("I", 4, (4, "d")), ("D", 1, None)])
+    journal.Append("U", 2, (2, "B"))
+    with open(tmp_path / "test.journal", "ab") as journalFile:
+        journalFile.write(b"\x40\x00\x00\x00partial") #A crash mid append
+    records, end = journal.Read()
+    assert records == [("I", 4, (4, "d")), ("D", 1, None), ("U", 2, (2, "B"))]
+    assert end < (tmp_path / "test.journal").stat().st_size
+    journal.Reset()
+    assert journal.Read() == ([], 0)
+
+
+def test_replay_and_dirty():
+    records: list[tuple] = [("U", 2, (20, "moved")), ("D", 3, None), ("I", 3, (3, "again")), ("C", 0, None), ("U", 1, (1, "A"))]
+    assert Replay(_ROWS, records) == [(1, "A"), (3, "again"), (20, "moved")]
+    assert Dirty((), records[:3]) == {2, 20, 3} #An id change marks the old and the new id
+    assert Dirty((7,), records) == {1} #A commit record clears everything before it, including the snapshot's ids
+    assert Dirty((7,), records[:1]) == {7, 2, 20}
+
+
+def test_valid_checks_batch_in_order():
+    exists = lambda id: id in (1, 2, 3)
+    assert Valid([("U", 2, (20, "x")), ("I", 2, (2, "y")), ("D", 20, None)], exists)
+    assert not Valid([("I", 4, (4, "x")), ("I", 4, (4, "y"))], exists)
+    assert not Valid([("U", 1, (2, "x"))], exists) #New id taken
+    assert not Valid([("D", 3, None), ("D", 3, None)], exists)
+
+
+def test_compact_keeps_records_appended_while_folding(tmp_path):
+    journal: Journal = Journal(tmp_path / "test.journal")
+    journal.AppendMany([("U", 1, (1, "A")), ("D", 2, None)])
+    written: list = []
+    def Fold(rows, records):
+        journal.Append("I", 9, (9, "late")) #A writer getting in while the fold runs outside the lock
+        return Replay(rows, records), Dirty((), records)
+    journal.Compact(lambda: list(_ROWS), Fold, written.append)
+    assert written == [([(1, "A"), (3, "c")], {1, 2})]
+    assert journal.Read()[0] == [("I", 9, (9, "late"))]
+
+
+def test_compact_discards_result_after_reset(tmp_path):
+    journal: Journal = Journal(tmp_path / "test.journal")
+    journal.Append("D", 1, None)
+    written: list = []
+    def Fold(rows, records):
+        journal.Reset() #Snapshot rebuilt from the database meanwhile
+        return Replay(rows, records)
+    journal.Compact(lambda: list(_ROWS), Fold, written.append)
+    assert written == []
@@ -0,0 +1,42 @@
+from app.data import schema
+import sqlite3
+
+
+def Database() -> sqlite3.Connection:
+    conn = sqlite3.connect(":memory:")
+    schema.CreateUsersTable(conn)
+    schema.CreateCyberIncidentsTable(conn)
+    schema.CreateDatasetsMetadataTable(conn)
+    schema.CreateITTicketsTable(conn)
+    return conn
+
+
+def test_uses_index_only_passes_searches():
+    assert schema.UsesIndex(["SEARCH Users USING INDEX sqlite_autoindex_Users_1 (username=?)"])
+    assert schema.UsesIndex(["SEARCH IT_Tickets USING INTEGER PRIMARY KEY (rowid=?)"])
+    assert not schema.UsesIndex(["SCAN IT_Tickets USING COVERING INDEX idx_tickets_date_cover"])
+    assert not schema.UsesIndex(["SCAN IT_Tickets"])
+    assert not schema.UsesIndex([])
+
+
+def test_app_queries_use_indexes():
+    conn = Database()
+    schema.CreateIndexes(conn)
+    for description, (usesIndex, plan) in schema.CheckQueryPlans(conn).items():
+        assert usesIndex, (description, plan)
+
+
+def test_analyze_only_when_indexes_change():
+    conn = Database()
+    schema.CreateIndexes(conn)
+    names: set[str] = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert set(schema.INDEXES) <= names
+    assert conn.execute("SELECT name FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone() is not None
+    conn.execute("DROP TABLE sqlite_stat1")
+
+    schema.CreateIndexes(conn) #Every index exists, nothing to analyze
+    assert conn.execute("SELECT name FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone() is None
+    conn.execute("DROP INDEX idx_tickets_status_date")
+    schema.CreateIndexes(conn)
+    assert conn.execute("SELECT name FROM sqlite_master WHERE name = 'idx_tickets_status_date'").fetchone() is not None
+    assert conn.execute("SELECT name FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone() is not None
@@ -0,0 +1,54 @@
+from app.data.search import SearchIndex
+import sqlite3
+
+
+def Index(tmp_path) -> tuple[SearchIndex, str]:
+    dbPath: str = str(tmp_path / "search.db")
+    conn = sqlite3.connect(dbPath)
+    conn.execute("CREATE TABLE Items (id INTEGER PRIMARY KEY, name TEXT)")
+    conn.executemany("INSERT INTO Items VALUES (?, ?)", [(1, "vpn connection issue"), (2, "vpn vpn vpn"), (3, "printer jam")])
+    conn.commit()
+    conn.close()
+    index: SearchIndex = SearchIndex(dbPath, "Items", "id", "name", 1)
+    index.Build([(1, "vpn connection issue"), (2, "vpn vpn vpn"), (3, "printer jam")], [("I", 4, (4, "vpn printer"))])
+    return index, dbPath
+
+
+def test_ranked_top_k_and_prefix(tmp_path):
+    index, _ = Index(tmp_path)
+    assert index.Search("vpn", 10)[0] == 2 #Most occurrences ranks first
+    assert sorted(index.Search("vpn", 10)) == [1, 2, 4]
+    assert index.Search("vpn", 1) == [2]
+    assert index.Search("conn", 10) == [1]
+    assert index.Search("printer vp", 10) == [4]
+    assert index.Search('" " OR', 10) == []
+
+
+def test_apply_follows_journal_records(tmp_path):
+    index, _ = Index(tmp_path)
+    index.Apply([("U", 3, (5, "scanner jam")), ("D", 1, None), ("C", 0, None)])
+    assert index.Search("jam", 10) == [5]
+    assert index.Search("connection", 10) == []
+
+
+def test_sync_reads_only_rows_changed_in_database(tmp_path):
+    index, dbPath = Index(tmp_path)
+    conn = sqlite3.connect(dbPath)
+    conn.execute("UPDATE Items SET name = 'okapi' WHERE id = 3")
+    conn.execute("INSERT INTO Items VALUES (3, 'okapi') ON CONFLICT(id) DO UPDATE SET name = excluded.name") #Upserts override the triggers' conflict handling, a repeated id must not abort
+    conn.execute("DELETE FROM Items WHERE id = 1")
+    conn.commit()
+    assert conn.execute("SELECT DISTINCT id FROM Items_fts_dirty ORDER BY id").fetchall() == [(1,), (3,)]
+    index.Sync()
+    assert index.Search("okapi", 10) == [3]
+    assert index.Search("connection", 10) == []
+    assert index.Search("vpn printer", 10) == [4] #Rows not in the dirty list are left alone
+    assert conn.execute("SELECT COUNT(*) FROM Items_fts_dirty").fetchone() == (0,)
+    conn.close()
+
+
+def test_existing_index_is_kept(tmp_path):
+    _, dbPath = Index(tmp_path)
+    index: SearchIndex = SearchIndex(dbPath, "Items", "id", "name", 1)
+    assert index.IsBuilt()
+    assert sorted(index.Search("vpn", 10)) == [1, 2, 4]
@@ -0,0 +1,27 @@
+from app.data.store import TableStore
+from threading import Thread
+import time
+
+
+def test_single_flight_rebuild():
+    builds: list[int] = []
+    def Build():
+        builds.append(1)
+        time.sleep(0.05)
+        return object()
+    store: TableStore = TableStore(Build) #type: ignore
+    first = store.Get()
+    assert store.Get() is first and len(builds) == 1
+
+    store.Bump()
+    frames: list = []
+    threads: list[Thread] = [Thread(target = lambda: frames.append(store.Get())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(builds) == 2 #One rebuild shared by every waiting thread
+    assert all(frame is frames[0] for frame in frames) and frames[0] is not first
+    assert store.IsCurrent(frames[0])
+    store.Bump()
+    assert not store.IsCurrent(frames[0])
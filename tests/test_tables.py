@@ -0,0 +1,79 @@
+from app.data.filters import Range, DateRange, InSet, And
+import sqlite3
+
+
+def Rows(data, ids: list[int]) -> dict[int, tuple]:
+    conn = sqlite3.connect(data / "intelligence_platform.db")
+    rows = conn.execute(f"SELECT ticket_id, subject, priority, status, created_date FROM IT_Tickets WHERE ticket_id IN ({', '.join('?' * len(ids))})", ids).fetchall()
+    conn.close()
+    return {row[0]: row for row in rows}
+
+
+def test_commit_with_search_index_built(data):
+    from app.data import tickets
+    tickets.RebuildSnapshot()
+    assert len(tickets.Search("vpn")) > 0 #Builds the index and the dirty triggers
+    first, second = (int(id) for id in tickets.GetPage(None, size = 2)[0]["ticket_id"])
+    moved: int = 900001
+    assert tickets.UpdateTicket(first, first, "Zebra outage", "low", "open", "2024-01-02")
+    assert tickets.UpdateTicket(second, moved, "Moved ticket", "low", "open", "2024-01-03")
+    assert tickets.InsertTicket(second, "Zebra reinserted", "high", "open", "2024-01-04")
+    tickets.Commit()
+    assert tickets.UpdateTicket(first, first, "Zebra outage again", "low", "closed", "2024-01-05") #Already in the dirty table
+    tickets.Commit()
+
+    assert Rows(data, [first, second, moved]) == {
+        first: (first, "Zebra outage again", "low", "closed", "2024-01-05"),
+        second: (second, "Zebra reinserted", "high", "open", "2024-01-04"),
+        moved: (moved, "Moved ticket", "low", "open", "2024-01-03"),
+    }
+    tickets.RebuildSnapshot()
+    assert sorted(tickets.Search("zebra")["ticket_id"]) == [first, second]
+
+
+def test_committed_rows_match_frame(data):
+    from app.data import incidents, tickets, datasets
+    cases: list[tuple] = [
+        (incidents, And(InSet("severity", ["high", "critical"]), DateRange("date", "2023-01-01", "2024-06-30"))),
+        (tickets, And(InSet("status", ["open"]), InSet("priority", ["low", "urgent"]), Range("ticket_id", 1, 1500))),
+        (datasets, And(InSet("source", ["Kaggle", "Internal Analytics Team"]), DateRange("last_updated", "2022-01-01", "2025-12-31"))),
+        (datasets, And(Range("file_size_mb", 10, 500), InSet("category", []))),
+    ]
+    for module, filters in cases:
+        module.RebuildSnapshot()
+        for frameRows, dbRows in ((module.GetRows(filters), module.GetCommittedRows(filters)), (module.GetRows(None), module.GetCommittedRows(None))):
+            assert list(frameRows.columns) == list(dbRows.columns)
+            assert frameRows.reset_index(drop = True).astype(object).equals(dbRows.astype(object)), (module.__name__, filters)
+
+
+def test_batch_writes_reject_bad_ids(data):
+    from app.data import tickets
+    assert not tickets.InsertTickets([(910001, "Batch", "low", "open", "2024-01-01"), ("91x", "Batch", "low", "open", "2024-01-01")])
+    assert not tickets.UpdateTickets([1, "2a"], {"status": "closed"})
+    assert not tickets.DeleteTickets([" "])
+    assert not tickets.IDExists(910001) #Nothing from the rejected batch was written
+
+
+def test_compaction_then_commit(data):
+    from app.data import tickets
+    tickets.RebuildSnapshot()
+    first, second, third = (int(id) for id in tickets.GetPage(None, size = 3)[0]["ticket_id"])
+    moved, inserted = 920001, 920002
+    assert tickets.InsertTicket(inserted, "Inserted", "low", "open", "2024-02-01")
+    assert tickets.UpdateTicket(second, moved, "Moved", "high", "open", "2024-02-02")
+    assert tickets.DeleteTicket(third)
+    assert tickets.UpdateTicket(first, first, "Updated", "medium", "resolved", "2024-02-03")
+    expected: list[tuple] = [tuple(row) for row in tickets.GetRows(None).itertuples(index = False)]
+
+    tickets._journal.Compact(tickets.LoadSnapshot, tickets.Fold, tickets.WriteCompacted) #What the background thread runs past the size threshold
+    assert tickets._journal.Read()[0] == []
+    assert set(tickets.LoadSnapshot().meta["dirty"]) == {first, second, moved, third, inserted} #Carried over in the snapshot, not the journal
+    assert [tuple(row) for row in tickets.LoadFrame().Rows(tickets.LoadFrame().Mask(None), list(tickets._LABELS)).itertuples(index = False)] == expected
+
+    tickets.Commit()
+    conn = sqlite3.connect(data / "intelligence_platform.db")
+    assert conn.execute("SELECT ticket_id, subject, priority, status, created_date FROM IT_Tickets ORDER BY ticket_id").fetchall() == expected
+    conn.close()
+    assert Rows(data, [second, third]) == {}
+    tickets.RebuildSnapshot()
+    assert [tuple(row) for row in tickets.GetRows(None).itertuples(index = False)] == expected